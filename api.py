@@ -0,0 +1,420 @@
+"""
+灵活用工平台 - HTTP JSON API（云函数入口）
+
+路由:
+    GET    /jobs                 职位列表（?status=&location=&created_from=&created_to=&limit=&offset=）
+    POST   /jobs                 新建职位
+    GET    /jobs/{id}            职位详情
+    PUT    /jobs/{id}            更新职位
+    DELETE /jobs/{id}            删除职位
+    GET    /jobs/{id}/match      为职位匹配候选人（?limit=）
+    GET    /candidates/{id}/recommend  为候选人推荐招聘中的职位（?limit=）
+    GET    /contracts/{id}/payroll   合同的工作日数、金额和结算计划
+    GET    /candidates/available 期间内没有合同占用的候选人（?start=&end=&status=&limit=&offset=）
+    GET    /candidates/duplicates      重复的候选人组（电话、邮箱或姓名+技能相同，见 dedup.py）；
+                                       ?contact_only=1 只返回电话、邮箱相同、可以直接合并的组
+    POST   /candidates/{id}/merge      把 {"duplicates": [候选人ID]} 合并到该候选人
+    candidates / contracts       同 jobs 的增删改查；POST /candidates 与已有候选人重复时返回 409（?allow_duplicate=1 跳过查重）
+    GET    /search               搜索职位和候选人（?q=&limit=）
+    GET    /changes              数据变更流（?since=序号&limit=），见 change_feed.py
+    GET    /stats                统计数据
+    GET    /metrics              性能指标（文本格式）
+
+DataStore 在模块级通过 get_store 取得（同一进程内与网页版共用，默认数据目录均为 web_data），云函数热启动时跨调用复用；
+GET 响应按数据版本缓存并返回 ETag，数据未变化时直接返回 304。
+"""
+import base64
+import json
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+
+import metrics
+from data_store import get_store
+from field_index import HashIndex, SortedIndex
+from matching import busy_candidates, candidate_matrix, candidate_pool, job_matrix, top_matches, top_recommendations
+from schema import SchemaError
+
+# 网关路径前缀，例如 "/release"
+API_PREFIX = os.environ.get("FLEXWORK_API_PREFIX", "").rstrip("/")
+
+# 响应缓存条目上限
+CACHE_SIZE = 256
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+class ApiError(Exception):
+    """带 HTTP 状态码的请求错误"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# ===== 处理函数 =====
+# 签名统一为 handler(store, params, query, body)，返回可 JSON 序列化的数据
+
+def _page_params(query):
+    try:
+        limit = min(int(query.get("limit", DEFAULT_LIMIT)), MAX_LIMIT)
+        offset = max(int(query.get("offset", 0)), 0)
+    except ValueError:
+        raise ApiError(400, "limit/offset 必须是整数")
+    if limit < 1:
+        raise ApiError(400, "limit 必须大于 0")
+    return limit, offset
+
+
+def _filter_query(store, collection, query):
+    """按有索引的字段过滤: 等值字段 ?status=，范围字段 ?start_date_from=&start_date_to="""
+    q = store.query(collection)
+    for field, index in store.field_indexes[collection].items():
+        if isinstance(index, HashIndex) and query.get(field):
+            q.where(**{field: query[field]})
+        elif isinstance(index, SortedIndex):
+            start, end = query.get(f"{field}_from"), query.get(f"{field}_to")
+            if start or end:
+                q.between(field, start or None, end or None)
+    return q
+
+
+def list_records(collection):
+    def handler(store, params, query, body):
+        limit, offset = _page_params(query)
+        records = _filter_query(store, collection, query).all()
+        return {
+            "total": len(records),
+            "items": records[offset:offset + limit]
+        }
+    return handler
+
+
+def get_record(collection):
+    def handler(store, params, query, body):
+        record = store.get_record(collection, params["id"])
+        if record is None:
+            raise ApiError(404, f"记录不存在: {params['id']}")
+        return record
+    return handler
+
+
+def create_record(collection):
+    adders = {"jobs": "add_job", "candidates": "add_candidate", "contracts": "add_contract"}
+
+    def handler(store, params, query, body):
+        if not isinstance(body, dict):
+            raise ApiError(400, "请求体必须是 JSON 对象")
+        if collection == "candidates" and query.get("allow_duplicate") not in ("1", "true"):
+            duplicates = store.find_duplicates(body)
+            if duplicates:
+                ids = ", ".join(d["id"] for d in duplicates)
+                raise ApiError(409, f"可能与已有候选人重复: {ids}（确认添加请加 ?allow_duplicate=1）")
+        record_id = getattr(store, adders[collection])(dict(body))
+        return store.get_record(collection, record_id)
+    return handler
+
+
+def update_record(collection):
+    def handler(store, params, query, body):
+        if not isinstance(body, dict):
+            raise ApiError(400, "请求体必须是 JSON 对象")
+        record = store.update_record(collection, params["id"], body)
+        if record is None:
+            raise ApiError(404, f"记录不存在: {params['id']}")
+        return record
+    return handler
+
+
+def delete_record(collection):
+    def handler(store, params, query, body):
+        if not store.delete_record(collection, params["id"]):
+            raise ApiError(404, f"记录不存在: {params['id']}")
+        return {"deleted": params["id"]}
+    return handler
+
+
+def match_job(store, params, query, body):
+    job = store.get_record("jobs", params["id"])
+    if job is None:
+        raise ApiError(404, f"职位不存在: {params['id']}")
+    limit, _ = _page_params(query)
+    pool = candidate_pool(store, job)
+    total, results = top_matches(job, pool, limit, busy_candidates(store, job))
+    return {
+        "job_id": job["id"],
+        "total": total,
+        "approximate": pool is not candidate_matrix(store),
+        "items": [
+            {
+                "candidate_id": r["candidate"].get("id"),
+                "name": r["candidate"].get("name"),
+                "score": round(r["score"], 1),
+                "skill_score": round(r["skill_score"], 1),
+                "salary_score": round(r["salary_score"], 1),
+                "location_score": r["location_score"],
+                "available": r.get("available", True),
+                "matched_skills": r["matched_skills"]
+            }
+            for r in results
+        ]
+    }
+
+
+def available_candidates(store, params, query, body):
+    start, end = query.get("start"), query.get("end")
+    if not start or not end:
+        raise ApiError(400, "缺少参数 start 或 end")
+    if start > end:
+        raise ApiError(400, "start 不能晚于 end")
+    limit, offset = _page_params(query)
+    records = store.available_candidates(start, end, query.get("status"))
+    return {"total": len(records), "items": records[offset:offset + limit]}
+
+
+def duplicate_candidates(store, params, query, body):
+    groups = store.duplicate_groups(contact_only=query.get("contact_only") in ("1", "true"))
+    return {
+        "total": len(groups),
+        "items": [[{"id": c.get("id"), "name": c.get("name"), "phone": c.get("phone"), "email": c.get("email")}
+                   for c in group] for group in groups]
+    }
+
+
+def merge_candidates(store, params, query, body):
+    duplicates = body.get("duplicates") if isinstance(body, dict) else None
+    if not isinstance(duplicates, list) or not duplicates:
+        raise ApiError(400, "请求体必须包含 duplicates（候选人ID列表）")
+    record = store.merge_candidates(params["id"], duplicates)
+    if record is None:
+        raise ApiError(404, f"候选人不存在: {params['id']}")
+    return record
+
+
+def contract_payroll(store, params, query, body):
+    contract = store.get_record("contracts", params["id"])
+    if contract is None:
+        raise ApiError(404, f"合同不存在: {params['id']}")
+    work_days, amount = store.contract_terms(contract)
+    return {
+        "contract_id": contract["id"],
+        "work_days": work_days,
+        "total_amount": amount,
+        "payment_method": contract.get("payment_method"),
+        "schedule": store.payroll_schedule(contract)
+    }
+
+
+def recommend_jobs(store, params, query, body):
+    candidate = store.get_record("candidates", params["id"])
+    if candidate is None:
+        raise ApiError(404, f"候选人不存在: {params['id']}")
+    limit, _ = _page_params(query)
+    total, results = top_recommendations(candidate, job_matrix(store), limit)
+    return {
+        "candidate_id": candidate["id"],
+        "total": total,
+        "items": [
+            {
+                "job_id": r["job"].get("id"),
+                "title": r["job"].get("title"),
+                "location": r["job"].get("location"),
+                "salary": r["job"].get("salary"),
+                "score": round(r["score"], 1),
+                "skill_score": round(r["skill_score"], 1),
+                "salary_score": round(r["salary_score"], 1),
+                "location_score": r["location_score"],
+                "matched_skills": r["matched_skills"]
+            }
+            for r in results
+        ]
+    }
+
+
+def search(store, params, query, body):
+    keyword = query.get("q", "").strip().lower()
+    if not keyword:
+        raise ApiError(400, "缺少搜索关键词 q")
+    limit, _ = _page_params(query)
+    return {
+        "jobs": store.search("jobs", keyword, limit),
+        "candidates": store.search("candidates", keyword, limit)
+    }
+
+
+def changes(store, params, query, body):
+    try:
+        since = int(query.get("since", 0))
+    except ValueError:
+        raise ApiError(400, "since 必须是整数")
+    limit, _ = _page_params(query)
+    items = store.changes.since(since, limit)
+    seq = max(store.changes.seq, items[-1].seq if items else 0)
+    return {"seq": seq, "items": [change._asdict() for change in items]}
+
+
+def stats(store, params, query, body):
+    return store.get_stats()
+
+
+def metrics_text(store, params, query, body):
+    return metrics.render_text()
+
+
+# ===== 路由表 =====
+
+ROUTES = [
+    ("GET", "/stats", stats), ("GET", "/search", search), ("GET", "/metrics", metrics_text),
+    ("GET", "/changes", changes),
+    # 必须在 /candidates/{id} 之前
+    ("GET", "/candidates/available", available_candidates),
+    ("GET", "/candidates/duplicates", duplicate_candidates)
+]
+for _collection in ("jobs", "candidates", "contracts"):
+    ROUTES += [
+        ("GET", f"/{_collection}", list_records(_collection)),
+        ("POST", f"/{_collection}", create_record(_collection)),
+        ("GET", f"/{_collection}/{{id}}", get_record(_collection)),
+        ("PUT", f"/{_collection}/{{id}}", update_record(_collection)),
+        ("DELETE", f"/{_collection}/{{id}}", delete_record(_collection)),
+    ]
+ROUTES.append(("GET", "/jobs/{id}/match", match_job))
+ROUTES.append(("GET", "/candidates/{id}/recommend", recommend_jobs))
+ROUTES.append(("POST", "/candidates/{id}/merge", merge_candidates))
+ROUTES.append(("GET", "/contracts/{id}/payroll", contract_payroll))
+
+
+def _compile(pattern):
+    return re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", pattern) + "$")
+
+
+_COMPILED_ROUTES = [(method, _compile(pattern), handler) for method, pattern, handler in ROUTES]
+
+
+def resolve(method, path):
+    """匹配路由，返回 (handler, params)"""
+    allowed = False
+    for route_method, regex, handler in _COMPILED_ROUTES:
+        m = regex.match(path)
+        if m:
+            if route_method == method:
+                return handler, m.groupdict()
+            allowed = True
+    if allowed:
+        raise ApiError(405, f"不支持的请求方法: {method}")
+    raise ApiError(404, f"接口不存在: {path}")
+
+
+# ===== 请求处理 =====
+
+store = get_store(os.environ.get("FLEXWORK_DATA_DIR", "web_data"))
+
+_cache = OrderedDict()
+
+_cache_lock = threading.Lock()
+
+# 结果随时变化、不参与缓存的接口（/changes 还包含其他进程追加的日志，不随本进程的数据版本变化）
+UNCACHED = {metrics_text, changes}
+
+# 不新建资源的 POST 接口，成功时返回 200 而不是 201
+NOT_CREATED = {merge_candidates}
+
+# CPU 密集型接口，异步服务（api_server.py）会把它们放到进程池执行
+CPU_BOUND = {match_job}
+
+
+def _call(handler, params, query, body):
+    return handler(store, params, query, body)
+
+
+def _serialize(payload):
+    """返回 (响应体, Content-Type)"""
+    if isinstance(payload, str):
+        return payload, "text/plain; charset=utf-8"
+    return json.dumps(payload, ensure_ascii=False), "application/json; charset=utf-8"
+
+
+def _cached_get(handler, params, query, cache_key, call):
+    """GET 响应体按数据版本缓存，命中时连序列化也省掉"""
+    with _cache_lock:
+        entry = _cache.get(cache_key)
+        if entry is not None and entry[0] == store.version:
+            _cache.move_to_end(cache_key)
+            metrics.incr("api.cache_hit")
+            return entry[1], entry[2]
+    metrics.incr("api.cache_miss")
+    version = store.version
+    body, content_type = _serialize(call(handler, params, query, None))
+    with _cache_lock:
+        _cache[cache_key] = (version, body, content_type)
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return body, content_type
+
+
+def handle(method, path, query=None, body=None, headers=None, call=_call):
+    """处理一个请求，返回 (状态码, 响应头, 响应体)
+
+    call(handler, params, query, body) 决定处理函数如何执行，默认在当前线程直接调用。
+    """
+    query = query or {}
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    if API_PREFIX and path.startswith(API_PREFIX):
+        path = path[len(API_PREFIX):]
+    path = "/" + path.strip("/")
+
+    try:
+        handler, params = resolve(method, path)
+        if method == "GET" and handler not in UNCACHED:
+            etag = f'"{store.instance_id}-{store.version}"'
+            if headers.get("if-none-match") == etag:
+                return 304, {"ETag": etag}, ""
+            cache_key = (path, tuple(sorted(query.items())))
+            response_body, content_type = _cached_get(handler, params, query, cache_key, call)
+            return 200, {"Content-Type": content_type, "ETag": etag}, response_body
+
+        if isinstance(body, (str, bytes)):
+            try:
+                body = json.loads(body) if body else {}
+            except ValueError:
+                raise ApiError(400, "请求体不是合法的 JSON")
+        response_body, content_type = _serialize(call(handler, params, query, body))
+        status = 201 if method == "POST" and handler not in NOT_CREATED else 200
+        return status, {"Content-Type": content_type}, response_body
+    except ApiError as e:
+        response_body, content_type = _serialize({"error": e.message})
+        return e.status, {"Content-Type": content_type}, response_body
+    except SchemaError as e:
+        response_body, content_type = _serialize({"error": str(e)})
+        return 400, {"Content-Type": content_type}, response_body
+    except Exception as e:
+        # 保存失败、处理函数出错等，返回 JSON 的 500 而不是让云函数平台返回不透明的错误
+        print(f"请求处理失败 {method} {path}: {e!r}", file=sys.stderr)
+        metrics.incr("api.errors")
+        response_body, content_type = _serialize({"error": "服务器内部错误"})
+        return 500, {"Content-Type": content_type}, response_body
+
+
+@metrics.timed("api.main_handler")
+def main_handler(event, context):
+    """腾讯云 SCF / API 网关入口"""
+    body = event.get("body")
+    if body and event.get("isBase64Encoded"):
+        body = base64.b64decode(body)
+    status, headers, response_body = handle(
+        event.get("httpMethod", "GET").upper(),
+        event.get("path", "/"),
+        event.get("queryString") or event.get("queryStringParameters") or {},
+        body,
+        event.get("headers")
+    )
+    return {
+        "isBase64Encoded": False,
+        "statusCode": status,
+        "headers": headers,
+        "body": response_body
+    }
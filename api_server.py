@@ -0,0 +1,217 @@
+"""
+灵活用工平台 - 异步 API 服务（供 ATS 等系统集成）
+
+    python api_server.py --port 8600 --data-dir web_data --workers 4
+
+基于 asyncio 的 HTTP/1.1 服务，路由和处理逻辑与云函数版 api.py 完全相同:
+- 读请求在存储线程池中并发执行，写请求独占（读写锁），事件循环不被文件读写阻塞
+- 匹配打分等 CPU 密集型接口放到进程池执行，每个子进程持有一份常驻的
+  DataStore 副本，数据变化时从变更日志（change_feed.py）增量应用新的变更，
+  不需要重新读取全部数据
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+REASONS = {
+    200: "OK", 201: "Created", 304: "Not Modified", 400: "Bad Request",
+    404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+    500: "Internal Server Error"
+}
+
+# 请求体大小上限
+MAX_BODY = 1024 * 1024
+
+def _init_worker(data_dir):
+    """子进程初始化: 加载常驻数据副本"""
+    os.environ["FLEXWORK_DATA_DIR"] = data_dir
+    import api  # noqa: F401  导入时即加载 DataStore
+
+
+def _cpu_call(handler_name, params, query, seq):
+    """在子进程中执行 CPU 密集型处理函数，seq 为主进程最新的变更序号"""
+    import api
+    if seq != api.store.changes.seq:
+        api.store.catch_up()
+    return getattr(api, handler_name)(api.store, params, query, None)
+
+
+class ReadWriteLock:
+    """asyncio 读写锁: 多个读者并发，写者独占且优先"""
+
+    def __init__(self):
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire_read(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: not self._writing and not self._waiting_writers)
+            self._readers += 1
+
+    async def release_read(self):
+        async with self._cond:
+            self._readers -= 1
+            self._cond.notify_all()
+
+    async def acquire_write(self):
+        async with self._cond:
+            self._waiting_writers += 1
+            await self._cond.wait_for(lambda: not self._writing and not self._readers)
+            self._waiting_writers -= 1
+            self._writing = True
+
+    async def release_write(self):
+        async with self._cond:
+            self._writing = False
+            self._cond.notify_all()
+
+
+class ApiServer:
+    """异步 HTTP 服务"""
+
+    def __init__(self, data_dir, workers=None, storage_threads=32):
+        os.environ["FLEXWORK_DATA_DIR"] = data_dir
+        import api
+        self.api = api
+        self.data_dir = data_dir
+        self.storage = ThreadPoolExecutor(max_workers=storage_threads, thread_name_prefix="storage")
+        self.cpu = ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(data_dir,)
+        )
+        self.lock = None
+
+    def _call(self, handler, params, query, body):
+        """在存储线程中执行；CPU 密集型处理函数转交进程池"""
+        if handler in self.api.CPU_BOUND:
+            future = self.cpu.submit(_cpu_call, handler.__name__, params, query, self.api.store.changes.seq)
+            return future.result()
+        return handler(self.api.store, params, query, body)
+
+    async def dispatch(self, method, target, headers, body):
+        """执行一个请求，返回 (状态码, 响应头, 响应体)"""
+        url = urlsplit(target)
+        query = dict(parse_qsl(url.query))
+        loop = asyncio.get_running_loop()
+        is_read = method in ("GET", "HEAD")
+
+        if is_read:
+            await self.lock.acquire_read()
+        else:
+            await self.lock.acquire_write()
+        try:
+            return await loop.run_in_executor(
+                self.storage, self.api.handle, "GET" if method == "HEAD" else method,
+                url.path, query, body, headers, self._call
+            )
+        finally:
+            if is_read:
+                await self.lock.release_read()
+            else:
+                await self.lock.release_write()
+
+    async def handle_connection(self, reader, writer):
+        """处理一个连接上的多个请求（支持 keep-alive）"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._write(writer, 400, {}, '{"error": "请求行格式错误"}', False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._write(writer, 400, {}, '{"error": "Content-Length 格式错误"}', False)
+                    break
+                if length > MAX_BODY:
+                    await self._write(writer, 413, {}, '{"error": "请求体过大"}', False)
+                    break
+                body = await reader.readexactly(length) if length else None
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                try:
+                    status, response_headers, response_body = await self.dispatch(
+                        method.upper(), target, headers, body
+                    )
+                except Exception as e:
+                    print(f"请求处理失败 {method} {target}: {e}", file=sys.stderr)
+                    status, response_headers, response_body = 500, {}, '{"error": "服务器内部错误"}'
+                await self._write(writer, status, response_headers, response_body, keep_alive,
+                                  head=method.upper() == "HEAD")
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _write(self, writer, status, headers, body, keep_alive, head=False):
+        payload = body.encode("utf-8")
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+        headers = dict(headers)
+        headers.setdefault("Content-Type", "application/json; charset=utf-8")
+        headers["Content-Length"] = str(len(payload))
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("utf-8"))
+        if not head:
+            writer.write(payload)
+        await writer.drain()
+
+    async def serve(self, host, port, ready=None):
+        self.lock = ReadWriteLock()
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"API 服务已启动: http://{host}:{port}  数据目录: {self.data_dir}")
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.storage.shutdown(wait=False)
+        self.cpu.shutdown(wait=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="灵活用工平台异步 API 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--data-dir", default=os.environ.get("FLEXWORK_DATA_DIR", "web_data"))
+    parser.add_argument("--workers", type=int, default=None, help="打分进程数，默认 CPU 核数")
+    parser.add_argument("--storage-threads", type=int, default=32, help="存储线程数")
+    args = parser.parse_args(argv)
+
+    server = ApiServer(args.data_dir, args.workers, args.storage_threads)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,136 +1,39 @@
 #!/usr/bin/env python3
 """
 灵活用工管理平台 - 完整功能版
-包含数据持久化和所有业务逻辑
+数据持久化、索引和匹配与网页版共用（data_store.py、matching.py）
 """
 import sys
-import json
-import os
-import csv
-from datetime import datetime
+import threading
+import time
+from contextlib import contextmanager
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QTextEdit, QTableWidget, QTableWidgetItem,
     QProgressBar, QMessageBox, QTabWidget, QLineEdit, QDateEdit,
     QComboBox, QSpinBox, QGroupBox, QFormLayout, QListWidget,
     QListWidgetItem, QSplitter, QHeaderView, QDialog, QDialogButtonBox,
-    QCalendarWidget, QFileDialog, QInputDialog, QMenu, QSystemTrayIcon
+    QCalendarWidget, QFileDialog, QInputDialog, QMenu, QSystemTrayIcon, QCompleter
 )
-from PyQt6.QtCore import Qt, QTimer, QDate, pyqtSignal
+from PyQt6.QtCore import Qt, QTimer, QDate, QModelIndex, pyqtSignal
 from PyQt6.QtGui import QFont, QColor, QAction, QIcon
 import random
+from data_store import DataFileError, get_store
+from matching import (OPEN_JOB_STATUS, busy_candidates, candidate_matrix, job_matrix, recommend_jobs,
+                      stream_matches)
 
-class DataManager:
-    """数据管理器 - 负责所有数据的保存和加载"""
-    
-    def __init__(self, data_dir="data"):
-        self.data_dir = data_dir
-        os.makedirs(data_dir, exist_ok=True)
-        
-        # 数据文件路径
-        self.jobs_file = os.path.join(data_dir, "jobs.json")
-        self.candidates_file = os.path.join(data_dir, "candidates.json")
-        self.contracts_file = os.path.join(data_dir, "contracts.json")
-        
-        # 初始化数据
-        self.jobs = self.load_json(self.jobs_file, self.default_jobs())
-        self.candidates = self.load_json(self.candidates_file, self.default_candidates())
-        self.contracts = self.load_json(self.contracts_file, self.default_contracts())
-    
-    def load_json(self, filepath, default_data):
-        try:
-            if os.path.exists(filepath):
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except:
-            pass
-        return default_data
-    
-    def save_json(self, filepath, data):
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            return True
-        except:
-            return False
-    def save_all(self):
-        """保存所有数据"""
-        self.save_json(self.jobs_file, self.jobs)
-        self.save_json(self.candidates_file, self.candidates)
-        self.save_json(self.contracts_file, self.contracts)
-    
-    def default_jobs(self):
-        """默认职位数据"""
-        return [
-            {
-                "id": "job_001",
-                "title": "前端开发工程师",
-                "salary": "300-500元/天",
-                "location": "远程",
-                "status": "招聘中",
-                "description": "负责Web前端开发，要求React/Vue经验",
-                "requirements": "3年以上经验，精通JavaScript",
-                "created": "2024-01-01",
-                "applicants": 12
-            }
-        ]
-    
-    def default_candidates(self):
-        """默认候选人数据"""
-        return [
-            {
-                "id": "cand_001",
-                "name": "张三",
-                "skills": ["Python", "React", "JavaScript"],
-                "experience": 3,
-                "expected_salary": 400,
-                "location": "上海",
-                "status": "可联系",
-                "phone": "13800138000",
-                "email": "zhangsan@example.com",
-                "availability": "周一至周五"
-            }
-        ]
-    
-    def default_contracts(self):
-        """默认合同数据"""
-        return [
-            {
-                "id": "contract_001",
-                "job_id": "job_001",
-                "candidate_id": "cand_001",
-                "start_date": "2024-01-15",
-                "end_date": "2024-06-15",
-                "salary": 450,
-                "status": "执行中",
-                "work_hours": "每周40小时",
-                "payment_method": "月结"
-            }
-        ]
-    
-    def add_job(self, job_data):
-        """添加新职位"""
-        job_data["id"] = f"job_{len(self.jobs) + 1:03d}"
-        job_data["created"] = datetime.now().strftime("%Y-%m-%d")
-        job_data["applicants"] = 0
-        self.jobs.append(job_data)
-        self.save_json(self.jobs_file, self.jobs)
-        return job_data["id"]
-    
-    def add_candidate(self, candidate_data):
-        """添加新候选人"""
-        candidate_data["id"] = f"cand_{len(self.candidates) + 1:03d}"
-        self.candidates.append(candidate_data)
-        self.save_json(self.candidates_file, self.candidates)
-        return candidate_data["id"]
-    
-    def add_contract(self, contract_data):
-        """添加新合同"""
-        contract_data["id"] = f"contract_{len(self.contracts) + 1:03d}"
-        self.contracts.append(contract_data)
-        self.save_json(self.contracts_file, self.contracts)
-        return contract_data["id"]
+# 最后一次修改后等待多久自动保存（毫秒），期间的连续修改合并为一次写入
+AUTOSAVE_DELAY_MS = 1000
+
+COLLECTION_NAMES = {"jobs": "职位", "candidates": "候选人", "contracts": "合同"}
 
+# 匹配页职位选择框: 最多列出的职位数、停止输入多久后检索（毫秒）
+JOB_PICKER_LIMIT = 50
+JOB_PICKER_DELAY_MS = 150
+
+# 智能匹配: 显示的前 K 名、打分最多用时（秒），超时后显示已评估部分中的最佳结果
+MATCH_LIMIT = 100
+MATCH_TIME_BUDGET = 3.0
 
 class JobDialog(QDialog):
     """职位发布对话框 - 完整功能"""
@@ -342,13 +245,11 @@ class ContractDialog(QDialog):
         # 选择职位
         job_id = data.get("job_id")
         if job_id:
-            idx = next((i for i, j in enumerate(self.jobs) if j.get("id") == job_id), 0)
-            self.job_combo.setCurrentIndex(idx)
+            self.job_combo.setCurrentIndex(max(self.job_combo.findData(job_id), 0))
         # 选择候选人
         cand_id = data.get("candidate_id")
         if cand_id:
-            idx = next((i for i, c in enumerate(self.candidates) if c.get("id") == cand_id), 0)
-            self.candidate_combo.setCurrentIndex(idx)
+            self.candidate_combo.setCurrentIndex(max(self.candidate_combo.findData(cand_id), 0))
         # 日期和其他字段
         try:
             if data.get("start_date"):
@@ -388,19 +289,46 @@ class ContractDialog(QDialog):
 
 
 class FlexWorkApp(QMainWindow):
+    # 数据变更事件（可能来自其他线程，经信号转到界面线程处理）
+    data_changed = pyqtSignal(object)
+    # 后台保存完成: (已写入的集合, 耗时毫秒, 写入失败的集合)
+    save_finished = pyqtSignal(list, float, list)
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("灵活用工智能管理平台")
         self.setGeometry(100, 100, 1200, 800)
         
         # 初始化数据管理器
-        self.data_manager = DataManager()
+        # 与网页版相同的数据层（data_store.py），桌面版使用自己的数据目录 data（网页版和 API 默认为 web_data）
+        # autosave=False: 增删改只标记集合为待保存，停止修改 AUTOSAVE_DELAY_MS 后由后台线程写入；
+        # 保存方式是实例创建时的参数，不会影响同一进程内按默认方式取得的共享实例
+        self.data_manager = get_store("data", autosave=False)
+        self.save_status = ""
+        self._save_thread = None
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(AUTOSAVE_DELAY_MS)
+        self.save_timer.timeout.connect(self.autosave)
+        self.data_changed.connect(self.on_data_changed)
+        self.save_finished.connect(self.on_save_finished)
+        self._unsubscribe = self.data_manager.changes.subscribe(self.data_changed.emit)
+        
+        # 最近一次智能匹配的结果
+        self.match_results = []
         
         # 设置样式
         self.setup_style()
         
         self.init_ui()
         
+        # 集合 -> 表格；集合 -> {记录ID: 该行第一列的单元格}，数据变更时按ID找到所在行只更新这一行
+        self._tables = {"jobs": self.jobs_table, "candidates": self.candidates_table,
+                        "contracts": self.contracts_table}
+        self._row_items = {name: {} for name in self._tables}
+        # 集合 -> 当前搜索关键词检索到的记录ID（没有关键词时为 None），单行变化时只判断这一条记录
+        self._search_hits = {name: None for name in self._tables}
+        
         # 创建系统托盘
         self.setup_system_tray()
         
@@ -501,7 +429,23 @@ class FlexWorkApp(QMainWindow):
         # 匹配控制区
         control_layout = QHBoxLayout()
         
+        # 可输入的职位选择框: 按输入的关键词从检索索引取匹配的招聘中职位，不预先列出全部职位
         self.job_combo = QComboBox()
+        self.job_combo.setEditable(True)
+        self.job_combo.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+        self.job_combo.setMinimumWidth(320)
+        self.job_combo.lineEdit().setPlaceholderText("输入职位名称或技能搜索")
+        self.job_completer = QCompleter(self.job_combo.model(), self)
+        self.job_completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.job_combo.setCompleter(self.job_completer)
+        # 按选中项的行号设置当前职位（同名职位按文字查找会选错）
+        self.job_completer.activated[QModelIndex].connect(lambda index: self.job_combo.setCurrentIndex(index.row()))
+        self._job_query = ""
+        self.job_picker_timer = QTimer(self)
+        self.job_picker_timer.setSingleShot(True)
+        self.job_picker_timer.setInterval(JOB_PICKER_DELAY_MS)
+        self.job_picker_timer.timeout.connect(self.populate_job_picker)
+        self.job_combo.lineEdit().textEdited.connect(self.on_job_query_edited)
         control_layout.addWidget(QLabel("选择职位:"))
         control_layout.addWidget(self.job_combo)
         
@@ -512,6 +456,16 @@ class FlexWorkApp(QMainWindow):
         
         layout.addLayout(control_layout)
         
+        # 分块匹配的进度；每块之间回到事件循环，界面可以先显示部分结果
+        self.match_progress = QProgressBar()
+        self.match_progress.hide()
+        layout.addWidget(self.match_progress)
+        self._match_stream = None
+        self.match_timer = QTimer(self)
+        self.match_timer.setSingleShot(True)
+        self.match_timer.setInterval(0)
+        self.match_timer.timeout.connect(self.next_match_batch)
+        
         # 结果表格
         self.match_table = QTableWidget(0, 4)
         self.match_table.setHorizontalHeaderLabels(["排名", "候选人", "匹配度", "操作"])
@@ -540,8 +494,14 @@ class FlexWorkApp(QMainWindow):
         refresh_btn = QPushButton("🔄 刷新")
         refresh_btn.clicked.connect(self.refresh_jobs)
         
+        self.job_search = QLineEdit()
+        self.job_search.setPlaceholderText("🔍 搜索职位名称、技能、描述")
+        self.job_search.setClearButtonEnabled(True)
+        self.job_search.textChanged.connect(self.filter_jobs)
+        
         toolbar.addWidget(title)
         toolbar.addStretch()
+        toolbar.addWidget(self.job_search)
         toolbar.addWidget(refresh_btn)
         toolbar.addWidget(new_btn)
         
@@ -553,6 +513,10 @@ class FlexWorkApp(QMainWindow):
         jobs_header = self.jobs_table.horizontalHeader()
         if jobs_header is not None:
             jobs_header.setStretchLastSection(True)
+            # 点击表头之前保持职位的原有顺序
+            jobs_header.setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        # 行内操作按职位ID绑定，点击表头排序后仍指向同一职位
+        self.jobs_table.setSortingEnabled(True)
         layout.addWidget(self.jobs_table)
         
         self.tabs.addTab(tab, "📋 职位管理")
@@ -572,8 +536,18 @@ class FlexWorkApp(QMainWindow):
         new_btn.clicked.connect(self.show_new_candidate_dialog)
         new_btn.setObjectName("primary")
         
+        dedup_btn = QPushButton("🧹 合并重复")
+        dedup_btn.clicked.connect(self.merge_duplicate_candidates)
+        
+        self.candidate_search = QLineEdit()
+        self.candidate_search.setPlaceholderText("🔍 搜索姓名、技能")
+        self.candidate_search.setClearButtonEnabled(True)
+        self.candidate_search.textChanged.connect(self.filter_candidates)
+        
         toolbar.addWidget(title)
         toolbar.addStretch()
+        toolbar.addWidget(self.candidate_search)
+        toolbar.addWidget(dedup_btn)
         toolbar.addWidget(new_btn)
         
         layout.addLayout(toolbar)
@@ -584,6 +558,8 @@ class FlexWorkApp(QMainWindow):
         candidates_header = self.candidates_table.horizontalHeader()
         if candidates_header is not None:
             candidates_header.setStretchLastSection(True)
+            candidates_header.setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.candidates_table.setSortingEnabled(True)
         layout.addWidget(self.candidates_table)
         
         self.tabs.addTab(tab, "👥 候选人管理")
@@ -698,101 +674,265 @@ class FlexWorkApp(QMainWindow):
         self.refresh_contracts()
         self.update_status_bar()
     
+    def on_data_changed(self, change):
+        """数据变更: 安排自动保存，并只更新受影响的表格行"""
+        self.save_timer.start()
+        if change.op == "reload":
+            self.refresh_data()
+            return
+        name, record_id = change.collection, change.record_id
+        if name == "contracts":
+            self.sync_contract_row(record_id)
+        elif name in ("jobs", "candidates"):
+            self.sync_row(name, record_id)
+            if name == "jobs":
+                self.job_picker_timer.start()
+            # 引用该职位/候选人的合同行显示其名称，一并刷新
+            for contract_id in self.data_manager.contract_view.contracts_of(name, record_id):
+                self.sync_contract_row(contract_id)
+        self.update_status_bar()
+    
+    def _row_of(self, name, record_id):
+        """记录在表格中的行号，不在表格中返回 -1"""
+        item = self._row_items[name].get(record_id)
+        return self._tables[name].row(item) if item is not None else -1
+    
+    @staticmethod
+    def _set_cell(table, row, column, text, color=None):
+        """更新单元格文字，已有单元格原地修改"""
+        item = table.item(row, column)
+        if item is None:
+            item = QTableWidgetItem()
+            table.setItem(row, column, item)
+        item.setText(str(text))
+        item.setForeground(QColor(color) if color else table.palette().text())
+        return item
+    
+    def _preserve_view(self, table):
+        """记下滚动位置和选中行的记录ID，返回恢复它们的函数"""
+        name = next(n for n, t in self._tables.items() if t is table)
+        position = table.verticalScrollBar().value()
+        items = self._row_items[name]
+        selected = [record_id for record_id, item in items.items()
+                    if table.row(item) >= 0 and item.isSelected()]
+        
+        def restore():
+            for record_id in selected:
+                row = self._row_of(name, record_id)
+                if row >= 0:
+                    table.selectRow(row)
+            table.verticalScrollBar().setValue(position)
+        return restore
+    
+    def sync_row(self, name, record_id):
+        """按记录的当前内容新增、更新或移除一行"""
+        table = self._tables[name]
+        record = self.data_manager.get_record(name, record_id)
+        row = self._row_of(name, record_id)
+        if record is None:
+            if row >= 0:
+                table.removeRow(row)
+                del self._row_items[name][record_id]
+            if self._search_hits.get(name) is not None:
+                self._search_hits[name].discard(record_id)
+            return
+        if row < 0:
+            row = table.rowCount()
+            table.insertRow(row)
+        if name == "jobs":
+            self._fill_job_row(row, record)
+        else:
+            self._fill_candidate_row(row, record)
+        hits = self._search_hits.get(name)
+        if hits is not None:
+            search = self.job_search if name == "jobs" else self.candidate_search
+            if self.data_manager.search_matches(name, record, search.text()):
+                hits.add(record_id)
+            else:
+                hits.discard(record_id)
+            table.setRowHidden(self._row_of(name, record_id), record_id not in hits)
+    
+    def _fill_job_row(self, row, job):
+        table = self.jobs_table
+        
+        # 操作按钮绑定职位ID，排序、过滤或删除导致行号变化后不必重建
+        if table.cellWidget(row, 5) is None:
+            action_btn = QPushButton("管理")
+            action_btn.clicked.connect(lambda checked, job_id=job["id"]: self.manage_job(job_id))
+            table.setCellWidget(row, 5, action_btn)
+        
+        # 职位名称、薪资、地点、状态、发布日期
+        status_color = {"招聘中": "#34c759", "暂停": "#ff9500"}.get(job.get("status"))
+        self._row_items["jobs"][job["id"]] = self._write_cells(table, row, [
+            (job.get("title", "未知"), None),
+            (job.get("salary", ""), None),
+            (job.get("location", ""), None),
+            (job.get("status", "未知"), status_color),
+            (job.get("created", ""), None)
+        ])
+    
     def refresh_jobs(self):
-        """刷新职位表格"""
+        """刷新职位表格（保留滚动位置和选中行）"""
+        restore = self._preserve_view(self.jobs_table)
         self.jobs_table.setRowCount(0)
+        self._row_items["jobs"] = {}
         
-        for i, job in enumerate(self.data_manager.jobs):
-            self.jobs_table.insertRow(i)
-            
-            # 职位名称
-            self.jobs_table.setItem(i, 0, QTableWidgetItem(job.get("title", "未知")))
-            
-            # 薪资
-            self.jobs_table.setItem(i, 1, QTableWidgetItem(job.get("salary", "")))
-            
-            # 地点
-            self.jobs_table.setItem(i, 2, QTableWidgetItem(job.get("location", "")))
-            
-            # 状态
-            status_item = QTableWidgetItem(job.get("status", "未知"))
-            if job.get("status") == "招聘中":
-                status_item.setForeground(QColor("#34c759"))
-            elif job.get("status") == "暂停":
-                status_item.setForeground(QColor("#ff9500"))
-            self.jobs_table.setItem(i, 3, status_item)
-            
-            # 发布日期
-            self.jobs_table.setItem(i, 4, QTableWidgetItem(job.get("created", "")))
-            
-            # 操作按钮
-            action_btn = QPushButton("管理")
-            action_btn.clicked.connect(lambda checked, idx=i: self.manage_job(idx))
-            self.jobs_table.setCellWidget(i, 5, action_btn)
+        with self._unsorted(self.jobs_table):
+            for i, job in enumerate(self.data_manager.jobs):
+                self.jobs_table.insertRow(i)
+                self._fill_job_row(i, job)
         
-        # 更新职位下拉框
-        self.job_combo.clear()
-        for job in self.data_manager.jobs:
-            self.job_combo.addItem(f"{job.get('title', '未知')} - {job.get('location', '')}")
+        self.filter_jobs(self.job_search.text())
+        restore()
+        self.populate_job_picker()
+    
+    def populate_job_picker(self):
+        """按输入的关键词从检索索引取最多 JOB_PICKER_LIMIT 个招聘中职位填入匹配页的下拉框"""
+        combo = self.job_combo
+        line_edit = combo.lineEdit()
+        text, cursor = line_edit.text(), line_edit.cursorPosition()
+        current = combo.currentData()
+        # 正在输入关键词（输入框文字不是选中职位的名称）时，重新填充后保留输入
+        typing = bool(text) and (combo.currentIndex() < 0 or text != combo.itemText(combo.currentIndex()))
+        jobs = self.data_manager.suggest("jobs", self._job_query, JOB_PICKER_LIMIT, status=OPEN_JOB_STATUS)
+        
+        combo.blockSignals(True)
+        combo.clear()
+        for job in jobs:
+            combo.addItem(f"{job.get('title', '未知')} - {job.get('location', '')}", job["id"])
+        index = combo.findData(current) if current is not None else -1
+        if index < 0 and not typing and combo.count():
+            index = 0
+        combo.setCurrentIndex(index)
+        combo.blockSignals(False)
+        if typing:
+            line_edit.setText(text)
+            line_edit.setCursorPosition(cursor)
+            if line_edit.hasFocus():
+                self.job_completer.complete()
+    
+    def on_job_query_edited(self, text):
+        """输入框文字变化: 停止输入 JOB_PICKER_DELAY_MS 后再检索"""
+        self._job_query = text
+        self.job_picker_timer.start()
+    
+    def filter_jobs(self, text):
+        """按搜索关键词隐藏不匹配的职位行"""
+        self._filter_rows("jobs", text)
+    
+    def _filter_rows(self, name, text):
+        """按记录ID找到各行，隐藏检索不到的记录（与表格排序无关）"""
+        table = self._tables[name]
+        records = getattr(self.data_manager, name)
+        ids = {r["id"] for r in self.data_manager.search(name, text, len(records))} if text.strip() else None
+        self._search_hits[name] = ids
+        for record_id, item in self._row_items[name].items():
+            table.setRowHidden(table.row(item), ids is not None and record_id not in ids)
+    
+    @classmethod
+    def _write_cells(cls, table, row, cells):
+        """按列写入一行的 (文字, 颜色)，返回第一列的单元格
+
+        表格按某列排序时最后写排序列: 写入排序列后 Qt 只把这一行移到排好序的位置，不会重排整个表格。
+        """
+        header = table.horizontalHeader()
+        sort_column = header.sortIndicatorSection() if table.isSortingEnabled() and header is not None else -1
+        columns = [c for c in range(len(cells)) if c != sort_column]
+        if 0 <= sort_column < len(cells):
+            columns.append(sort_column)
+        items = {}
+        for column in columns:
+            text, color = cells[column]
+            items[column] = cls._set_cell(table, row, column, text, color)
+        return items[0]
+    
+    @staticmethod
+    @contextmanager
+    def _unsorted(table):
+        """整表填充期间暂停排序，填完后按原排序列排一次"""
+        sorting = table.isSortingEnabled()
+        table.setSortingEnabled(False)
+        try:
+            yield table
+        finally:
+            table.setSortingEnabled(sorting)
+    
+    def _fill_candidate_row(self, row, candidate):
+        skills = candidate.get("skills", [])
+        skills_text = ", ".join(skills[:3]) + ("..." if len(skills) > 3 else "")
+        self._row_items["candidates"][candidate["id"]] = self._write_cells(self.candidates_table, row, [
+            (candidate.get("name", "未知"), None),
+            (skills_text, None),
+            (f"{candidate.get('experience', 0)}年", None),
+            (f"{candidate.get('expected_salary', 0)}元/天", None),
+            (candidate.get("status", "未知"), None)
+        ])
     
     def refresh_candidates(self):
-        """刷新候选人表格"""
+        """刷新候选人表格（保留滚动位置和选中行）"""
+        restore = self._preserve_view(self.candidates_table)
         self.candidates_table.setRowCount(0)
+        self._row_items["candidates"] = {}
         
-        for i, candidate in enumerate(self.data_manager.candidates):
-            self.candidates_table.insertRow(i)
-            
-            self.candidates_table.setItem(i, 0, QTableWidgetItem(candidate.get("name", "未知")))
-            
-            skills = candidate.get("skills", [])
-            skills_text = ", ".join(skills[:3]) + ("..." if len(skills) > 3 else "")
-            self.candidates_table.setItem(i, 1, QTableWidgetItem(skills_text))
-            
-            self.candidates_table.setItem(i, 2, QTableWidgetItem(f"{candidate.get('experience', 0)}年"))
-            self.candidates_table.setItem(i, 3, QTableWidgetItem(f"{candidate.get('expected_salary', 0)}元/天"))
-            
-            status_item = QTableWidgetItem(candidate.get("status", "未知"))
-            self.candidates_table.setItem(i, 4, status_item)
+        with self._unsorted(self.candidates_table):
+            for i, candidate in enumerate(self.data_manager.candidates):
+                self.candidates_table.insertRow(i)
+                self._fill_candidate_row(i, candidate)
+        
+        self.filter_candidates(self.candidate_search.text())
+        restore()
+    
+    def filter_candidates(self, text):
+        """按搜索关键词隐藏不匹配的候选人行"""
+        self._filter_rows("candidates", text)
+    
+    def _fill_contract_row(self, i, row):
+        table = self.contracts_table
+        
+        # 合同编号
+        self._row_items["contracts"][row["id"]] = self._set_cell(table, i, 0, row["id"])
+        
+        # 职位名称和候选人姓名取自合同视图
+        self._set_cell(table, i, 1, row["job_title"])
+        self._set_cell(table, i, 2, row["candidate_name"])
+        
+        # 期限
+        self._set_cell(table, i, 3, f"{row['start_date'] or ''} 至 {row['end_date'] or ''}")
+        
+        # 状态
+        self._set_cell(table, i, 4, row["status"] or "未知")
+        
+        # 操作按钮
+        if table.cellWidget(i, 5) is None:
+            action_btn = QPushButton("查看")
+            action_btn.clicked.connect(lambda checked, contract_id=row["id"]: self.view_contract(contract_id))
+            table.setCellWidget(i, 5, action_btn)
+    
+    def sync_contract_row(self, contract_id):
+        """按合同视图的当前内容新增、更新或移除一行"""
+        table = self.contracts_table
+        view_row = self.data_manager.contract_row(contract_id)
+        row = self._row_of("contracts", contract_id)
+        if view_row is None:
+            if row >= 0:
+                table.removeRow(row)
+                del self._row_items["contracts"][contract_id]
+            return
+        if row < 0:
+            row = table.rowCount()
+            table.insertRow(row)
+        self._fill_contract_row(row, view_row)
     
     def refresh_contracts(self):
-        """刷新合同表格"""
+        """刷新合同表格（保留滚动位置和选中行）"""
+        restore = self._preserve_view(self.contracts_table)
         self.contracts_table.setRowCount(0)
+        self._row_items["contracts"] = {}
         
-        for i, contract in enumerate(self.data_manager.contracts):
+        for i, row in enumerate(self.data_manager.contract_rows()):
             self.contracts_table.insertRow(i)
-            
-            # 合同编号
-            self.contracts_table.setItem(i, 0, QTableWidgetItem(contract.get("id", "")))
-            
-            # 查找职位名称
-            job_name = "未知"
-            for job in self.data_manager.jobs:
-                if job.get("id") == contract.get("job_id"):
-                    job_name = job.get("title", "未知")
-                    break
-            
-            # 查找候选人名称
-            candidate_name = "未知"
-            for candidate in self.data_manager.candidates:
-                if candidate.get("id") == contract.get("candidate_id"):
-                    candidate_name = candidate.get("name", "未知")
-                    break
-            
-            self.contracts_table.setItem(i, 1, QTableWidgetItem(job_name))
-            self.contracts_table.setItem(i, 2, QTableWidgetItem(candidate_name))
-            
-            # 期限
-            period = f"{contract.get('start_date', '')} 至 {contract.get('end_date', '')}"
-            self.contracts_table.setItem(i, 3, QTableWidgetItem(period))
-            
-            # 状态
-            status_item = QTableWidgetItem(contract.get("status", "未知"))
-            self.contracts_table.setItem(i, 4, status_item)
-            
-            # 操作按钮
-            action_btn = QPushButton("查看")
-            action_btn.clicked.connect(lambda checked, idx=i: self.view_contract(idx))
-            self.contracts_table.setCellWidget(i, 5, action_btn)
+            self._fill_contract_row(i, row)
+        restore()
     
     def update_status_bar(self):
         """更新状态栏"""
@@ -802,8 +942,45 @@ class FlexWorkApp(QMainWindow):
         
         self.status_bar.setText(
             f"就绪 | 职位: {total_jobs} | 候选人: {total_candidates} | 合同: {total_contracts}"
+            + (f" | {self.save_status}" if self.save_status else "")
         )
     
+    def autosave(self):
+        """把待保存的集合交给后台线程写入（上一次写入未完成时稍后再试）"""
+        if self._save_thread is not None and self._save_thread.is_alive():
+            self.save_timer.start()
+            return
+        snapshot = self.data_manager.dirty_snapshot()
+        if not snapshot:
+            return
+        self.save_status = "正在保存..."
+        self.update_status_bar()
+        self._save_thread = threading.Thread(target=self._write_snapshot, args=(snapshot,), daemon=True)
+        self._save_thread.start()
+    
+    def _write_snapshot(self, snapshot):
+        """后台线程: 写入快照并通知界面"""
+        start = time.perf_counter()
+        failed = self.data_manager.write_snapshot(snapshot)
+        self.save_finished.emit(list(snapshot), (time.perf_counter() - start) * 1000, failed)
+    
+    def on_save_finished(self, names, elapsed_ms, failed):
+        """在状态栏显示保存结果和耗时"""
+        saved = [COLLECTION_NAMES.get(name, name) for name in names if name not in failed]
+        if failed:
+            self.save_status = f"保存失败: {'、'.join(COLLECTION_NAMES.get(name, name) for name in failed)}"
+            self.save_timer.start()
+        else:
+            self.save_status = f"已保存{'、'.join(saved)} {elapsed_ms:.0f}ms"
+        self.update_status_bar()
+    
+    def flush_saves(self):
+        """等待后台写入结束并同步保存剩余的修改（只写有修改的集合）"""
+        self.save_timer.stop()
+        if self._save_thread is not None:
+            self._save_thread.join()
+        self.data_manager.flush()
+    
     # ===== 功能实现 =====
     
     def show_new_job_dialog(self):
@@ -814,8 +991,6 @@ class FlexWorkApp(QMainWindow):
             job_id = self.data_manager.add_job(job_data)
             
             QMessageBox.information(self, "成功", f"职位发布成功！\n职位ID: {job_id}")
-            self.refresh_jobs()
-            self.update_status_bar()
     
     def show_new_candidate_dialog(self):
         """显示添加候选人对话框"""
@@ -844,10 +1019,61 @@ class FlexWorkApp(QMainWindow):
             "email": ""
         }
         
+        duplicates = self.data_manager.find_duplicates(candidate_data)
+        if duplicates:
+            names = "\n".join(f"{c.get('name', '')} ({c['id']})" for c in duplicates[:5])
+            reply = QMessageBox.question(
+                self, "可能重复",
+                f"已有相似的候选人:\n{names}\n\n仍然添加吗？",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+        
         candidate_id = self.data_manager.add_candidate(candidate_data)
         QMessageBox.information(self, "成功", f"候选人添加成功！\nID: {candidate_id}")
-        self.refresh_candidates()
-        self.update_status_bar()
+    
+    def merge_duplicate_candidates(self):
+        """把电话或邮箱相同的候选人合并到最早的一条记录；只有姓名+技能相同的组逐组确认"""
+        groups = self.data_manager.duplicate_groups(contact_only=True)
+        review_groups = self.data_manager.review_duplicate_groups()
+        if not groups and not review_groups:
+            QMessageBox.information(self, "合并重复", "没有发现重复的候选人")
+            return
+        
+        merged, removed = 0, 0
+        if groups:
+            count = sum(len(group) - 1 for group in groups)
+            preview = "\n".join("、".join(c.get("name", "") for c in group) for group in groups[:10])
+            reply = QMessageBox.question(
+                self, "合并重复",
+                f"发现 {len(groups)} 组电话或邮箱相同的候选人:\n{preview}\n\n合并后将删除 {count} 条重复记录，合同改为引用保留的记录。是否继续？",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if reply == QMessageBox.StandardButton.Yes:
+                for group in groups:
+                    self.data_manager.merge_candidates(group[0]["id"], [c["id"] for c in group[1:]])
+                merged, removed = len(groups), count
+                review_groups = self.data_manager.review_duplicate_groups()
+        
+        # 只有姓名+技能相同的可能是同名的不同人，逐组确认
+        for group in review_groups:
+            details = "\n".join(f"{c.get('name', '')}  {c.get('phone') or '无电话'}  {c.get('email') or '无邮箱'}  "
+                                 f"{c.get('location') or ''}（{c['id']}）" for c in group)
+            reply = QMessageBox.question(
+                self, "确认重复",
+                f"以下候选人姓名和技能相同，是否为同一人？\n{details}\n\n选择“是”将合并为第一条记录。",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel
+            )
+            if reply == QMessageBox.StandardButton.Cancel:
+                break
+            if reply == QMessageBox.StandardButton.Yes:
+                self.data_manager.merge_candidates(group[0]["id"], [c["id"] for c in group[1:]])
+                merged += 1
+                removed += len(group) - 1
+        
+        if merged:
+            QMessageBox.information(self, "合并重复", f"已合并 {merged} 组，删除 {removed} 条重复记录")
     
     def show_new_contract_dialog(self):
         """显示新建合同对话框"""
@@ -861,8 +1087,6 @@ class FlexWorkApp(QMainWindow):
             contract_id = self.data_manager.add_contract(contract_data)
             
             QMessageBox.information(self, "成功", f"合同创建成功！\n合同ID: {contract_id}")
-            self.refresh_contracts()
-            self.update_status_bar()
     
     def start_real_matching(self):
         """开始真实的智能匹配"""
@@ -874,97 +1098,74 @@ class FlexWorkApp(QMainWindow):
             QMessageBox.warning(self, "错误", "请先添加候选人！")
             return
 
-        selected_index = self.job_combo.currentIndex()
-        if selected_index < 0:
+        # 下拉框的选项数据为职位ID；输入了关键词但没有从候选中选择时取第一个候选
+        if self.job_picker_timer.isActive():
+            self.job_picker_timer.stop()
+            self.populate_job_picker()
+        index = self.job_combo.currentIndex()
+        if index < 0 or self.job_combo.currentText() != self.job_combo.itemText(index):
+            index = 0
+        selected_job = self.data_manager.get_record("jobs", self.job_combo.itemData(index))
+        if selected_job is None:
             QMessageBox.warning(self, "错误", "请先选择一个职位！")
             return
 
-        # 清空结果表格
+        # 分块打分，每打完一块就把目前的前 MATCH_LIMIT 名显示出来（打分规则与网页版共用，见 scoring.py）
         self.match_table.setRowCount(0)
+        self.match_results = []
+        self._match_stream = stream_matches(selected_job, candidate_matrix(self.data_manager), MATCH_LIMIT,
+                                            busy=busy_candidates(self.data_manager, selected_job),
+                                            time_budget=MATCH_TIME_BUDGET)
+        self.match_progress.setFormat(f"{selected_job.get('title', '未知')}: 已评估 %v / %m 名候选人")
+        self.match_progress.setValue(0)
+        self.match_progress.show()
+        self.match_timer.start()
 
-        # 获取选中的职位
-        selected_job = self.data_manager.jobs[selected_index]
-
-        QMessageBox.information(self, "开始匹配", f"开始匹配职位: {selected_job.get('title', '未知')}")
-
-        # 解析职位薪资（兼容 "200-500元/天" 或 "200-500"）
-        job_salary = str(selected_job.get("salary", "0-0"))
-        try:
-            job_salary_clean = job_salary.replace("元/天", "").replace(" ", "")
-            parts = job_salary_clean.split("-")
-            min_salary = int(parts[0]) if parts and parts[0].isdigit() else 0
-            max_salary = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else max(min_salary, 0)
-        except:
-            min_salary, max_salary = 0, 0
-
-        results = []
-        for candidate in self.data_manager.candidates:
-            # 技能匹配分数（按职位要求技能命中率）
-            job_skills = selected_job.get("skills") or []
-            if isinstance(job_skills, str):
-                job_skills = [s.strip() for s in job_skills.split(",") if s.strip()]
-            cand_skills = candidate.get("skills", []) or []
-            if job_skills:
-                intersect = set(s.lower() for s in cand_skills) & set(s.lower() for s in job_skills)
-                skill_score = (len(intersect) / len(job_skills)) * 100
-            else:
-                skill_score = 50  # 无明确要求时给中性分
-
-            # 薪资匹配分数（越接近职位范围分数越高）
-            cand_salary = candidate.get("expected_salary", 0)
-            salary_score = 0
-            if max_salary > 0:
-                if min_salary <= cand_salary <= max_salary:
-                    salary_score = 100
-                else:
-                    # 根据偏离比例降低分数
-                    if cand_salary < min_salary and min_salary > 0:
-                        diff = (min_salary - cand_salary) / min_salary
-                    elif cand_salary > max_salary:
-                        diff = (cand_salary - max_salary) / max_salary if max_salary > 0 else 1
-                    else:
-                        diff = 1
-                    salary_score = max(0, 100 * (1 - diff))
-            else:
-                salary_score = 50
-
-            total_score = skill_score * 0.7 + salary_score * 0.3
-
-            results.append({
-                "candidate": candidate,
-                "score": int(round(total_score)),
-                "skill_score": int(round(skill_score)),
-                "salary_score": int(round(salary_score))
-            })
-
-        results.sort(key=lambda x: x["score"], reverse=True)
+    def next_match_batch(self):
+        """打下一块候选人并刷新结果表格，在事件循环的间隙逐块执行，界面不会卡住"""
+        progress = next(self._match_stream, None) if self._match_stream is not None else None
+        if progress is None:
+            if self._match_stream is not None and self.match_progress.value() < self.match_progress.maximum():
+                self.match_progress.setFormat("已超时: 显示已评估的 %v / %m 名候选人中的最佳结果")
+            self._match_stream = None
+            return
+        self.show_match_results(progress.results)
+        self.match_progress.setMaximum(max(progress.total, 1))
+        self.match_progress.setValue(progress.scanned)
+        self.match_timer.start()
 
-        # 显示结果
-        self.match_table.setRowCount(len(results))
-        for i, result in enumerate(results):
+    def show_match_results(self, matches):
+        """显示目前的匹配结果；候选人没变的行只更新文字"""
+        self.match_results = [
+            {
+                "candidate": match["candidate"],
+                "score": int(round(match["score"])),
+                "skill_score": int(round(match["skill_score"])),
+                "salary_score": int(round(match["salary_score"]))
+            }
+            for match in matches
+        ]
+        self.match_table.setRowCount(len(self.match_results))
+        for i, result in enumerate(self.match_results):
             candidate = result["candidate"]
 
-            self.match_table.setItem(i, 0, QTableWidgetItem(str(i + 1)))
-            self.match_table.setItem(i, 1, QTableWidgetItem(candidate.get("name", "未知")))
+            self._set_cell(self.match_table, i, 0, i + 1)
+            self._set_cell(self.match_table, i, 1, candidate.get("name", "未知"))
 
-            score_item = QTableWidgetItem(f"{result['score']}%")
-            if result["score"] >= 80:
-                score_item.setForeground(QColor("#34c759"))
-            elif result["score"] >= 60:
-                score_item.setForeground(QColor("#ff9500"))
-            else:
-                score_item.setForeground(QColor("#ff3b30"))
-            self.match_table.setItem(i, 2, score_item)
+            score_color = "#34c759" if result["score"] >= 80 else "#ff9500" if result["score"] >= 60 else "#ff3b30"
+            self._set_cell(self.match_table, i, 2, f"{result['score']}%", score_color)
 
-            contact_btn = QPushButton("联系")
-            contact_btn.clicked.connect(lambda checked, idx=i: self.contact_candidate(idx))
-            self.match_table.setCellWidget(i, 3, contact_btn)
+            button = self.match_table.cellWidget(i, 3)
+            if button is None or button.property("candidate_id") != candidate.get("id"):
+                contact_btn = QPushButton("联系")
+                contact_btn.setProperty("candidate_id", candidate.get("id"))
+                contact_btn.clicked.connect(lambda checked, cand_id=candidate.get("id"): self.contact_candidate(cand_id))
+                self.match_table.setCellWidget(i, 3, contact_btn)
     
-    def manage_job(self, job_index):
+    def manage_job(self, job_id):
         """管理职位"""
-        if 0 <= job_index < len(self.data_manager.jobs):
-            job = self.data_manager.jobs[job_index]
-            
+        row = self._row_of("jobs", job_id)
+        if self.data_manager.get_record("jobs", job_id) is not None and row >= 0:
             # 创建管理菜单
             menu = QMenu(self)
             
@@ -973,31 +1174,33 @@ class FlexWorkApp(QMainWindow):
             delete_action = menu.addAction("🗑️ 删除")
             
             action = menu.exec(self.jobs_table.mapToGlobal(
-                self.jobs_table.visualItemRect(self.jobs_table.item(job_index, 0)).bottomLeft()
+                self.jobs_table.visualItemRect(self.jobs_table.item(row, 0)).bottomLeft()
             ))
             
             if action == edit_action:
-                self.edit_job(job_index)
+                self.edit_job(job_id)
             elif action == pause_action:
-                self.toggle_job_status(job_index)
+                self.toggle_job_status(job_id)
             elif action == delete_action:
-                self.delete_job(job_index)
+                self.delete_job(job_id)
     
-    def edit_job(self, job_index):
+    def edit_job(self, job_id):
         """编辑职位"""
-        job = self.data_manager.jobs[job_index]
+        job = self.data_manager.get_record("jobs", job_id)
+        if job is None:
+            return
         dialog = JobDialog(self, job)
         if dialog.exec():
             # 更新职位数据
             new_data = dialog.get_data()
-            self.data_manager.jobs[job_index].update(new_data)
-            self.data_manager.save_json(self.data_manager.jobs_file, self.data_manager.jobs)
-            self.refresh_jobs()
+            self.data_manager.update_record("jobs", job_id, new_data)
             QMessageBox.information(self, "成功", "职位更新成功！")
     
-    def toggle_job_status(self, job_index):
+    def toggle_job_status(self, job_id):
         """切换职位状态"""
-        job = self.data_manager.jobs[job_index]
+        job = self.data_manager.get_record("jobs", job_id)
+        if job is None:
+            return
         current_status = job.get("status", "招聘中")
         
         if current_status == "招聘中":
@@ -1005,13 +1208,10 @@ class FlexWorkApp(QMainWindow):
         else:
             new_status = "招聘中"
         
-        job["status"] = new_status
-        self.data_manager.save_json(self.data_manager.jobs_file, self.data_manager.jobs)
-        self.refresh_jobs()
-        
+        self.data_manager.update_record("jobs", job_id, {"status": new_status})
         QMessageBox.information(self, "成功", f"职位状态已更新为: {new_status}")
     
-    def delete_job(self, job_index):
+    def delete_job(self, job_id):
         """删除职位"""
         reply = QMessageBox.question(
             self, "确认删除",
@@ -1020,28 +1220,48 @@ class FlexWorkApp(QMainWindow):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            del self.data_manager.jobs[job_index]
-            self.data_manager.save_json(self.data_manager.jobs_file, self.data_manager.jobs)
-            self.refresh_jobs()
-            self.update_status_bar()
+            self.data_manager.delete_record("jobs", job_id)
             QMessageBox.information(self, "成功", "职位已删除！")
     
-    def contact_candidate(self, candidate_index):
-        """联系候选人"""
-        QMessageBox.information(self, "联系候选人", "联系功能开发中...\n请使用电话或邮件联系候选人。")
+    def contact_candidate(self, candidate_id):
+        """联系候选人: 显示联系方式和最适合该候选人的招聘中职位"""
+        candidate = self.data_manager.get_record("candidates", candidate_id)
+        if candidate is None:
+            return
+        
+        lines = [
+            f"📞 电话: {candidate.get('phone') or '无'}",
+            f"📧 邮箱: {candidate.get('email') or '无'}",
+            "",
+            "🎯 推荐职位:"
+        ]
+        recommendations = recommend_jobs(candidate, job_matrix(self.data_manager), limit=5)
+        for i, rec in enumerate(recommendations, 1):
+            job = rec["job"]
+            lines.append(f"{i}. {job.get('title', '未知')} - {job.get('location', '')}  匹配度 {int(round(rec['score']))}%")
+        if not recommendations:
+            lines.append("暂无合适的招聘中职位")
+        
+        QMessageBox.information(self, f"联系候选人 - {candidate.get('name', '未知')}", "\n".join(lines))
     
-    def view_contract(self, contract_index):
+    def view_contract(self, contract_id):
         """查看合同详情"""
-        if 0 <= contract_index < len(self.data_manager.contracts):
-            contract = self.data_manager.contracts[contract_index]
+        contract = self.data_manager.get_record("contracts", contract_id)
+        if contract is not None:
+            row = self.data_manager.contract_row(contract_id) or {}
+            work_days, amount = row.get("work_days", 0), row.get("total_amount", 0)
             
             details = f"""
             📄 合同详情
             {'='*30}
             合同编号: {contract.get('id', '未知')}
+            职位: {row.get('job_title', '未知')}
+            候选人: {row.get('candidate_name', '未知')}
             开始日期: {contract.get('start_date', '未知')}
             结束日期: {contract.get('end_date', '未知')}
             约定薪资: {contract.get('salary', '未知')}元/天
+            工作日数: {work_days}天
+            合同金额: ¥{amount:,}
             付款方式: {contract.get('payment_method', '未知')}
             合同状态: {contract.get('status', '未知')}
             
@@ -1061,18 +1281,7 @@ class FlexWorkApp(QMainWindow):
         if file_path:
             try:
                 # 导出职位数据
-                with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(["职位ID", "职位名称", "薪资", "地点", "状态", "发布日期"])
-                    for job in self.data_manager.jobs:
-                        writer.writerow([
-                            job.get("id", ""),
-                            job.get("title", ""),
-                            job.get("salary", ""),
-                            job.get("location", ""),
-                            job.get("status", ""),
-                            job.get("created", "")
-                        ])
+                self.data_manager.export_jobs_csv(file_path)
                 
                 QMessageBox.information(self, "导出成功", f"数据已导出到:\n{file_path}")
             except Exception as e:
@@ -1082,9 +1291,6 @@ class FlexWorkApp(QMainWindow):
         """关闭应用时的处理"""
         if a0 is None:
             return
-        # 保存所有数据
-        self.data_manager.save_all()
-        
         reply = QMessageBox.question(
             self, "确认退出",
             "确定要退出灵活用工管理平台吗？",
@@ -1092,6 +1298,9 @@ class FlexWorkApp(QMainWindow):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
+            # 保存尚未写入的修改，没有修改的集合不重写
+            self.flush_saves()
+            self._unsubscribe()
             a0.accept()
         else:
             a0.ignore()
@@ -1104,8 +1313,12 @@ def main():
     app.setApplicationName("灵活用工管理平台")
     app.setApplicationDisplayName("灵活用工管理平台")
     
-    # 创建窗口
-    window = FlexWorkApp()
+    # 创建窗口（数据文件损坏时提示后退出，不用默认数据覆盖它）
+    try:
+        window = FlexWorkApp()
+    except DataFileError as e:
+        QMessageBox.critical(None, "数据加载失败", f"{e}\n\n请修复或移走该文件后重新启动。")
+        sys.exit(1)
     window.show()
     
     sys.exit(app.exec())
@@ -0,0 +1,3 @@
+"""
+性能基准测试 - 在仓库根目录运行: python -m benchmarks.run
+"""
@@ -0,0 +1,239 @@
+"""
+异步 API 服务压测 - 本地并发客户端，统计各接口 p50 / p99 延迟
+
+    python -m benchmarks.loadtest                       # 生成 1 万候选人数据并启动本地服务
+    python -m benchmarks.loadtest --scale 100000 --concurrency 64 --requests 5000
+    python -m benchmarks.loadtest --url http://127.0.0.1:8600   # 压测已在运行的服务
+
+结果写入 benchmarks/results/loadtest-<label>.json。
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from urllib.parse import quote, urlsplit
+
+from benchmarks.run import RESULTS_DIR, git_commit
+from benchmarks.synthetic import generate_dataset, write_dataset
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 接口 -> 请求权重
+MIX = {"stats": 2, "jobs": 3, "match": 4, "search": 3}
+
+SEARCH_TERMS = ["Python", "React", "设计", "测试", "数据分析", "Java", "Figma"]
+
+
+def percentile(values, pct):
+    """最近秩法求百分位"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class Connection:
+    """keep-alive 的最小 HTTP/1.1 客户端连接"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\n\r\n".encode("utf-8"))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("连接已关闭")
+        status = int(status_line.split()[1])
+        length = 0
+        keep_alive = True
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value.strip())
+            elif name.lower() == "connection" and value.strip().lower() == "close":
+                keep_alive = False
+        body = await self.reader.readexactly(length) if length else b""
+        if not keep_alive:
+            self.close()
+        return status, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def build_requests(job_ids, count, seed):
+    """按权重生成请求序列"""
+    rng = random.Random(seed)
+    kinds = rng.choices(list(MIX), weights=list(MIX.values()), k=count)
+    requests = []
+    for kind in kinds:
+        if kind == "stats":
+            path = "/stats"
+        elif kind == "jobs":
+            path = f"/jobs?status={quote('招聘中')}&limit=20&offset={rng.randrange(5) * 20}"
+        elif kind == "match":
+            path = f"/jobs/{rng.choice(job_ids)}/match?limit=10"
+        else:
+            path = f"/search?q={quote(rng.choice(SEARCH_TERMS))}&limit=10"
+        requests.append((kind, path))
+    return requests
+
+
+async def run_load(host, port, concurrency, total, seed):
+    """并发发送请求，返回各接口延迟（毫秒）"""
+    conn = Connection(host, port)
+    status, body = await conn.request("/jobs?limit=500")
+    conn.close()
+    if status != 200:
+        raise RuntimeError(f"获取职位列表失败: HTTP {status}")
+    job_ids = [j["id"] for j in json.loads(body)["items"]] or ["job_001"]
+
+    queue = asyncio.Queue()
+    for item in build_requests(job_ids, total, seed):
+        queue.put_nowait(item)
+
+    latencies = {kind: [] for kind in MIX}
+    errors = {kind: 0 for kind in MIX}
+
+    async def worker():
+        conn = Connection(host, port)
+        try:
+            while True:
+                try:
+                    kind, path = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                start = time.perf_counter()
+                try:
+                    status, _ = await conn.request(path)
+                    ok = status < 400
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    conn.close()
+                    ok = False
+                latencies[kind].append((time.perf_counter() - start) * 1000)
+                if not ok:
+                    errors[kind] += 1
+        finally:
+            conn.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port, process, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("API 服务启动失败")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("等待 API 服务启动超时")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="异步 API 服务压测")
+    parser.add_argument("--url", default=None, help="已运行服务的地址；不指定时生成数据并启动本地服务")
+    parser.add_argument("--scale", type=int, default=10000, help="本地服务使用的合成数据规模")
+    parser.add_argument("--workers", type=int, default=None, help="本地服务的打分进程数")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--label", default=None)
+    parser.add_argument("--output", default=RESULTS_DIR)
+    args = parser.parse_args(argv)
+
+    process = None
+    data_dir = None
+    try:
+        if args.url:
+            url = urlsplit(args.url)
+            host, port = url.hostname, url.port or 80
+        else:
+            data_dir = tempfile.mkdtemp(prefix="flexwork_loadtest_")
+            write_dataset(data_dir, generate_dataset(args.scale, args.seed))
+            host, port = "127.0.0.1", _free_port()
+            command = [sys.executable, os.path.join(ROOT, "api_server.py"),
+                       "--port", str(port), "--data-dir", data_dir]
+            if args.workers:
+                command += ["--workers", str(args.workers)]
+            process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL)
+            _wait_for_port(port, process)
+
+        latencies, errors, elapsed = asyncio.run(
+            run_load(host, port, args.concurrency, args.requests, args.seed)
+        )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        if data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    label = args.label or git_commit()
+    report = {
+        "label": label,
+        "commit": git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "scale": None if args.url else args.scale,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "seconds": elapsed,
+        "throughput": args.requests / elapsed,
+        "endpoints": {}
+    }
+    print(f"{args.requests} 个请求，并发 {args.concurrency}，耗时 {elapsed:.2f}s，"
+          f"吞吐 {report['throughput']:.0f} req/s")
+    for kind, values in latencies.items():
+        stats = {
+            "count": len(values),
+            "errors": errors[kind],
+            "p50_ms": percentile(values, 50),
+            "p90_ms": percentile(values, 90),
+            "p99_ms": percentile(values, 99),
+            "max_ms": max(values) if values else 0.0
+        }
+        report["endpoints"][kind] = stats
+        print(f"  {kind:<8} n={stats['count']:<6} 错误={stats['errors']:<4} "
+              f"p50={stats['p50_ms']:>8.2f} ms  p99={stats['p99_ms']:>8.2f} ms")
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"loadtest-{label}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+并行批量匹配扩展性测试 - 1 到 N 个进程批量匹配的耗时和加速比
+
+    python -m benchmarks.parallel                              # 10 万候选人，1000 个职位
+    python -m benchmarks.parallel --scale 1000000 --jobs 5000 --workers 1,2,4,8,16
+
+单进程基线在当前进程直接打分（含档期检查）；并行结果与基线逐个职位核对，确保一致。
+结果写入 benchmarks/results/parallel-<label>.json。
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from data_store import DataStore
+from matching import busy_candidates, candidate_matrix
+from parallel_matching import ParallelMatcher
+from scoring import get_scorer
+from benchmarks.run import RESULTS_DIR, git_commit
+from benchmarks.synthetic import generate_dataset, write_dataset
+
+
+def _signature(results):
+    return [(count, [id(r["candidate"]) for r in items]) for count, items in results]
+
+
+def main(argv=None):
+    cpus = os.cpu_count() or 1
+    default_workers = ",".join(str(n) for n in sorted({1, 2, 4, 8, 16, cpus}) if n <= cpus)
+
+    parser = argparse.ArgumentParser(description="并行批量匹配扩展性测试")
+    parser.add_argument("--scale", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--jobs", type=int, default=1000, help="批量匹配的职位数（不足时循环使用）")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--workers", default=default_workers, help="逗号分隔的进程数")
+    parser.add_argument("--label", default=None)
+    parser.add_argument("--output", default=RESULTS_DIR)
+    args = parser.parse_args(argv)
+
+    data_dir = tempfile.mkdtemp(prefix="flexwork_parallel_")
+    try:
+        write_dataset(data_dir, generate_dataset(args.scale, args.seed))
+        store = DataStore(data_dir)
+        matrix = candidate_matrix(store)
+        pool = store.jobs
+        jobs = [pool[i % len(pool)] for i in range(args.jobs)]
+        busy = [busy_candidates(store, job) for job in jobs]
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    scorer = get_scorer()
+    start = time.perf_counter()
+    baseline = [scorer.top(job, matrix, args.k, busy_rows=matrix.rows_of(ids) if ids is not None else None)
+                for job, ids in zip(jobs, busy)]
+    serial_seconds = time.perf_counter() - start
+    print(f"{matrix.size:,} 个候选人 × {len(jobs)} 个职位（{cpus} 核）")
+    print(f"  当前进程    {serial_seconds:>8.2f} s")
+
+    rows = []
+    for workers in (int(n) for n in args.workers.split(",") if n.strip()):
+        start = time.perf_counter()
+        with ParallelMatcher(matrix, workers) as matcher:
+            matcher.warm_up()
+            startup_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            results = matcher.match_many(jobs, args.k, busy=busy)
+            seconds = time.perf_counter() - start
+        if _signature(results) != _signature(baseline):
+            raise RuntimeError(f"{workers} 个进程的匹配结果与单进程不一致")
+        row = {
+            "workers": workers,
+            "seconds": seconds,
+            "startup_seconds": startup_seconds,
+            "speedup": serial_seconds / seconds,
+            "jobs_per_second": len(jobs) / seconds
+        }
+        rows.append(row)
+        print(f"  {workers:>3} 个进程  {seconds:>8.2f} s  加速比 x{row['speedup']:.2f}  "
+              f"{row['jobs_per_second']:.0f} 职位/s  启动 {startup_seconds:.2f} s")
+
+    label = args.label or git_commit()
+    report = {
+        "label": label,
+        "commit": git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "cpus": cpus,
+        "scale": args.scale,
+        "candidates": matrix.size,
+        "jobs": len(jobs),
+        "k": args.k,
+        "serial_seconds": serial_seconds,
+        "results": rows
+    }
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"parallel-{label}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+候选人粗筛召回率评估 - 与全量精确打分对比 recall@K 和单次匹配耗时
+
+    python -m benchmarks.recall                                  # 10 万候选人
+    python -m benchmarks.recall --scale 1000000 --shortlists 1000,2000,5000 --nprobes 8,16,32
+
+两种召回率:
+- id 召回率: 近似结果前 K 名与精确结果前 K 名的重合比例
+- 分数召回率: 近似结果前 K 名中分数不低于精确结果第 K 名的比例（分数相同的候选人很多时更有意义）
+
+结果写入 benchmarks/results/recall-<label>.json。
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from data_store import DataStore
+from matching import candidate_matrix
+from retrieval import CandidateRetriever, train_from_data_dir
+from scoring import get_scorer
+from benchmarks.run import RESULTS_DIR, git_commit
+from benchmarks.synthetic import generate_dataset, write_dataset
+
+
+def evaluate(scorer, matrix, retriever, jobs, k, shortlist, nprobe):
+    """一组参数下的平均召回率和耗时"""
+    id_recall = score_recall = exact_seconds = approx_seconds = 0.0
+    for job in jobs:
+        start = time.perf_counter()
+        _, exact = scorer.top(job, matrix, k)
+        exact_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        rows = retriever.shortlist(job, shortlist, nprobe)
+        _, approx = scorer.top(job, matrix.subset(rows), k)
+        approx_seconds += time.perf_counter() - start
+
+        if not exact:
+            id_recall += 1
+            score_recall += 1
+            continue
+        expected_ids = {id(r["candidate"]) for r in exact}
+        kth_score = exact[-1]["score"]
+        id_recall += sum(id(r["candidate"]) in expected_ids for r in approx) / len(exact)
+        score_recall += sum(r["score"] >= kth_score - 1e-9 for r in approx) / len(exact)
+
+    count = len(jobs)
+    return {
+        "shortlist": shortlist,
+        "nprobe": nprobe,
+        "id_recall": id_recall / count,
+        "score_recall": score_recall / count,
+        "exact_ms": exact_seconds / count * 1000,
+        "approx_ms": approx_seconds / count * 1000
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="候选人粗筛召回率评估")
+    parser.add_argument("--scale", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--jobs", type=int, default=50, help="参与评估的职位数")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--shortlists", default="500,2000,5000")
+    parser.add_argument("--nprobes", default="8,16,32")
+    parser.add_argument("--dim", type=int, default=32)
+    parser.add_argument("--label", default=None)
+    parser.add_argument("--output", default=RESULTS_DIR)
+    args = parser.parse_args(argv)
+
+    data_dir = tempfile.mkdtemp(prefix="flexwork_recall_")
+    try:
+        write_dataset(data_dir, generate_dataset(args.scale, args.seed))
+        store = DataStore(data_dir)
+
+        start = time.perf_counter()
+        embeddings = train_from_data_dir(data_dir, args.dim)
+        train_seconds = time.perf_counter() - start
+
+        matrix = candidate_matrix(store)
+        start = time.perf_counter()
+        retriever = CandidateRetriever(matrix, embeddings)
+        index_seconds = time.perf_counter() - start
+
+        rng = random.Random(args.seed)
+        active = [j for j in store.query("jobs").where(status="招聘中").all() if j.get("skills")]
+        jobs = rng.sample(active, min(args.jobs, len(active)))
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    print(f"{matrix.size:,} 个可匹配候选人，{len(embeddings.vocab)} 个技能，"
+          f"训练 {train_seconds:.2f}s，建索引 {index_seconds:.2f}s（{retriever.index.nlist} 个聚类）")
+    scorer = get_scorer()
+    rows = []
+    for shortlist in (int(s) for s in args.shortlists.split(",")):
+        for nprobe in (int(n) for n in args.nprobes.split(",")):
+            row = evaluate(scorer, matrix, retriever, jobs, args.k, shortlist, nprobe)
+            rows.append(row)
+            print(f"  shortlist={shortlist:<6} nprobe={nprobe:<4} "
+                  f"id召回@{args.k}={row['id_recall']:.3f}  分数召回@{args.k}={row['score_recall']:.3f}  "
+                  f"精确 {row['exact_ms']:.2f} ms  近似 {row['approx_ms']:.2f} ms")
+
+    label = args.label or git_commit()
+    report = {
+        "label": label,
+        "commit": git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "scale": args.scale,
+        "candidates": matrix.size,
+        "k": args.k,
+        "jobs": len(jobs),
+        "train_seconds": train_seconds,
+        "index_seconds": index_seconds,
+        "nlist": retriever.index.nlist,
+        "results": rows
+    }
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"recall-{label}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
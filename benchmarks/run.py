@@ -0,0 +1,233 @@
+"""
+数据层基准测试
+
+用法（在仓库根目录）:
+    python -m benchmarks.run                          # 默认 1k / 10k 规模
+    python -m benchmarks.run --scales 1000,10000,100000,1000000
+    python -m benchmarks.run --compare old.json new.json
+
+每个规模依次测量 load / stats / query / match / recommend / search / export / save / add 的耗时和峰值内存，
+结果写入 benchmarks/results/<label>.json，label 默认为当前 git 提交号。
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from data_store import DataStore
+from matching import MATCHABLE_STATUSES, candidate_matrix, job_matrix, match_candidates, recommend_jobs
+from benchmarks.synthetic import generate_dataset, write_dataset
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# 超过该规模时，写文件类操作只跑一次
+LARGE_SCALE = 100000
+
+# 对比时超过该比例的变慢视为回归
+REGRESSION_THRESHOLD = 1.10
+
+
+def git_commit():
+    """当前 git 提交号，不在仓库中时返回 unknown"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def measure(fn, repeat=3):
+    """多次运行取最快耗时，再单独跑一次记录峰值内存"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": best, "peak_mb": peak / 1024 / 1024, "repeat": repeat}
+
+
+def bench_scale(scale, seed, repeat, match_jobs):
+    """在一个规模上运行全部操作"""
+    dataset = generate_dataset(scale, seed)
+    data_dir = tempfile.mkdtemp(prefix=f"flexwork_bench_{scale}_")
+    io_repeat = 1 if scale >= LARGE_SCALE else repeat
+    ops = {}
+    try:
+        write_dataset(data_dir, dataset)
+        del dataset
+
+        ops["load"] = measure(lambda: DataStore(data_dir), io_repeat)
+        store = DataStore(data_dir)
+
+        ops["stats"] = measure(store.get_stats, repeat)
+
+        ops["query"] = measure(lambda: (
+            store.query("jobs").where(status="招聘中", location="上海").count(),
+            store.query("candidates").where(status=MATCHABLE_STATUSES).count(),
+            store.query("contracts").between("start_date", "2024-01-01", "2024-03-31").all()
+        ), repeat)
+
+        jobs = store.query("jobs").where(status="招聘中").all()[:match_jobs]
+
+        start = time.perf_counter()
+        candidate_matrix(store)
+        matrix_build_seconds = time.perf_counter() - start
+
+        def run_match():
+            for job in jobs:
+                match_candidates(job, candidate_matrix(store), limit=20)
+
+        ops["match"] = measure(run_match, repeat)
+        ops["match"]["matrix_build_seconds"] = matrix_build_seconds
+        ops["match"]["jobs"] = len(jobs)
+        ops["match"]["seconds_per_job"] = ops["match"]["seconds"] / max(len(jobs), 1)
+
+        sample = store.candidates[::max(1, len(store.candidates) // 20)][:20]
+        start = time.perf_counter()
+        job_matrix(store)
+        job_matrix_build_seconds = time.perf_counter() - start
+
+        def run_recommend():
+            for candidate in sample:
+                recommend_jobs(candidate, job_matrix(store), limit=10)
+
+        ops["recommend"] = measure(run_recommend, repeat)
+        ops["recommend"]["candidates"] = len(sample)
+        ops["recommend"]["seconds_per_candidate"] = ops["recommend"]["seconds"] / max(len(sample), 1)
+        ops["recommend"]["job_matrix_build_seconds"] = job_matrix_build_seconds
+
+        queries = ["Python", "react vue", "张", "数据分析", "测试 j"]
+
+        def run_search():
+            for query in queries:
+                store.search("candidates", query)
+                store.search("jobs", query)
+
+        start = time.perf_counter()
+        run_search()
+        index_build_seconds = time.perf_counter() - start
+        ops["search"] = measure(run_search, repeat)
+        ops["search"]["queries"] = len(queries) * 2
+        ops["search"]["index_build_seconds"] = index_build_seconds
+
+        export_path = os.path.join(data_dir, "export.csv")
+        ops["export"] = measure(lambda: store.export_jobs_csv(export_path), io_repeat)
+
+        ops["save"] = measure(store.save_all, io_repeat)
+
+        def run_add():
+            store.add_job({"title": "基准测试职位", "salary": "300-500元/天", "location": "远程",
+                           "skills": ["Python"], "description": "", "status": "招聘中"})
+            store.add_candidate({"name": "基准", "skills": ["Python"], "experience": 1,
+                                 "expected_salary": 300, "status": "可联系", "phone": "", "email": ""})
+            store.add_contract({"job_id": "job_001", "candidate_id": "cand_001",
+                                "start_date": "2024-01-01", "end_date": "2024-02-01",
+                                "salary": 300, "status": "待签署", "total_amount": 0})
+
+        ops["add"] = measure(run_add, io_repeat)
+        ops["add"]["seconds_per_record"] = ops["add"]["seconds"] / 3
+
+        records = {
+            "jobs": len(store.jobs),
+            "candidates": len(store.candidates),
+            "contracts": len(store.contracts)
+        }
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    return {"records": records, "ops": ops}
+
+
+def run(scales, seed, repeat, match_jobs, label, output_dir):
+    """运行所有规模并保存结果"""
+    report = {
+        "label": label,
+        "commit": git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "results": {}
+    }
+
+    for scale in scales:
+        print(f"规模 {scale:,} ...")
+        result = bench_scale(scale, seed, repeat, match_jobs)
+        report["results"][str(scale)] = result
+        for op, data in result["ops"].items():
+            print(f"  {op:<10} {data['seconds'] * 1000:>12.2f} ms  峰值内存 {data['peak_mb']:>9.2f} MB")
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{label}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {path}")
+    return path
+
+
+def compare(old_path, new_path):
+    """对比两次基准结果，返回是否存在回归"""
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+
+    print(f"对比 {old['label']} ({old['commit']}) -> {new['label']} ({new['commit']})")
+    regressed = False
+    for scale, result in new["results"].items():
+        if scale not in old["results"]:
+            continue
+        print(f"规模 {int(scale):,}")
+        for op, data in result["ops"].items():
+            before = old["results"][scale]["ops"].get(op)
+            if not before or not before["seconds"]:
+                continue
+            ratio = data["seconds"] / before["seconds"]
+            flag = ""
+            if ratio > REGRESSION_THRESHOLD:
+                flag = "  ⚠️ 回归"
+                regressed = True
+            print(f"  {op:<10} {before['seconds'] * 1000:>10.2f} ms -> "
+                  f"{data['seconds'] * 1000:>10.2f} ms  x{ratio:.2f}{flag}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="灵活用工平台数据层基准测试")
+    parser.add_argument("--scales", default="1000,10000",
+                        help="逗号分隔的候选人规模，例如 1000,10000,100000,1000000")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--match-jobs", type=int, default=10, help="每个规模参与匹配的职位数")
+    parser.add_argument("--label", default=None, help="结果文件名，默认使用 git 提交号")
+    parser.add_argument("--output", default=RESULTS_DIR)
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="对比两个结果文件")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(*args.compare) else 0
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    run(scales, args.seed, args.repeat, args.match_jobs, args.label or git_commit(), args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Web 版冷启动基准测试
+
+每个页面在全新的 Python 进程中首次渲染，模拟无服务器容器冷启动:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --pages dashboard,matching --repeat 5
+
+需要 streamlit >= 1.28（使用 streamlit.testing 无界面运行 web_app.py）。
+结果写入 benchmarks/results/startup-<label>.json。
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.run import RESULTS_DIR, git_commit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEB_APP = os.path.join(ROOT, "web_app.py")
+
+# 指标名 -> 导航中的页面名称，与 web_app.PAGES 保持一致
+PAGES = {
+    "dashboard": "🏠 仪表板",
+    "jobs": "📋 职位管理",
+    "candidates": "👥 候选人管理",
+    "contracts": "📄 合同管理",
+    "matching": "🎯 智能匹配",
+    "analytics": "📊 数据分析",
+    "settings": "⚙️ 设置"
+}
+
+# 记录首屏渲染后是否已加载的重量级模块
+HEAVY_MODULES = ("pandas", "plotly", "numpy")
+
+
+def child(page_key):
+    """子进程: 冷启动渲染一个页面并输出耗时"""
+    process_start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    import_seconds = time.perf_counter() - process_start
+
+    at = AppTest.from_file(WEB_APP, default_timeout=120)
+    at.session_state["page"] = PAGES[page_key]
+    render_start = time.perf_counter()
+    at.run()
+    render_seconds = time.perf_counter() - render_start
+
+    print(json.dumps({
+        "streamlit_import_seconds": import_seconds,
+        "first_render_seconds": render_seconds,
+        "ok": not at.exception,
+        "heavy_modules": [m for m in HEAVY_MODULES if m in sys.modules]
+    }))
+
+
+def measure_page(page_key, repeat):
+    """多次冷启动一个页面，返回中位数"""
+    runs = []
+    for _ in range(repeat):
+        wall_start = time.perf_counter()
+        output = subprocess.check_output(
+            [sys.executable, "-m", "benchmarks.startup", "--child", page_key],
+            cwd=ROOT, stderr=subprocess.DEVNULL
+        )
+        wall = time.perf_counter() - wall_start
+        run = json.loads(output.decode().strip().splitlines()[-1])
+        run["process_seconds"] = wall
+        runs.append(run)
+
+    return {
+        "first_render_seconds": statistics.median(r["first_render_seconds"] for r in runs),
+        "process_seconds": statistics.median(r["process_seconds"] for r in runs),
+        "streamlit_import_seconds": statistics.median(r["streamlit_import_seconds"] for r in runs),
+        "ok": all(r["ok"] for r in runs),
+        "heavy_modules": runs[-1]["heavy_modules"],
+        "repeat": repeat
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Web 版各页面冷启动首屏耗时")
+    parser.add_argument("--pages", default=",".join(PAGES), help="逗号分隔的页面，例如 dashboard,matching")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--label", default=None, help="结果文件名后缀，默认使用 git 提交号")
+    parser.add_argument("--output", default=RESULTS_DIR)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.child)
+        return 0
+
+    label = args.label or git_commit()
+    report = {
+        "label": label,
+        "commit": git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pages": {}
+    }
+
+    for page_key in [p.strip() for p in args.pages.split(",") if p.strip()]:
+        result = measure_page(page_key, args.repeat)
+        report["pages"][page_key] = result
+        modules = ", ".join(result["heavy_modules"]) or "-"
+        status = "" if result["ok"] else "  ❌ 渲染出错"
+        print(f"{page_key:<12} 首屏 {result['first_render_seconds'] * 1000:>8.1f} ms  "
+              f"进程 {result['process_seconds'] * 1000:>8.1f} ms  已加载: {modules}{status}")
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"startup-{label}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
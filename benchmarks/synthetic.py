@@ -0,0 +1,180 @@
+"""
+合成数据生成器 - 生成可复现的职位、候选人和合同数据
+
+同一个 seed 和规模总是生成完全相同的数据，便于跨提交对比基准结果。
+规模指候选人数量，职位数为其 1/10，合同数为其 1/5。
+生成的记录已符合 schema.py 的数据格式（含推导字段），加载时只走快速检查，不会触发修复。
+"""
+import json
+import os
+import random
+from datetime import date, timedelta
+
+# 岗位方向: (职位名称, 日薪基准, 技能列表按热度从高到低排列)
+SKILL_FAMILIES = {
+    "前端": ("前端开发工程师", 400, [
+        "JavaScript", "React", "Vue", "TypeScript", "HTML/CSS",
+        "Webpack", "小程序", "Next.js", "Node.js", "Flutter"
+    ]),
+    "后端": ("后端开发工程师", 500, [
+        "Python", "Java", "MySQL", "Redis", "Go", "Docker",
+        "Django", "Spring", "Kubernetes", "Kafka"
+    ]),
+    "设计": ("UI设计师", 350, [
+        "Figma", "Photoshop", "UI/UX", "Sketch", "Illustrator",
+        "交互设计", "After Effects", "C4D"
+    ]),
+    "测试": ("测试工程师", 380, [
+        "测试用例", "接口测试", "自动化测试", "Selenium", "JMeter",
+        "Postman", "性能测试", "Appium"
+    ]),
+    "数据": ("数据分析师", 450, [
+        "SQL", "Excel", "Python", "数据分析", "Pandas", "Tableau",
+        "机器学习", "Spark", "Power BI"
+    ]),
+}
+
+FAMILY_WEIGHTS = {"前端": 30, "后端": 30, "设计": 15, "测试": 15, "数据": 10}
+
+# (级别, 经验要求, 最低经验年数, 日薪系数)
+LEVELS = [("初级", "1-3年", 1, 0.8), ("中级", "3-5年", 3, 1.0), ("高级", "5年以上", 5, 1.5)]
+
+LOCATION_WEIGHTS = {
+    "远程": 30, "上海": 18, "北京": 18, "深圳": 12,
+    "杭州": 10, "广州": 7, "成都": 5
+}
+
+JOB_STATUS_WEIGHTS = {"招聘中": 70, "暂停": 20, "已关闭": 10}
+CANDIDATE_STATUS_WEIGHTS = {"可联系": 60, "待面试": 20, "已签约": 15, "不可用": 5}
+CONTRACT_STATUS_WEIGHTS = {"执行中": 40, "待签署": 15, "已完成": 40, "已终止": 5}
+
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗"
+GIVEN_NAMES = "伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂"
+
+START_DATE = date(2024, 1, 1)
+
+_ZIPF_CACHE = {}
+
+
+def _weighted(rng, weights):
+    """按权重随机选择一个键"""
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _zipf_cum_weights(n):
+    """前 n 个排名的 Zipf 累积权重"""
+    if n not in _ZIPF_CACHE:
+        total = 0.0
+        cum_weights = []
+        for rank in range(n):
+            total += 1.0 / (rank + 1)
+            cum_weights.append(total)
+        _ZIPF_CACHE[n] = cum_weights
+    return _ZIPF_CACHE[n]
+
+
+def _zipf_sample(rng, items, k):
+    """按 Zipf 分布从热门到冷门抽取 k 个不重复的元素"""
+    cum_weights = _zipf_cum_weights(len(items))
+    picked = []
+    while len(picked) < min(k, len(items)):
+        item = rng.choices(items, cum_weights=cum_weights)[0]
+        if item not in picked:
+            picked.append(item)
+    return picked
+
+
+def generate_jobs(rng, count):
+    """生成职位数据"""
+    jobs = []
+    for i in range(count):
+        family = _weighted(rng, FAMILY_WEIGHTS)
+        title, base_salary, skills = SKILL_FAMILIES[family]
+        level, experience, min_experience, factor = rng.choice(LEVELS)
+        min_salary = int(base_salary * factor * rng.uniform(0.7, 1.0)) // 50 * 50
+        max_salary = min_salary + rng.choice([100, 200, 300, 500])
+        created = START_DATE + timedelta(days=rng.randrange(730))
+        jobs.append({
+            "id": f"job_{i + 1:03d}",
+            "title": f"{title}-{level}",
+            "salary": f"{min_salary}-{max_salary}元/天",
+            "location": _weighted(rng, LOCATION_WEIGHTS),
+            "skills": _zipf_sample(rng, skills, rng.randint(2, 5)),
+            "description": f"负责{family}相关工作",
+            "experience": experience,
+            "min_experience": min_experience,
+            "status": _weighted(rng, JOB_STATUS_WEIGHTS),
+            "created": created.strftime("%Y-%m-%d"),
+            "applicants": rng.randrange(30)
+        })
+    return jobs
+
+
+def generate_candidates(rng, count):
+    """生成候选人数据，技能以主方向为主并少量跨方向"""
+    families = list(SKILL_FAMILIES)
+    candidates = []
+    for i in range(count):
+        family = _weighted(rng, FAMILY_WEIGHTS)
+        _, base_salary, skills = SKILL_FAMILIES[family]
+        picked = _zipf_sample(rng, skills, rng.randint(1, 6))
+        if rng.random() < 0.15:
+            _, _, other_skills = SKILL_FAMILIES[rng.choice(families)]
+            extra = _zipf_sample(rng, other_skills, 1)[0]
+            if extra not in picked:
+                picked.append(extra)
+        experience = min(int(rng.expovariate(1 / 4)), 20)
+        expected_salary = int(base_salary * (0.6 + experience * 0.08) * rng.uniform(0.8, 1.2)) // 10 * 10
+        name = rng.choice(SURNAMES) + "".join(rng.choice(GIVEN_NAMES) for _ in range(rng.randint(1, 2)))
+        candidates.append({
+            "id": f"cand_{i + 1:03d}",
+            "name": name,
+            "skills": picked,
+            "experience": experience,
+            "expected_salary": expected_salary,
+            "location": _weighted(rng, LOCATION_WEIGHTS),
+            "status": _weighted(rng, CANDIDATE_STATUS_WEIGHTS),
+            "phone": f"1{rng.choice('3589')}{rng.randrange(10 ** 9):09d}",
+            "email": f"user{i + 1}@example.com"
+        })
+    return candidates
+
+
+def generate_contracts(rng, count, jobs, candidates):
+    """生成合同数据，引用已生成的职位和候选人"""
+    contracts = []
+    for i in range(count):
+        job = rng.choice(jobs)
+        candidate = rng.choice(candidates)
+        start = START_DATE + timedelta(days=rng.randrange(730))
+        days = rng.choice([30, 60, 90, 180, 365])
+        salary = candidate["expected_salary"]
+        contracts.append({
+            "id": f"contract_{i + 1:03d}",
+            "job_id": job["id"],
+            "candidate_id": candidate["id"],
+            "start_date": start.strftime("%Y-%m-%d"),
+            "end_date": (start + timedelta(days=days)).strftime("%Y-%m-%d"),
+            "salary": salary,
+            "status": _weighted(rng, CONTRACT_STATUS_WEIGHTS),
+            "payment_method": rng.choice(["月结", "月结", "周结", "项目结"]),
+            "total_amount": salary * days * 5 // 7
+        })
+    return contracts
+
+
+def generate_dataset(scale, seed=42):
+    """生成指定规模的完整数据集"""
+    rng = random.Random(seed)
+    jobs = generate_jobs(rng, max(scale // 10, 1))
+    candidates = generate_candidates(rng, scale)
+    contracts = generate_contracts(rng, max(scale // 5, 1), jobs, candidates)
+    return {"jobs": jobs, "candidates": candidates, "contracts": contracts}
+
+
+def write_dataset(data_dir, dataset):
+    """把数据集写成 DataStore 使用的 JSON 文件"""
+    os.makedirs(data_dir, exist_ok=True)
+    for name, records in dataset.items():
+        with open(os.path.join(data_dir, f"{name}.json"), 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,294 @@
+"""
+数据变更流 - 数据层每次插入/更新/删除发布一条变更事件
+
+进程内: 通过 subscribe 注册回调，缓存和统计据此增量更新，不必重新读取全部数据:
+    unsubscribe = store.changes.subscribe(on_change, collections=("candidates",))
+
+进程外: 变更同时追加到数据目录下的 changes.log（每行一个 JSON），可以随时从某个序号开始读取:
+    python change_feed.py tail --data-dir web_data --since 120 --follow
+
+多个进程（桌面版、网页版、API）可以同时写同一个数据目录: 分配序号和追加日志在锁文件 changes.log.lock 的
+进程间排他锁内进行，序号在所有进程间唯一且与日志顺序一致。没有 fcntl 的平台（Windows）无法加锁，
+同一数据目录只能有一个写入进程。
+
+事件字段: seq（日志内递增的序号，重启后接续）、op（insert/update/delete/reload）、
+collection、record_id、version（发布时 DataStore 的数据版本）、time、record
+（insert/update 为变更后的记录，delete 为删除前的记录，reload 为空，表示需要整体重新读取）。
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:   # Windows
+    fcntl = None
+
+LOG_FILE = "changes.log"
+
+# 进程间分配序号的锁文件（与日志同目录，文件名为日志名加此后缀）
+LOCK_SUFFIX = ".lock"
+
+OPS = ("insert", "update", "delete", "reload")
+
+# 日志超过该大小时轮换为 changes.log.1（只保留一份旧日志）
+MAX_LOG_BYTES = 10 * 1024 * 1024
+
+# 内存中保留的最近事件数，读取近期变更时不必读文件
+RECENT_SIZE = 1000
+
+Change = namedtuple("Change", "seq op collection record_id version time record")
+
+
+def _to_change(data):
+    return Change(data["seq"], data["op"], data.get("collection"), data.get("record_id"),
+                  data.get("version"), data.get("time"), data.get("record"))
+
+
+def _last_seq(path):
+    """日志中最后一条事件的序号，没有日志时为 0"""
+    for candidate in (path, path + ".1"):
+        if not os.path.exists(candidate):
+            continue
+        with open(candidate, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - 65536))
+            lines = f.read().splitlines()
+        for line in reversed(lines):
+            try:
+                return json.loads(line)["seq"]
+            except (ValueError, KeyError):
+                continue
+    return 0
+
+
+class ChangeFeed:
+    """变更流: 进程内订阅 + 可选的磁盘日志"""
+
+    def __init__(self, log_path=None, max_bytes=MAX_LOG_BYTES):
+        self.log_path = log_path
+        self.max_bytes = max_bytes
+        self.seq = _last_seq(log_path) if log_path else 0
+        # 本进程上次写完后日志的大小；与当前大小不同说明其他进程写过（或已轮换），需要重新读取最后的序号
+        self._log_size = None
+        self._subscribers = []
+        self._recent = deque(maxlen=RECENT_SIZE)
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback, collections=None):
+        """注册回调 callback(change)；collections 不为空时只接收这些集合（reload 总会收到），返回取消订阅的函数"""
+        entry = (callback, frozenset(collections) if collections else None)
+        self._subscribers.append(entry)
+
+        def unsubscribe():
+            if entry in self._subscribers:
+                self._subscribers.remove(entry)
+        return unsubscribe
+
+    def publish(self, op, collection=None, record_id=None, version=None, record=None):
+        """发布一条变更: 分配序号、写入日志并通知订阅者"""
+        if op not in OPS:
+            raise ValueError(f"未知的变更类型: {op}")
+        with self._lock, self._log_lock():
+            if self.log_path:
+                self._sync_seq()
+            self.seq += 1
+            change = Change(self.seq, op, collection, record_id, version,
+                            datetime.now().isoformat(timespec="seconds"),
+                            dict(record) if record is not None else None)
+            self._recent.append(change)
+            if self.log_path:
+                self._append(change)
+        self.notify(change)
+        return change
+
+    @contextmanager
+    def _log_lock(self):
+        """进程间排他锁，持有期间其他进程不能分配序号和写日志（无法加锁时不加锁）"""
+        lock = None
+        if self.log_path and fcntl is not None:
+            try:
+                lock = open(self.log_path + LOCK_SUFFIX, 'a')
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            except OSError as e:
+                print(f"变更日志加锁失败 {self.log_path}{LOCK_SUFFIX}: {e}")
+                if lock is not None:
+                    lock.close()
+                lock = None
+        try:
+            yield
+        finally:
+            if lock is not None:
+                lock.close()   # 关闭文件即释放锁
+
+    def _log_changed(self):
+        """日志在本进程上次写入之后是否被其他进程写过（或已轮换）"""
+        try:
+            size = os.path.getsize(self.log_path)
+        except OSError:
+            size = 0
+        return size != self._log_size
+
+    def _sync_seq(self):
+        """其他进程写过日志时，把序号接到日志中最后的序号之后；内存中的近期变更与之后的不再连续，清空"""
+        if self._log_changed():
+            self.seq = max(self.seq, _last_seq(self.log_path))
+            self._recent.clear()
+
+    def notify_reload(self, version=None):
+        """通知订阅者数据已整体重新读取（不写日志、不占用序号）"""
+        self.notify(Change(self.seq, "reload", None, None, version,
+                           datetime.now().isoformat(timespec="seconds"), None))
+
+    def notify(self, change):
+        """只通知进程内订阅者（不写日志），用于应用其他进程发布的变更"""
+        for callback, collections in list(self._subscribers):
+            if collections is not None and change.op != "reload" and change.collection not in collections:
+                continue
+            try:
+                callback(change)
+            except Exception as e:
+                print(f"变更订阅处理失败: {e}")
+
+    def _append(self, change):
+        try:
+            if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > self.max_bytes:
+                os.replace(self.log_path, self.log_path + ".1")
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(change._asdict(), ensure_ascii=False) + "\n")
+                self._log_size = f.tell()
+        except OSError as e:
+            print(f"写入变更日志失败 {self.log_path}: {e}")
+
+    def since(self, seq, limit=None):
+        """序号大于 seq 的变更，按序号排列；近期的从内存取，更早的或其他进程写过日志时读日志"""
+        with self._lock:
+            recent = list(self._recent)
+            # 内存中只有本进程发布的变更，其他进程写过日志时不完整
+            if self.log_path and self._log_changed():
+                recent = []
+        if recent and recent[0].seq <= seq + 1:
+            changes = [c for c in recent if c.seq > seq]
+        elif self.log_path:
+            changes = read_changes(self.log_path, seq)
+        else:
+            changes = [c for c in recent if c.seq > seq]
+        return changes if limit is None else changes[:limit]
+
+
+def read_changes(log_path, since=0):
+    """从日志读取序号大于 since 的变更（包括轮换出的旧日志）"""
+    changes = []
+    for path in (log_path + ".1", log_path):
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    continue   # 写到一半的最后一行
+                if data.get("seq", 0) > since:
+                    changes.append(_to_change(data))
+    changes.sort(key=lambda c: c.seq)
+    return changes
+
+
+def _read_lines(f, position):
+    """从已打开文件 f 的 position 开始读取完整的行，返回 ([事件字典], 新位置)；末尾写到一半的行留到下次读取"""
+    f.seek(position)
+    data = f.read()
+    end = data.rfind(b"\n") + 1
+    events = []
+    for line in data[:end].splitlines():
+        try:
+            events.append(json.loads(line))
+        except ValueError:
+            continue
+    return events, position + end
+
+
+class ChangeReader:
+    """增量读取日志: 每次 read 只读取日志新增的部分，日志轮换后从旧日志补齐
+
+    按文件的 inode 识别轮换（新日志可能已经写得比上次读到的位置还长，不能按大小判断）。
+    """
+
+    def __init__(self, log_path, since=0):
+        self.log_path = log_path
+        self.since = since
+        self._inode = None      # 正在读取的日志文件的 inode
+        self._position = 0
+
+    def read(self):
+        """序号大于上次读到的序号的新变更"""
+        log_path = self.log_path
+        events = []
+        try:
+            f = open(log_path, 'rb')
+        except FileNotFoundError:
+            f = None
+        try:
+            inode = os.fstat(f.fileno()).st_ino if f is not None else None
+            if inode != self._inode or self._inode is None:
+                # 第一次读取或已轮换: 上次读取之后写入的部分在旧日志里，从上次的位置补齐（旧日志不是原来的文件时从头读）
+                events = self._read_rotated()
+                self._inode, self._position = inode, 0
+            if f is not None:
+                new_events, self._position = _read_lines(f, self._position)
+                events.extend(new_events)
+        finally:
+            if f is not None:
+                f.close()
+        changes = [_to_change(data) for data in events if data.get("seq", 0) > self.since]
+        if changes:
+            self.since = changes[-1].seq
+        return changes
+
+    def _read_rotated(self):
+        try:
+            with open(self.log_path + ".1", 'rb') as f:
+                same = self._inode is not None and os.fstat(f.fileno()).st_ino == self._inode
+                events, _ = _read_lines(f, self._position if same else 0)
+                return events
+        except FileNotFoundError:
+            return []
+
+
+def follow(log_path, since=0, interval=1.0):
+    """持续读取新变更的生成器（轮询日志文件）"""
+    reader = ChangeReader(log_path, since)
+    while True:
+        changes = reader.read()
+        yield from changes
+        if not changes:
+            time.sleep(interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="数据变更日志")
+    parser.add_argument("command", choices=["tail"])
+    parser.add_argument("--data-dir", default=os.environ.get("FLEXWORK_DATA_DIR", "web_data"))
+    parser.add_argument("--since", type=int, default=0, help="只输出序号大于该值的变更")
+    parser.add_argument("--follow", action="store_true", help="持续输出新的变更")
+    args = parser.parse_args(argv)
+
+    log_path = os.path.join(args.data_dir, LOG_FILE)
+    changes = follow(log_path, args.since) if args.follow else read_changes(log_path, args.since)
+    try:
+        for change in changes:
+            print(json.dumps(change._asdict(), ensure_ascii=False), flush=True)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
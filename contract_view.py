@@ -0,0 +1,113 @@
+"""
+合同视图 - 合同关联职位名称、候选人姓名和合同金额后的物化行
+
+合同记录只保存 job_id / candidate_id，不再复制名称。视图建立后随职位、候选人、合同的增删改增量维护:
+职位改名时只刷新引用它的合同行，合同页面按合同ID直接取行，不需要扫描职位和候选人。
+未建立（ready 为 False）时 put/drop 不做任何事，由调用方在首次使用时 build。
+
+    view = ContractView()
+    view.build(jobs, candidates, contracts)
+    view.put("jobs", job)        # 新增或修改后
+    view.drop("jobs", job)       # 删除或修改前
+    view.rows(contracts)         # 按合同顺序取行
+"""
+from payroll import contract_terms
+
+UNKNOWN = "未知"
+
+# 视图行中直接取自合同的字段
+CONTRACT_FIELDS = ("id", "job_id", "candidate_id", "start_date", "end_date", "salary", "status", "payment_method")
+
+
+class ContractView:
+    """合同物化视图
+
+    terms 为计算 (工作日数, 合同金额) 的函数，DataStore 传入由合同金额索引缓存的版本。
+    """
+
+    def __init__(self, terms=None):
+        self._terms = terms or contract_terms
+        self.reset()
+
+    def reset(self):
+        """清空视图，下次使用前需要重新 build"""
+        self._rows = {}          # 合同ID -> 行
+        self._titles = {}        # 职位ID -> 职位名称
+        self._names = {}         # 候选人ID -> 姓名
+        self._by_job = {}        # 职位ID -> 合同ID集合
+        self._by_candidate = {}  # 候选人ID -> 合同ID集合
+        self.ready = False
+
+    def build(self, jobs, candidates, contracts):
+        self.reset()
+        self._titles = {job.get("id"): job.get("title") or UNKNOWN for job in jobs}
+        self._names = {c.get("id"): c.get("name") or UNKNOWN for c in candidates}
+        for contract in contracts:
+            self._put_contract(contract)
+        self.ready = True
+
+    def put(self, name, record):
+        """记录新增或修改后调用"""
+        if not self.ready:
+            return
+        if name == "contracts":
+            self._put_contract(record)
+        elif name == "jobs":
+            self._titles[record.get("id")] = record.get("title") or UNKNOWN
+            self._refresh(self._by_job.get(record.get("id")))
+        elif name == "candidates":
+            self._names[record.get("id")] = record.get("name") or UNKNOWN
+            self._refresh(self._by_candidate.get(record.get("id")))
+
+    def drop(self, name, record):
+        """记录删除或修改前调用"""
+        if not self.ready:
+            return
+        doc_id = record.get("id")
+        if name == "contracts":
+            row = self._rows.pop(doc_id, None)
+            if row is not None:
+                self._by_job.get(row["job_id"], set()).discard(doc_id)
+                self._by_candidate.get(row["candidate_id"], set()).discard(doc_id)
+        elif name == "jobs":
+            self._titles.pop(doc_id, None)
+            self._refresh(self._by_job.get(doc_id))
+        elif name == "candidates":
+            self._names.pop(doc_id, None)
+            self._refresh(self._by_candidate.get(doc_id))
+
+    def _put_contract(self, contract):
+        doc_id = contract.get("id")
+        if doc_id is None:
+            return
+        row = {field: contract.get(field) for field in CONTRACT_FIELDS}
+        row["work_days"], row["total_amount"] = self._terms(contract)
+        row["contract"] = contract
+        self._rows[doc_id] = row
+        self._by_job.setdefault(row["job_id"], set()).add(doc_id)
+        self._by_candidate.setdefault(row["candidate_id"], set()).add(doc_id)
+        self._fill_names(row)
+
+    def _fill_names(self, row):
+        # 职位或候选人已不存在时，沿用旧数据中复制到合同里的名称
+        contract = row["contract"]
+        row["job_title"] = self._titles.get(row["job_id"]) or contract.get("job_title") or UNKNOWN
+        row["candidate_name"] = self._names.get(row["candidate_id"]) or contract.get("candidate_name") or UNKNOWN
+
+    def _refresh(self, contract_ids):
+        for doc_id in contract_ids or ():
+            self._fill_names(self._rows[doc_id])
+
+    def row(self, contract_id):
+        """合同的视图行，不存在返回 None"""
+        return self._rows.get(contract_id)
+
+    def contracts_of(self, name, record_id):
+        """引用该职位（name="jobs"）或候选人（name="candidates"）的合同ID"""
+        by_ref = self._by_job if name == "jobs" else self._by_candidate
+        return list(by_ref.get(record_id, ()))
+
+    def rows(self, contracts):
+        """按 contracts 的顺序返回视图行"""
+        rows = self._rows
+        return [row for row in (rows.get(c.get("id")) for c in contracts) if row is not None]
@@ -1,11 +1,73 @@
+import bisect
+import csv
 import json
 import os
+import shutil
+import threading
+import uuid
+from collections import namedtuple
 from datetime import datetime
+from itertools import islice
+
+import metrics
+from change_feed import LOG_FILE, ChangeFeed, ChangeReader
+from contract_view import ContractView
+from dedup import CONTACT_KEYS, DuplicateIndex, merged_fields
+from field_index import Query, create_indexes
+from payroll import monthly_payroll, payroll_schedule
+from schema import VALIDATORS
+from search_index import SearchIndex, JOB_SEARCH_FIELDS, CANDIDATE_SEARCH_FIELDS
+
+# 集合名 -> 记录ID前缀
+ID_PREFIXES = {"jobs": "job", "candidates": "cand", "contracts": "contract"}
+
+# (数据目录绝对路径, autosave) -> DataStore，同一进程内使用同一数据目录和保存方式的调用方（网页版和 API）
+# 共用一份内存数据和索引；保存方式不同的调用方（桌面版延迟保存）各自持有实例，互不影响
+_stores = {}
+
+_stores_lock = threading.Lock()
+
+# 已经提示过运行 schema.py repair 的数据目录（绝对路径），每个进程每个目录只提示一次
+_repair_hinted = set()
+
+# 某一版本的全部数据，各集合为元组；by_id、order、indexes 为 {集合: ID索引/插入序号/字段索引}，与记录属于同一版本。
+# 写入时不修改已发布的元组、记录和索引，而是生成新的元组（被修改的记录换成新字典）和索引副本
+# 再整体替换快照，读取方拿到的快照在使用期间不会变化，不需要加锁
+Snapshot = namedtuple("Snapshot", "version jobs candidates contracts by_id order indexes")
+
+
+class DataFileError(Exception):
+    """数据文件存在但无法读取或不是合法的 JSON"""
+
+
+class _OrderView:
+    """把记录元组看作插入序号序列，供 bisect 查找记录位置"""
+
+    def __init__(self, records, order):
+        self._records = records
+        self._order = order
+
+    def __len__(self):
+        return len(self._records)
+
+    def __getitem__(self, i):
+        return self._order.get(self._records[i].get("id"), -1)
+
+
+def get_store(data_dir="web_data", autosave=True):
+    """数据目录和保存方式对应的共享 DataStore，首次调用时加载"""
+    key = (os.path.abspath(data_dir), autosave)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = DataStore(data_dir, autosave=autosave)
+    return store
+
 
 class DataStore:
     """数据存储类 - 负责所有数据的持久化"""
     
-    def __init__(self, data_dir="web_data"):
+    def __init__(self, data_dir="web_data", autosave=True):
         self.data_dir = data_dir
         os.makedirs(data_dir, exist_ok=True)
         
@@ -13,37 +75,311 @@ class DataStore:
         self.candidates_file = os.path.join(data_dir, "candidates.json")
         self.contracts_file = os.path.join(data_dir, "contracts.json")
         
+        # 实例标识，与快照的版本号一起用于 ETag 和缓存失效
+        self.instance_id = uuid.uuid4().hex[:8]
+        self._snapshot = Snapshot(0, (), (), (), {name: {} for name in ID_PREFIXES},
+                                  {name: {} for name in ID_PREFIXES},
+                                  {name: create_indexes(name) for name in ID_PREFIXES})
+        
+        # 写入（增删改、重新加载、按需建立索引）互斥，读取不加锁
+        self._write_lock = threading.RLock()
+        
+        # 变更流: 每次增删改通知进程内订阅者，并追加到数据目录下的变更日志
+        self.changes = ChangeFeed(os.path.join(data_dir, LOG_FILE))
+        self.changes.subscribe(lambda change: metrics.incr(f"datastore.changes.{change.op}"))
+        self._change_reader = None
+        
+        # 全文检索索引，首次检索时建立，之后随增删改增量维护
+        self.search_indexes = {
+            "jobs": SearchIndex(JOB_SEARCH_FIELDS),
+            "candidates": SearchIndex(CANDIDATE_SEARCH_FIELDS)
+        }
+        
+        # 合同关联职位名称、候选人姓名后的物化视图，首次使用时建立，之后随增删改增量维护
+        self.contract_view = ContractView(terms=self.contract_terms)
+        
+        # 候选人去重的分块键索引，首次查重时建立，之后随增删改增量维护
+        self.duplicate_index = DuplicateIndex()
+        
+        # (数据版本, 各月结算金额)
+        self._monthly_payroll = None
+        
+        # autosave 为 False 时增删改不立即写文件，只把集合记为待保存，由调用方 flush（桌面版延迟批量保存）
+        self.autosave = autosave
+        self._dirty = set()
+        
+        # 加载时被规范化过的集合 -> 修正的记录数；这些文件第一次被覆盖前先备份原文件（见 _write_collection）
+        self._pending_backups = {}
+        
         self.load_data()
     
+    @property
+    def version(self):
+        """数据版本，每次发布新快照加一"""
+        return self._snapshot.version
+    
+    @property
+    def jobs(self):
+        """当前版本的职位（元组）"""
+        return self._snapshot.jobs
+    
+    @property
+    def candidates(self):
+        """当前版本的候选人（元组）"""
+        return self._snapshot.candidates
+    
+    @property
+    def contracts(self):
+        """当前版本的合同（元组）"""
+        return self._snapshot.contracts
+    
+    @property
+    def field_indexes(self):
+        """当前版本的字段索引（状态、地点、日期等）{集合: {字段: 索引}}，加载时建立，随增删改增量维护"""
+        return self._snapshot.indexes
+    
+    @property
+    def _by_id(self):
+        return self._snapshot.by_id
+    
+    @property
+    def _order(self):
+        return self._snapshot.order
+    
+    def snapshot(self):
+        """当前版本的数据快照，同时读取多个集合（统计、导出等）时用它保证各集合属于同一版本
+
+        快照中的元组和记录不会再被修改，调用方也不应修改。
+        """
+        return self._snapshot
+    
+    def _draft(self, name):
+        """集合当前的 (ID索引, 插入序号, 字段索引) 副本，写入方在副本上修改后用 _publish 发布（必须持有写锁）"""
+        snapshot = self._snapshot
+        return (dict(snapshot.by_id[name]), dict(snapshot.order[name]),
+                {field: index.copy() for field, index in snapshot.indexes[name].items()})
+    
+    def _publish(self, name, records, by_id, order, indexes):
+        """用集合的新记录元组和 _draft 修改后的索引发布下一版本的快照（必须持有写锁）"""
+        snapshot = self._snapshot
+        self._snapshot = snapshot._replace(
+            version=snapshot.version + 1, **{name: records},
+            by_id=dict(snapshot.by_id, **{name: by_id}),
+            order=dict(snapshot.order, **{name: order}),
+            indexes=dict(snapshot.indexes, **{name: indexes})
+        )
+    
+    @metrics.timed("datastore.load_data")
     def load_data(self):
         """加载所有数据"""
-        self.jobs = self._load_file(self.jobs_file, self._default_jobs())
-        self.candidates = self._load_file(self.candidates_file, self._default_candidates())
-        self.contracts = self._load_file(self.contracts_file, self._default_contracts())
+        collections = {
+            "jobs": self._load_file(self.jobs_file, self._default_jobs()),
+            "candidates": self._load_file(self.candidates_file, self._default_candidates()),
+            "contracts": self._load_file(self.contracts_file, self._default_contracts())
+        }
+        repaired = self._normalize_loaded(collections)
+        with self._write_lock:
+            self._pending_backups = repaired
+            self._reindex(collections)
     
-    def _load_file(self, filepath, default):
-        """加载单个文件"""
+    def _normalize_loaded(self, collections):
+        """规范化加载的记录（已规范的记录只做类型检查），格式不规范的记录只在内存中修正
+
+        返回 {集合: 修正的记录数}，只包含有记录被修正的集合。
+        """
+        counts = {}
+        for name, records in collections.items():
+            validator = VALIDATORS[name]
+            count = sum(1 for record in records if validator.normalize(record))
+            if count:
+                counts[name] = count
+        repaired = sum(counts.values())
+        if repaired:
+            metrics.incr("datastore.records_repaired", repaired)
+            key = os.path.abspath(self.data_dir)
+            if key not in _repair_hinted:
+                _repair_hinted.add(key)
+                print(f"数据中有 {repaired} 条记录格式不规范，已在内存中修正；"
+                      f"运行 python schema.py repair --data-dir {self.data_dir} 可修复文件")
+        return counts
+    
+    def _reindex(self, collections, notify=True):
+        """用 {集合: 记录列表} 重建ID索引、字段索引和编号计数，并发布为新版本
+
+        notify=True 时通知进程内订阅者数据已整体重新读取；调用方另外发布 reload 事件时传 False。
+
+        新的记录和索引先在局部变量中建好再作为一个快照发布，不加锁的读取方看到的要么是旧快照，要么是新快照。
+        """
+        by_id, order, next_seq, field_indexes = {}, {}, {}, {}
+        for name, prefix in ID_PREFIXES.items():
+            records = collections[name]
+            by_id[name] = {r.get("id"): r for r in records}
+            order[name] = {record_id: i for i, record_id in enumerate(by_id[name])}
+            next_seq[name] = max((self._id_seq(r.get("id"), prefix) for r in records), default=0) + 1
+            field_indexes[name] = create_indexes(name)
+            for index in field_indexes[name].values():
+                index.build(records)
+        self._next_seq = next_seq
+        self._next_order = max((len(ids) for ids in order.values()), default=0)
+        self.contract_view.reset()
+        self.duplicate_index.reset()
+        for index in self.search_indexes.values():
+            index.reset()
+        self._snapshot = Snapshot(self._snapshot.version + 1, *(tuple(collections[name]) for name in ID_PREFIXES),
+                                  by_id, order, field_indexes)
+        if notify:
+            self.changes.notify_reload(self.version)
+    
+    def _search_index(self, name, build=False):
+        """返回已建立的检索索引；build=True 时按需建立"""
+        index = self.search_indexes.get(name)
+        if index is None:
+            return None
+        if not index.ready:
+            if not build:
+                return None
+            # 建立期间的写入不会进入索引，所以与写入互斥
+            with self._write_lock, metrics.timer("datastore.build_search_index"):
+                if not index.ready:
+                    index.build(getattr(self, name))
+        return index
+    
+    def _index_record(self, name, record, indexes):
+        """把记录加入字段索引（_draft 取出的副本）、合同视图和已建立的检索索引"""
+        for index in indexes.values():
+            index.add(record)
+        self.contract_view.put(name, record)
+        if name == "candidates":
+            self.duplicate_index.put(record)
+        search_index = self._search_index(name)
+        if search_index is not None:
+            search_index.add(record)
+    
+    def _unindex_record(self, name, record, indexes):
+        """从索引中移除记录（必须在记录内容被修改之前调用）"""
+        for index in indexes.values():
+            index.remove(record)
+        self.contract_view.drop(name, record)
+        if name == "candidates":
+            self.duplicate_index.drop(record)
+        search_index = self._search_index(name)
+        if search_index is not None:
+            search_index.remove(record)
+    
+    @staticmethod
+    def _id_seq(record_id, prefix):
+        """从 "job_012" 这样的ID中取出序号"""
         try:
-            if os.path.exists(filepath):
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except:
+            if str(record_id).startswith(prefix + "_"):
+                return int(str(record_id)[len(prefix) + 1:])
+        except ValueError:
             pass
-        return default
+        return 0
+    
+    def _load_file(self, filepath, default):
+        """加载单个文件，文件不存在时返回默认数据
+
+        文件存在却读不出来时抛出 DataFileError，不能换成默认数据，否则下次保存会覆盖原文件。
+        """
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return default
+        except (OSError, ValueError) as e:
+            raise DataFileError(f"无法读取数据文件 {filepath}: {e}") from e
     
+    @metrics.timed("datastore.save_all")
     def save_all(self):
         """保存所有数据"""
-        self._save_file(self.jobs_file, self.jobs)
-        self._save_file(self.candidates_file, self.candidates)
-        self._save_file(self.contracts_file, self.contracts)
+        for name in ID_PREFIXES:
+            self.save(name)
+    
+    @metrics.timed("datastore.save")
+    def save(self, name):
+        """只保存一个集合（增删改只写被修改的文件）"""
+        self._dirty.discard(name)
+        if not self._write_collection(name, getattr(self, name)):
+            self._dirty.add(name)
+    
+    def _write_collection(self, name, records):
+        """写入集合的文件，返回是否成功
+
+        加载时被规范化过的文件（无法识别的取值、颠倒的日期已在内存中丢弃）第一次被覆盖前，
+        先把原文件备份为 *.json.bak（与 schema.py repair 相同）并提示，丢弃的内容可以从备份中找回。
+        """
+        filepath = getattr(self, f"{name}_file")
+        repaired = self._pending_backups.pop(name, 0)
+        if repaired:
+            try:
+                shutil.copyfile(filepath, filepath + ".bak")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"备份失败 {filepath}: {e}")
+                self._pending_backups[name] = repaired
+                return False
+            else:
+                print(f"{filepath} 中有 {repaired} 条记录加载时被规范化，保存前原文件已备份为 {filepath}.bak")
+        return self._save_file(filepath, records)
     
     def _save_file(self, filepath, data):
-        """保存单个文件"""
+        """保存单个文件，返回是否成功
+
+        先写同目录下的临时文件再用 os.replace 替换，写到一半失败或进程退出时原文件保持完整。
+        """
+        tmp_path = f"{filepath}.{uuid.uuid4().hex[:8]}.tmp"
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
+            metrics.incr("datastore.records_saved", len(data))
+            return True
         except Exception as e:
             print(f"保存失败 {filepath}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+    
+    def _persist(self, name):
+        """集合被修改后调用: 立即保存，或在 autosave 关闭时记为待保存"""
+        if self.autosave:
+            self.save(name)
+        else:
+            self._dirty.add(name)
+    
+    @property
+    def dirty(self):
+        """有未保存修改的集合"""
+        return set(self._dirty)
+    
+    def dirty_snapshot(self):
+        """取出待保存集合的当前版本 {集合: 记录元组} 并清除待保存标记
+
+        已发布的记录不会再被修改，可以直接交给后台线程用 write_snapshot 写入，不必复制。
+        """
+        with self._write_lock:
+            snapshot = {name: getattr(self, name) for name in self._dirty}
+            self._dirty.clear()
+        return snapshot
+    
+    @metrics.timed("datastore.write_snapshot")
+    def write_snapshot(self, snapshot):
+        """写入 dirty_snapshot 的结果，写入失败的集合重新记为待保存，返回写入失败的集合"""
+        failed = [name for name, records in snapshot.items() if not self._write_collection(name, records)]
+        with self._write_lock:
+            self._dirty.update(failed)
+        return failed
+    
+    def flush(self):
+        """立即保存所有待保存的集合"""
+        with self._write_lock:
+            for name in list(self._dirty):
+                self.save(name)
     
     def _default_jobs(self):
         """默认职位数据"""
@@ -54,9 +390,11 @@ class DataStore:
                 "salary": "300-500元/天",
                 "location": "远程",
                 "skills": ["React", "Vue", "JavaScript"],
-                "description": "负责Web前端开发",
+                "description": "负责Web前端开发，要求React/Vue经验",
+                "requirements": "3年以上经验，精通JavaScript",
                 "status": "招聘中",
-                "created": datetime.now().strftime("%Y-%m-%d")
+                "created": datetime.now().strftime("%Y-%m-%d"),
+                "applicants": 0
             },
             {
                 "id": "job_002",
@@ -66,7 +404,8 @@ class DataStore:
                 "skills": ["Figma", "Photoshop", "UI/UX"],
                 "description": "负责产品界面设计",
                 "status": "招聘中",
-                "created": datetime.now().strftime("%Y-%m-%d")
+                "created": datetime.now().strftime("%Y-%m-%d"),
+                "applicants": 0
             }
         ]
     
@@ -79,9 +418,11 @@ class DataStore:
                 "skills": ["Python", "React", "JavaScript"],
                 "experience": 3,
                 "expected_salary": 400,
+                "location": "上海",
                 "status": "可联系",
                 "phone": "13800138000",
-                "email": "zhang@example.com"
+                "email": "zhang@example.com",
+                "availability": "周一至周五"
             },
             {
                 "id": "cand_002",
@@ -89,6 +430,7 @@ class DataStore:
                 "skills": ["UI/UX", "Figma", "Photoshop"],
                 "experience": 5,
                 "expected_salary": 350,
+                "location": "上海",
                 "status": "可联系",
                 "phone": "13900139000",
                 "email": "li@example.com"
@@ -102,46 +444,396 @@ class DataStore:
                 "id": "contract_001",
                 "job_id": "job_001",
                 "candidate_id": "cand_001",
-                "job_title": "前端开发工程师",
-                "candidate_name": "张三",
                 "start_date": "2024-02-01",
                 "end_date": "2024-05-01",
                 "salary": 400,
                 "status": "执行中",
+                "work_hours": "每周40小时",
+                "payment_method": "月结",
                 "total_amount": 48000
             }
         ]
     
+    def reset_data(self):
+        """恢复默认数据"""
+        with self._write_lock:
+            # reload 事件由下面的 publish 写日志并通知订阅者，只通知一次
+            self._reindex({
+                "jobs": self._default_jobs(),
+                "candidates": self._default_candidates(),
+                "contracts": self._default_contracts()
+            }, notify=False)
+            self.save_all()
+            self.changes.publish("reload", version=self.version)
+    
+    def _position(self, name, record):
+        """记录在集合元组中的位置，不存在返回 None
+
+        元组按插入序号（_order）排列，二分查找；加载的文件中有重复ID时序号不可靠，退化为逐条查找。
+        """
+        records = getattr(self, name)
+        order = self._order[name]
+        i = bisect.bisect_left(_OrderView(records, order), order.get(record.get("id"), -1))
+        if i < len(records) and records[i] is record:
+            return i
+        return next((i for i, r in enumerate(records) if r is record), None)
+    
+    def _append_record(self, name, record):
+        """把已有ID的记录加入集合和索引，发布新版本"""
+        by_id, order, indexes = self._draft(name)
+        by_id[record["id"]] = record
+        order[record["id"]] = self._next_order
+        self._next_order += 1
+        self._index_record(name, record, indexes)
+        self._publish(name, getattr(self, name) + (record,), by_id, order, indexes)
+    
+    def _remove_record(self, name, record_id):
+        """从集合和索引中移除记录并发布新版本，返回被移除的记录，不存在返回 None"""
+        record = self._by_id[name].get(record_id)
+        if record is None:
+            return None
+        i = self._position(name, record)
+        by_id, order, indexes = self._draft(name)
+        del by_id[record_id]
+        order.pop(record_id, None)
+        self._unindex_record(name, record, indexes)
+        records = getattr(self, name)
+        if i is not None:
+            records = records[:i] + records[i + 1:]
+        self._publish(name, records, by_id, order, indexes)
+        return record
+    
+    def _replace_record(self, name, record, fields, clear=False):
+        """用修改字段后的新记录替换 record 并发布新版本，返回新记录（clear=True 时不保留原有字段）
+
+        已发布的 record 本身不被修改，持有旧快照的读取方看到的仍是修改前的内容。
+        """
+        new_record = {"id": record["id"]} if clear else dict(record)
+        new_record.update({k: v for k, v in fields.items() if k != "id"})
+        i = self._position(name, record)
+        by_id, order, indexes = self._draft(name)
+        self._unindex_record(name, record, indexes)
+        by_id[record["id"]] = new_record
+        self._index_record(name, new_record, indexes)
+        records = getattr(self, name)
+        if i is not None:
+            records = records[:i] + (new_record,) + records[i + 1:]
+        self._publish(name, records, by_id, order, indexes)
+        return new_record
+    
+    def _insert(self, name, record):
+        """校验并插入新记录（插入的是副本）、分配ID，格式错误时抛出 schema.SchemaError"""
+        record = VALIDATORS[name].validate(dict(record))
+        with self._write_lock:
+            seq = self._next_seq[name]
+            self._next_seq[name] = seq + 1
+            record["id"] = f"{ID_PREFIXES[name]}_{seq:03d}"
+            self._append_record(name, record)
+            self._persist(name)
+            self.changes.publish("insert", name, record["id"], self.version, record)
+        return record["id"]
+    
+    @metrics.timed("datastore.add_job")
     def add_job(self, job_data):
-        """添加职位"""
-        job_data["id"] = f"job_{len(self.jobs) + 1:03d}"
-        job_data["created"] = datetime.now().strftime("%Y-%m-%d")
-        self.jobs.append(job_data)
-        self.save_all()
-        return job_data["id"]
+        """添加职位（不修改传入的 job_data）"""
+        return self._insert("jobs", dict(job_data, created=datetime.now().strftime("%Y-%m-%d")))
     
+    @metrics.timed("datastore.add_candidate")
     def add_candidate(self, candidate_data):
         """添加候选人"""
-        candidate_data["id"] = f"cand_{len(self.candidates) + 1:03d}"
-        self.candidates.append(candidate_data)
-        self.save_all()
-        return candidate_data["id"]
+        return self._insert("candidates", candidate_data)
     
+    @metrics.timed("datastore.add_contract")
     def add_contract(self, contract_data):
         """添加合同"""
-        contract_data["id"] = f"contract_{len(self.contracts) + 1:03d}"
-        self.contracts.append(contract_data)
-        self.save_all()
-        return contract_data["id"]
+        return self._insert("contracts", contract_data)
+    
+    def get_record(self, name, record_id):
+        """按ID获取记录，不存在返回 None"""
+        return self._by_id[name].get(record_id)
+    
+    @metrics.timed("datastore.update_record")
+    def update_record(self, name, record_id, changes):
+        """更新记录字段（ID不可修改），返回更新后的记录，不存在返回 None，格式错误时抛出 schema.SchemaError"""
+        with self._write_lock:
+            record = self._by_id[name].get(record_id)
+            if record is None:
+                return None
+            changes = VALIDATORS[name].validate_update(record, dict(changes))
+            record = self._replace_record(name, record, changes)
+            self._persist(name)
+            self.changes.publish("update", name, record_id, self.version, record)
+        return record
+    
+    @metrics.timed("datastore.delete_record")
+    def delete_record(self, name, record_id):
+        """删除记录，返回是否删除成功"""
+        with self._write_lock:
+            record = self._remove_record(name, record_id)
+            if record is None:
+                return False
+            self._persist(name)
+            self.changes.publish("delete", name, record_id, self.version, record)
+        return True
+    
+    def apply_change(self, change):
+        """应用其他进程发布的变更: 只更新内存中的数据和索引，不写文件、不写变更日志"""
+        if change.op == "reload":
+            self.load_data()
+            return
+        name, record_id = change.collection, change.record_id
+        if name not in ID_PREFIXES or record_id is None:
+            return
+        with self._write_lock:
+            if change.op == "delete":
+                if self._remove_record(name, record_id) is None:
+                    return
+            else:
+                # 插入和更新都按变更后的完整记录处理，重复应用结果不变
+                VALIDATORS[name].normalize(change.record or {})
+                record = self._by_id[name].get(record_id)
+                if record is not None:
+                    self._replace_record(name, record, change.record or {}, clear=True)
+                else:
+                    self._append_record(name, dict(change.record or {}, id=record_id))
+                    self._next_seq[name] = max(self._next_seq[name],
+                                               self._id_seq(record_id, ID_PREFIXES[name]) + 1)
+            self.changes.notify(change)
+    
+    def catch_up(self):
+        """应用变更日志中本实例还没有看到的变更（供只读副本使用）
+
+        日志不连续（旧日志已被轮换掉）时重新加载全部数据。
+        """
+        with self._write_lock:
+            if self._change_reader is None:
+                self._change_reader = ChangeReader(self.changes.log_path, self.changes.seq)
+            for change in self._change_reader.read():
+                if change.seq != self.changes.seq + 1 and change.op != "reload":
+                    self.load_data()
+                else:
+                    self.apply_change(change)
+                self.changes.seq = change.seq
+    
+    @metrics.timed("datastore.search")
+    def search(self, name, query, limit=20, prefix=True):
+        """全文检索职位或候选人，返回按相关度排序的记录"""
+        by_id = self._by_id[name]
+        hits = self._search_index(name, build=True).search(query, limit, prefix)
+        return [r for r in (by_id.get(doc_id) for doc_id, _ in hits) if r is not None]
     
+    def search_matches(self, name, record, query, prefix=True):
+        """单条记录是否会被 search(name, query) 检索到，用于记录变化后更新已有的检索结果"""
+        index = self.search_indexes.get(name)
+        return index is not None and index.matches(record, query, prefix)
+    
+    @metrics.timed("datastore.suggest")
+    def suggest(self, name, text, limit=20, **where):
+        """输入联想: 按关键词（末尾按前缀）检索并按字段等值过滤，最多返回 limit 条
+
+        text 为空时按原顺序取前 limit 条。只取需要的条数，不必先列出全部记录。
+        """
+        snapshot = self._snapshot
+        allowed = self.query(name, snapshot).where(**where).ids() if where else None
+        if not text.strip():
+            return list(islice((r for r in getattr(snapshot, name) if allowed is None or r.get("id") in allowed), limit))
+        by_id = snapshot.by_id[name]
+        index = self._search_index(name, build=True)
+        fetch = limit
+        while True:
+            hits = index.search(text, fetch)
+            results = [r for r in (by_id.get(doc_id) for doc_id, _ in hits if allowed is None or doc_id in allowed)
+                       if r is not None]
+            # 过滤掉的太多时多取一些再试，直到够数或检索结果已经取完
+            if len(results) >= limit or len(hits) < fetch:
+                return results[:limit]
+            fetch *= 4
+    
+    def _duplicates(self):
+        """返回去重索引，未建立时先建立"""
+        if not self.duplicate_index.ready:
+            with self._write_lock:
+                if not self.duplicate_index.ready:
+                    with metrics.timer("datastore.build_duplicate_index"):
+                        self.duplicate_index.build(self.candidates)
+        return self.duplicate_index
+    
+    @metrics.timed("datastore.find_duplicates")
+    def find_duplicates(self, candidate):
+        """可能与 candidate 是同一个人的已有候选人（电话、邮箱或姓名+技能相同），按原顺序
+
+        candidate 可以是还没有插入的数据，新增前用来查重。
+        """
+        candidate = dict(candidate)
+        VALIDATORS["candidates"].normalize(candidate)
+        index = self._duplicates()
+        with self._write_lock:
+            order = self._order["candidates"]
+            ids = sorted(index.matches(candidate), key=order.get)
+            return [self._by_id["candidates"][doc_id] for doc_id in ids]
+    
+    @metrics.timed("datastore.duplicate_groups")
+    def duplicate_groups(self, contact_only=False):
+        """全部重复组，每组为按原顺序排列的候选人列表，组按第一条记录的顺序排列
+
+        contact_only=True 时只按电话、邮箱相连，这些组可以直接合并；否则也按姓名+技能相连。
+        """
+        index = self._duplicates()
+        # 并查集要遍历整个索引，期间不能有写入
+        with self._write_lock:
+            order = self._order["candidates"]
+            by_id = self._by_id["candidates"]
+            groups = [sorted(group, key=order.get)
+                      for group in index.groups(CONTACT_KEYS if contact_only else None)]
+            groups.sort(key=lambda group: order[group[0]])
+            return [[by_id[doc_id] for doc_id in group] for group in groups]
+    
+    def review_duplicate_groups(self):
+        """需要人工确认的重复组: 有成员只靠姓名+技能与其他人相连（可能是同名的不同人），应逐组确认后再合并"""
+        with self._write_lock:
+            contact = {frozenset(c["id"] for c in group) for group in self.duplicate_groups(contact_only=True)}
+            return [group for group in self.duplicate_groups()
+                    if frozenset(c["id"] for c in group) not in contact]
+    
+    @metrics.timed("datastore.merge_candidates")
+    def merge_candidates(self, keep_id, duplicate_ids):
+        """把重复的候选人合并到 keep_id: 补齐空字段、合并技能、合同改为引用 keep_id，然后删除重复记录
+
+        返回合并后的记录，keep_id 不存在返回 None。所有修改完成后每个集合只保存一次。
+        """
+        with self._write_lock:
+            return self._merge_candidates(keep_id, duplicate_ids)
+    
+    def _merge_candidates(self, keep_id, duplicate_ids):
+        keep = self.get_record("candidates", keep_id)
+        if keep is None:
+            return None
+        duplicates = [self.get_record("candidates", doc_id) for doc_id in duplicate_ids if doc_id != keep_id]
+        duplicates = [d for d in duplicates if d is not None]
+        if not duplicates:
+            return keep
+        autosave, self.autosave = self.autosave, False
+        try:
+            changes = merged_fields(keep, duplicates)
+            if changes:
+                keep = self.update_record("candidates", keep_id, changes)
+            if not self.contract_view.ready:
+                self.contract_rows()
+            for duplicate in duplicates:
+                for contract_id in self.contract_view.contracts_of("candidates", duplicate["id"]):
+                    self.update_record("contracts", contract_id, {"candidate_id": keep_id})
+                self.delete_record("candidates", duplicate["id"])
+        finally:
+            self.autosave = autosave
+        if autosave:
+            self.flush()
+        metrics.incr("datastore.candidates_merged", len(duplicates))
+        return keep
+    
+    def query(self, name, snapshot=None):
+        """按字段过滤记录，例如 store.query("jobs").where(status="招聘中").all()
+
+        查询只使用一个快照（默认为当前版本）中的记录和索引；同时做多个查询时传入同一个 snapshot() 保证结果属于同一版本。
+        """
+        snapshot = snapshot or self._snapshot
+        return Query(getattr(snapshot, name), snapshot.by_id[name], snapshot.indexes[name], snapshot.order[name])
+    
+    def value_counts(self, name, field):
+        """有等值索引的字段各取值的记录数"""
+        return self.field_indexes[name][field].counts()
+    
+    def busy_candidate_ids(self, start=None, end=None, snapshot=None):
+        """[start, end] 期间有待签署或执行中合同的候选人ID集合"""
+        snapshot = snapshot or self._snapshot
+        return snapshot.indexes["contracts"]["active_period"].keys_overlapping(start, end)
+    
+    def available_candidates(self, start=None, end=None, status=None):
+        """[start, end] 期间没有合同占用的候选人，status 不为空时只取这些状态"""
+        snapshot = self._snapshot
+        busy = self.busy_candidate_ids(start, end, snapshot)
+        query = self.query("candidates", snapshot)
+        if status:
+            query = query.where(status=status)
+        return [c for c in query.all() if c.get("id") not in busy]
+    
+    def contract_rows(self):
+        """合同视图行（含职位名称、候选人姓名、工作日数和金额），按合同顺序"""
+        if not self.contract_view.ready:
+            with self._write_lock:
+                if not self.contract_view.ready:
+                    with metrics.timer("datastore.build_contract_view"):
+                        self.contract_view.build(self.jobs, self.candidates, self.contracts)
+        return self.contract_view.rows(self.contracts)
+    
+    def contract_row(self, contract_id):
+        """单个合同的视图行，不存在返回 None"""
+        if not self.contract_view.ready:
+            self.contract_rows()
+        return self.contract_view.row(contract_id)
+    
+    @metrics.timed("datastore.get_stats")
     def get_stats(self):
         """获取统计数据"""
+        snapshot = self._snapshot
         return {
-            "total_jobs": len(self.jobs),
-            "active_jobs": len([j for j in self.jobs if j["status"] == "招聘中"]),
-            "total_candidates": len(self.candidates),
-            "available_candidates": len([c for c in self.candidates if c["status"] == "可联系"]),
-            "total_contracts": len(self.contracts),
-            "active_contracts": len([c for c in self.contracts if c["status"] == "执行中"]),
-            "total_amount": sum(c.get("total_amount", 0) for c in self.contracts)
+            "total_jobs": len(snapshot.jobs),
+            "active_jobs": self.query("jobs", snapshot).where(status="招聘中").count(),
+            "total_candidates": len(snapshot.candidates),
+            "available_candidates": self.query("candidates", snapshot).where(status="可联系").count(),
+            "total_contracts": len(snapshot.contracts),
+            "active_contracts": self.query("contracts", snapshot).where(status="执行中").count(),
+            "total_amount": snapshot.indexes["contracts"]["contract_value"].total
         }
+    
+    def contract_terms(self, contract):
+        """合同的 (工作日数, 合同金额)，取自合同金额索引"""
+        return self.field_indexes["contracts"]["contract_value"].terms(contract)
+    
+    def payroll_schedule(self, contract):
+        """合同的结算计划（见 payroll.payroll_schedule）"""
+        return payroll_schedule(contract)
+    
+    @metrics.timed("datastore.monthly_payroll")
+    def monthly_payroll(self):
+        """各月应结算金额 {YYYY-MM: 金额}，数据版本不变时复用"""
+        snapshot = self._snapshot
+        if self._monthly_payroll is None or self._monthly_payroll[0] != snapshot.version:
+            self._monthly_payroll = (snapshot.version, monthly_payroll(snapshot.contracts))
+        return self._monthly_payroll[1]
+    
+    @metrics.timed("datastore.export_contracts_csv")
+    def export_contracts_csv(self, filepath):
+        """导出合同报表，含工作日数和合同金额"""
+        with open(filepath, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(["合同ID", "职位", "候选人", "开始日期", "结束日期",
+                             "日薪", "工作日", "合同金额", "付款方式", "状态"])
+            for row in self.contract_rows():
+                writer.writerow([
+                    row["id"],
+                    row["job_title"],
+                    row["candidate_name"],
+                    row["start_date"] or "",
+                    row["end_date"] or "",
+                    row["salary"] if row["salary"] is not None else "",
+                    row["work_days"],
+                    row["total_amount"],
+                    row["payment_method"] or "",
+                    row["status"] or ""
+                ])
+    
+    @metrics.timed("datastore.export_jobs_csv")
+    def export_jobs_csv(self, filepath):
+        """导出职位报告（与桌面版导出格式一致）"""
+        with open(filepath, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(["职位ID", "职位名称", "薪资", "地点", "状态", "发布日期"])
+            for job in self.jobs:
+                writer.writerow([
+                    job.get("id", ""),
+                    job.get("title", ""),
+                    job.get("salary", ""),
+                    job.get("location", ""),
+                    job.get("status", ""),
+                    job.get("created", "")
+                ])
@@ -0,0 +1,228 @@
+"""
+候选人去重 - 按分块键（blocking key）查找重复的候选人
+
+同一个人多次导入时姓名写法常常不同，逐对比较代价是 O(n²)。这里为每个候选人计算几个分块键，
+只有分块键相同的候选人才可能是同一个人:
+    phone    规范化后的手机号（只保留数字，去掉 86 国家码）
+    email    规范化后的邮箱（去掉空白，转小写）
+    profile  规范化后的姓名 + 技能集合（没有联系方式的候选人靠它去重）
+空的电话、邮箱不产生分块键，因此两个都没填联系方式的候选人不会因此被当成重复。
+
+电话或邮箱相同的候选人基本可以确定是同一个人，可以批量合并；只靠 profile 相连的可能是同名、技能相近的
+不同的人，只列出来由用户逐组确认（见 DataStore.duplicate_groups 的 contact_only 和 review_duplicate_groups）。
+
+DuplicateIndex 维护 分块键 -> 候选人ID集合 的哈希索引，随增删改增量维护；
+新增时查重只需查几个键，全量查找重复组按桶做并查集，代价与候选人数近似线性。
+
+命令行:
+    python dedup.py scan --data-dir web_data            列出重复组
+    python dedup.py merge --data-dir web_data           把电话、邮箱相同的每组合并到最早的一条记录
+    python dedup.py merge -i --data-dir web_data        另外逐组询问是否合并只有姓名+技能相同的组
+"""
+import argparse
+import os
+import re
+import sys
+
+# 可以直接合并的分块键类型（联系方式相同）；其余类型（profile）只作为疑似重复
+CONTACT_KEYS = ("phone", "email")
+
+# 手机号至少的位数，不够的视为无效
+MIN_PHONE_DIGITS = 7
+
+_NON_DIGIT = re.compile(r"\D+")
+
+# 姓名中忽略的空白和标点（保留中文、字母和数字）
+_NAME_NOISE = re.compile(r"[\s\W_]+")
+
+
+def normalize_phone(value):
+    """只保留数字并去掉国家码，位数不够时返回 None"""
+    digits = _NON_DIGIT.sub("", str(value or ""))
+    if digits.startswith("0086"):
+        digits = digits[4:]
+    elif digits.startswith("86") and len(digits) == 13:
+        digits = digits[2:]
+    return digits if len(digits) >= MIN_PHONE_DIGITS else None
+
+
+def normalize_email(value):
+    """去掉空白并转小写，不像邮箱时返回 None"""
+    email = str(value or "").strip().lower()
+    return email if "@" in email else None
+
+
+def normalize_name(value):
+    """去掉空白和标点并统一大小写，"Tom Li" 与 "tom-li" 相同"""
+    return _NAME_NOISE.sub("", str(value or "").casefold())
+
+
+def blocking_keys(candidate):
+    """候选人的分块键列表 [(类型, 取值)]"""
+    keys = []
+    phone = normalize_phone(candidate.get("phone"))
+    if phone:
+        keys.append(("phone", phone))
+    email = normalize_email(candidate.get("email"))
+    if email:
+        keys.append(("email", email))
+    name = normalize_name(candidate.get("name"))
+    skills = candidate.get("skills") or []
+    if name and skills:
+        signature = ",".join(sorted({str(s).strip().casefold() for s in skills if str(s).strip()}))
+        if signature:
+            keys.append(("profile", f"{name}|{signature}"))
+    return keys
+
+
+class DuplicateIndex:
+    """分块键哈希索引: 分块键 -> 候选人ID集合
+
+    未建立（ready 为 False）时 put/drop 不做任何事，由调用方在首次使用时 build。
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """清空索引，下次使用前需要重新 build"""
+        self._buckets = {}   # 分块键 -> 候选人ID集合
+        self._keys = {}      # 候选人ID -> 分块键列表
+        self.ready = False
+
+    def build(self, candidates):
+        self.reset()
+        for candidate in candidates:
+            self._add(candidate)
+        self.ready = True
+
+    def _add(self, candidate):
+        doc_id = candidate.get("id")
+        if doc_id is None:
+            return
+        keys = blocking_keys(candidate)
+        self._keys[doc_id] = keys
+        for key in keys:
+            docs = self._buckets.get(key)
+            if docs is None:
+                docs = self._buckets[key] = set()
+            docs.add(doc_id)
+
+    def put(self, candidate):
+        """候选人新增或修改后调用"""
+        if self.ready:
+            self._add(candidate)
+
+    def drop(self, candidate):
+        """候选人删除或修改前调用"""
+        if not self.ready:
+            return
+        for key in self._keys.pop(candidate.get("id"), ()):
+            docs = self._buckets.get(key)
+            if docs is None:
+                continue
+            docs.discard(candidate.get("id"))
+            if not docs:
+                del self._buckets[key]
+
+    def matches(self, candidate):
+        """与 candidate 有相同分块键的候选人ID集合（不含 candidate 自己）"""
+        found = set()
+        for key in blocking_keys(candidate):
+            found |= self._buckets.get(key, set())
+        found.discard(candidate.get("id"))
+        return found
+
+    def groups(self, kinds=None):
+        """重复组: 通过分块键相连的候选人ID集合（只返回两人以上的组）
+
+        kinds 不为空时只按这些类型的分块键相连，例如 CONTACT_KEYS。
+        """
+        parent = {}
+
+        def find(doc_id):
+            root = parent.setdefault(doc_id, doc_id)
+            while parent[root] != root:
+                root = parent[root]
+            while doc_id != root:
+                parent[doc_id], doc_id = root, parent[doc_id]
+            return root
+
+        for key, docs in self._buckets.items():
+            if len(docs) < 2 or (kinds is not None and key[0] not in kinds):
+                continue
+            docs = iter(docs)
+            root = find(next(docs))
+            for doc_id in docs:
+                other = find(doc_id)
+                if other != root:
+                    parent[other] = root
+        groups = {}
+        for doc_id in list(parent):
+            groups.setdefault(find(doc_id), set()).add(doc_id)
+        return list(groups.values())
+
+
+def merged_fields(keep, duplicates):
+    """把重复记录合并进 keep 后应更新的字段: keep 中为空的字段用重复记录补齐，技能取并集"""
+    changes = {}
+    skills = list(keep.get("skills") or [])
+    seen = {str(s).strip().casefold() for s in skills}
+    for duplicate in duplicates:
+        for field, value in duplicate.items():
+            if field in ("id", "skills") or value in (None, "", [], {}):
+                continue
+            if keep.get(field) in (None, "", [], {}) and field not in changes:
+                changes[field] = value
+        for skill in duplicate.get("skills") or []:
+            folded = str(skill).strip().casefold()
+            if folded and folded not in seen:
+                seen.add(folded)
+                skills.append(skill)
+    if len(skills) != len(keep.get("skills") or []):
+        changes["skills"] = skills
+    return changes
+
+
+def _describe(group):
+    return "  ".join(f"{c.get('id')} {c.get('name') or ''} {c.get('phone') or ''} {c.get('email') or ''}".rstrip()
+                     for c in group)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="查找并合并重复的候选人")
+    parser.add_argument("command", choices=["scan", "merge"])
+    parser.add_argument("--data-dir", default=os.environ.get("FLEXWORK_DATA_DIR", "web_data"))
+    parser.add_argument("-i", "--interactive", action="store_true", help="逐组询问是否合并只有姓名+技能相同的组")
+    args = parser.parse_args(argv)
+
+    from data_store import DataStore
+    store = DataStore(args.data_dir)
+    groups = store.duplicate_groups(contact_only=True)
+    for group in groups:
+        print(_describe(group))
+    print(f"共 {len(groups)} 组电话或邮箱相同的重复，涉及 {sum(len(g) for g in groups)} 名候选人")
+    review = store.review_duplicate_groups()
+    if review:
+        print("\n只有姓名+技能相同、需要确认的组:")
+        for group in review:
+            print(_describe(group))
+        print(f"共 {len(review)} 组需要确认")
+    if args.command != "merge":
+        return 0
+
+    for group in groups:
+        store.merge_candidates(group[0]["id"], [c["id"] for c in group[1:]])
+    merged = sum(len(g) - 1 for g in groups)
+    if args.interactive:
+        for group in store.review_duplicate_groups():
+            if input(f"合并 {_describe(group)} ？[y/N] ").strip().lower() == "y":
+                store.merge_candidates(group[0]["id"], [c["id"] for c in group[1:]])
+                merged += len(group) - 1
+    elif review:
+        print("只有姓名+技能相同的组没有合并，确认后用 -i 逐组合并")
+    print(f"已合并，删除 {merged} 条重复记录")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
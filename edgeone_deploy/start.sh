@@ -1,2 +1,4 @@
 #!/bin/bash
+# 网页版代码和数据层都在仓库根目录，这里只保留部署配置
+cd "$(dirname "$0")/.." || exit 1
 streamlit run web_app.py --server.port $PORT --server.address 0.0.0.0
@@ -0,0 +1,487 @@
+"""
+字段索引 - 状态、地点、日期等字段的二级索引
+
+HashIndex 按取值分组，用于等值过滤；SortedIndex 维护按取值排序的记录ID，用于日期范围过滤；
+SumIndex 维护字段合计；IntervalIndex 维护记录的 [开始, 结束] 区间，用于查询与某段日期重叠的记录。
+索引随数据层的增删改增量维护，过滤和统计的代价只与结果集大小相关。
+
+已发布的索引不再修改: 写入方先 copy() 出副本（共用不会再改动的内部结构），在副本上增删后
+与记录一起发布到数据层的快照中，查询只使用同一快照中的记录和索引。
+
+查询通过 Query 组合，例如:
+    store.query("jobs").where(status="招聘中", location=["上海", "远程"]).all()
+    store.query("contracts").between("start_date", "2024-01-01", "2024-06-30").count()
+    store.query("contracts").overlapping("active_period", "2024-03-01", "2024-03-31").all()
+"""
+import bisect
+from functools import partial
+from operator import itemgetter
+
+from payroll import ContractValueIndex
+
+
+class HashIndex:
+    """等值索引: 取值 -> 记录ID集合（frozenset，增删时替换为新集合）"""
+
+    def __init__(self, field):
+        self.field = field
+        self._groups = {}
+
+    def copy(self):
+        clone = HashIndex(self.field)
+        clone._groups = dict(self._groups)
+        return clone
+
+    def _value(self, record):
+        value = record.get(self.field)
+        if value is None or value == "" or isinstance(value, (list, dict)):
+            return None
+        return value
+
+    def build(self, records):
+        groups = {}
+        for record in records:
+            value = self._value(record)
+            doc_id = record.get("id")
+            if value is None or doc_id is None:
+                continue
+            docs = groups.get(value)
+            if docs is None:
+                docs = groups[value] = set()
+            docs.add(doc_id)
+        self._groups = {value: frozenset(docs) for value, docs in groups.items()}
+
+    def add(self, record):
+        value = self._value(record)
+        doc_id = record.get("id")
+        if value is None or doc_id is None:
+            return
+        self._groups[value] = self._groups.get(value, frozenset()) | {doc_id}
+
+    def remove(self, record):
+        """移除一条记录（必须在记录内容被修改之前调用）"""
+        value = self._value(record)
+        docs = self._groups.get(value) if value is not None else None
+        if not docs:
+            return
+        docs = docs - {record.get("id")}
+        if docs:
+            self._groups[value] = docs
+        else:
+            del self._groups[value]
+
+    def lookup(self, values):
+        """取值属于 values 的记录ID集合（返回的集合不可修改）"""
+        if len(values) == 1:
+            return self._groups.get(values[0], frozenset())
+        result = set()
+        for value in values:
+            result |= self._groups.get(value, set())
+        return result
+
+    def counts(self):
+        """各取值的记录数"""
+        return {value: len(docs) for value, docs in self._groups.items()}
+
+
+class SortedIndex:
+    """范围索引: 按取值排序的 (取值, 记录ID)，取值统一按字符串比较（日期格式 YYYY-MM-DD）"""
+
+    def __init__(self, field):
+        self.field = field
+        # (取值列表, 记录ID列表)，两个列表按位置对应。列表发布后不再修改，
+        # 增删时生成新的两个列表再作为一个元组整体替换，不加锁的读取方不会看到取值和记录ID错位
+        self._entries = ([], [])
+
+    def copy(self):
+        clone = SortedIndex(self.field)
+        clone._entries = self._entries
+        return clone
+
+    def _value(self, record):
+        value = record.get(self.field)
+        if value is None or value == "":
+            return None
+        return str(value)
+
+    def build(self, records):
+        entries = []
+        for record in records:
+            value = self._value(record)
+            if value is not None and record.get("id") is not None:
+                entries.append((value, record["id"]))
+        entries.sort()
+        self._entries = ([value for value, _ in entries], [doc_id for _, doc_id in entries])
+
+    def add(self, record):
+        value = self._value(record)
+        doc_id = record.get("id")
+        if value is None or doc_id is None:
+            return
+        values, ids = self._entries
+        pos = bisect.bisect_right(values, value)
+        self._entries = (values[:pos] + [value] + values[pos:], ids[:pos] + [doc_id] + ids[pos:])
+
+    def remove(self, record):
+        """移除一条记录（必须在记录内容被修改之前调用）"""
+        value = self._value(record)
+        if value is None:
+            return
+        doc_id = record.get("id")
+        values, ids = self._entries
+        start = bisect.bisect_left(values, value)
+        end = bisect.bisect_right(values, value)
+        for pos in range(start, end):
+            if ids[pos] == doc_id:
+                self._entries = (values[:pos] + values[pos + 1:], ids[:pos] + ids[pos + 1:])
+                return
+
+    @staticmethod
+    def _bounds(values, start=None, end=None):
+        lo = 0 if start is None else bisect.bisect_left(values, str(start))
+        hi = len(values) if end is None else bisect.bisect_right(values, str(end))
+        return lo, max(lo, hi)
+
+    def range(self, start=None, end=None):
+        """取值在 [start, end] 内的记录ID集合，start/end 为 None 表示不限"""
+        values, ids = self._entries
+        lo, hi = self._bounds(values, start, end)
+        return set(ids[lo:hi])
+
+    def count_range(self, start=None, end=None):
+        lo, hi = self._bounds(self._entries[0], start, end)
+        return hi - lo
+
+
+class SumIndex:
+    """数值字段合计"""
+
+    def __init__(self, field):
+        self.field = field
+        self.total = 0
+
+    def copy(self):
+        clone = SumIndex(self.field)
+        clone.total = self.total
+        return clone
+
+    def _value(self, record):
+        value = record.get(self.field)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return 0
+        return value
+
+    def build(self, records):
+        self.total = sum(self._value(record) for record in records)
+
+    def add(self, record):
+        self.total += self._value(record)
+
+    def remove(self, record):
+        self.total -= self._value(record)
+
+
+class _IntervalNode:
+    """区间树节点，创建后不再修改"""
+
+    __slots__ = ("start", "end", "doc_id", "key", "max_end", "height", "left", "right")
+
+    def __init__(self, start, end, doc_id, key, left=None, right=None):
+        self.start = start
+        self.end = end
+        self.doc_id = doc_id
+        self.key = key
+        self.left = left
+        self.right = right
+        self.height = 1 + max(_height(left), _height(right))
+        max_end = end
+        if left is not None and left.max_end > max_end:
+            max_end = left.max_end
+        if right is not None and right.max_end > max_end:
+            max_end = right.max_end
+        self.max_end = max_end
+
+    def with_children(self, left, right):
+        """同一区间、换了左右子树的新节点"""
+        return _IntervalNode(self.start, self.end, self.doc_id, self.key, left, right)
+
+
+def _height(node):
+    return node.height if node is not None else 0
+
+
+def _rotate_right(node):
+    top = node.left
+    return top.with_children(top.left, node.with_children(top.right, node.right))
+
+
+def _rotate_left(node):
+    top = node.right
+    return top.with_children(node.with_children(node.left, top.left), top.right)
+
+
+def _balance(node):
+    """左右子树高度差不超过 2 的 node 重新平衡后的子树根（新节点，不修改原有节点）"""
+    diff = _height(node.left) - _height(node.right)
+    if diff > 1:
+        if _height(node.left.left) < _height(node.left.right):
+            node = node.with_children(_rotate_left(node.left), node.right)
+        return _rotate_right(node)
+    if diff < -1:
+        if _height(node.right.right) < _height(node.right.left):
+            node = node.with_children(node.left, _rotate_right(node.right))
+        return _rotate_left(node)
+    return node
+
+
+def _insert(node, new):
+    if node is None:
+        return new
+    if (new.start, new.doc_id) < (node.start, node.doc_id):
+        return _balance(node.with_children(_insert(node.left, new), node.right))
+    return _balance(node.with_children(node.left, _insert(node.right, new)))
+
+
+def _delete(node, key):
+    """删除 key=(开始, 记录ID) 后的子树根；没有这个节点时原样返回 node"""
+    if node is None:
+        return None
+    node_key = (node.start, node.doc_id)
+    if key < node_key:
+        left = _delete(node.left, key)
+        return node if left is node.left else _balance(node.with_children(left, node.right))
+    if key > node_key:
+        right = _delete(node.right, key)
+        return node if right is node.right else _balance(node.with_children(node.left, right))
+    if node.left is None:
+        return node.right
+    if node.right is None:
+        return node.left
+    # 用右子树中最小的节点替换被删除的节点
+    successor = node.right
+    while successor.left is not None:
+        successor = successor.left
+    return _balance(successor.with_children(node.left, _detach_min(node.right)))
+
+
+def _detach_min(node):
+    if node.left is None:
+        return node.right
+    return _balance(node.with_children(_detach_min(node.left), node.right))
+
+
+class IntervalIndex:
+    """区间索引: 增强的 AVL 树，按 (开始, 记录ID) 排序，每个节点记录子树中最大的结束值
+
+    查询与 [start, end] 重叠的区间只需访问 O(log n + 命中数) 个节点，增删为 O(log n)。
+    树是持久化的: 节点创建后不再修改，增删时只复制从根到修改位置路径上的节点，再整体替换
+    (根, 区间数)。不加锁的读取方从取到的根开始遍历，看到的始终是某一时刻完整的树。
+    statuses 不为空时只索引这些状态的记录（例如只有执行中的合同才占用候选人的时间）；
+    key_field 为区间所属的对象（例如候选人ID），用于按对象汇总查询结果。
+    """
+
+    def __init__(self, field, start_field, end_field, key_field=None, statuses=None):
+        self.field = field
+        self.start_field = start_field
+        self.end_field = end_field
+        self.key_field = key_field
+        self.statuses = frozenset(statuses) if statuses else None
+        self._tree = (None, 0)
+
+    def copy(self):
+        clone = IntervalIndex(self.field, self.start_field, self.end_field, self.key_field, self.statuses)
+        clone._tree = self._tree
+        return clone
+
+    def __len__(self):
+        return self._tree[1]
+
+    def _interval(self, record):
+        """记录的 (开始, 结束)，日期缺失、区间颠倒或状态不符时返回 None"""
+        if self.statuses is not None and record.get("status") not in self.statuses:
+            return None
+        start, end = record.get(self.start_field), record.get(self.end_field)
+        if not start or not end or record.get("id") is None:
+            return None
+        start, end = str(start), str(end)
+        if start > end:
+            return None
+        return start, end
+
+    def _node(self, record, interval):
+        return _IntervalNode(interval[0], interval[1], record["id"],
+                             record.get(self.key_field) if self.key_field else None)
+
+    def build(self, records):
+        items = []
+        for record in records:
+            interval = self._interval(record)
+            if interval is not None:
+                items.append((interval[0], record["id"], interval[1],
+                              record.get(self.key_field) if self.key_field else None))
+        items.sort(key=itemgetter(0, 1))
+
+        # 有序区间直接自底向上组成平衡树，比逐个插入快
+        def attach(lo, hi):
+            if lo >= hi:
+                return None
+            mid = (lo + hi) // 2
+            start, doc_id, end, key = items[mid]
+            return _IntervalNode(start, end, doc_id, key, attach(lo, mid), attach(mid + 1, hi))
+
+        self._tree = (attach(0, len(items)), len(items))
+
+    def add(self, record):
+        interval = self._interval(record)
+        if interval is None:
+            return
+        root, size = self._tree
+        self._tree = (_insert(root, self._node(record, interval)), size + 1)
+
+    def remove(self, record):
+        interval = self._interval(record)
+        if interval is None:
+            return
+        root, size = self._tree
+        new_root = _delete(root, (interval[0], record["id"]))
+        if new_root is not root:
+            self._tree = (new_root, size - 1)
+
+    def _search(self, start, end):
+        """与 [start, end] 重叠的节点；start/end 为 None 表示不限"""
+        found = []
+        stack = [self._tree[0]]
+        while stack:
+            node = stack.pop()
+            # 子树中所有区间都在 start 之前结束
+            if node is None or (start is not None and node.max_end < start):
+                continue
+            stack.append(node.left)
+            # 右子树的区间都不早于当前节点开始
+            if end is not None and node.start > end:
+                continue
+            if start is None or node.end >= start:
+                found.append(node)
+            stack.append(node.right)
+        return found
+
+    def overlapping(self, start=None, end=None):
+        """区间与 [start, end]（包含两端）重叠的记录ID集合"""
+        start = None if start is None else str(start)
+        end = None if end is None else str(end)
+        return {node.doc_id for node in self._search(start, end)}
+
+    def keys_overlapping(self, start=None, end=None):
+        """区间与 [start, end] 重叠的记录所属对象（key_field 的取值）集合"""
+        start = None if start is None else str(start)
+        end = None if end is None else str(end)
+        return {node.key for node in self._search(start, end) if node.key is not None}
+
+
+# 占用候选人时间的合同状态
+BUSY_CONTRACT_STATUSES = ("待签署", "执行中")
+
+# 集合 -> {字段: 索引类型}
+FIELD_INDEXES = {
+    "jobs": {"status": HashIndex, "location": HashIndex, "created": SortedIndex},
+    "candidates": {"status": HashIndex, "location": HashIndex},
+    "contracts": {
+        "status": HashIndex,
+        "start_date": SortedIndex,
+        "end_date": SortedIndex,
+        # 合同金额（未填写 total_amount 时按日薪和工作日计算，见 payroll.py）
+        "contract_value": ContractValueIndex,
+        # 占用候选人时间的合同期，按候选人汇总（见 DataStore.busy_candidate_ids）
+        "active_period": partial(IntervalIndex, start_field="start_date", end_field="end_date",
+                                 key_field="candidate_id", statuses=BUSY_CONTRACT_STATUSES)
+    }
+}
+
+
+def create_indexes(name):
+    """为集合创建空的字段索引"""
+    return {field: cls(field) for field, cls in FIELD_INDEXES.get(name, {}).items()}
+
+
+class Query:
+    """可组合的过滤查询，条件之间为 AND
+
+    有索引的字段直接取记录ID集合，从最小的集合开始求交集；
+    没有索引的字段退化为对候选记录逐条过滤。
+    记录、ID索引、字段索引和插入序号都取自同一个数据快照，查询期间的写入不影响结果。
+    """
+
+    def __init__(self, records, by_id, indexes, order):
+        self._records = records  # 快照中的记录（元组），全量扫描和大结果按它的顺序
+        self._by_id = by_id
+        self._indexes = indexes
+        self._order = order      # 记录ID -> 插入序号，用于按原顺序返回
+        self._sets = []          # 函数，返回记录ID集合
+        self._filters = []       # 函数，逐条判断记录
+
+    def where(self, **fields):
+        """等值过滤，取值为列表/元组/集合时表示其中任意一个"""
+        for field, value in fields.items():
+            values = list(value) if isinstance(value, (list, tuple, set, frozenset)) else [value]
+            index = self._indexes.get(field)
+            if isinstance(index, HashIndex):
+                self._sets.append(lambda index=index, values=values: index.lookup(values))
+            else:
+                self._filters.append(lambda r, field=field, values=values: r.get(field) in values)
+        return self
+
+    def between(self, field, start=None, end=None):
+        """范围过滤，包含两端，start/end 为 None 表示不限"""
+        index = self._indexes.get(field)
+        if isinstance(index, SortedIndex):
+            self._sets.append(lambda: index.range(start, end))
+        else:
+            def in_range(record):
+                value = record.get(field)
+                if value is None or value == "":
+                    return False
+                value = str(value)
+                return (start is None or value >= str(start)) and (end is None or value <= str(end))
+            self._filters.append(in_range)
+        return self
+
+    def overlapping(self, field, start=None, end=None):
+        """区间与 [start, end] 重叠的记录，field 为区间索引的名字（如合同的 active_period）"""
+        index = self._indexes.get(field)
+        if not isinstance(index, IntervalIndex):
+            raise KeyError(f"没有区间索引: {field}")
+        self._sets.append(lambda: index.overlapping(start, end))
+        return self
+
+    def ids(self):
+        """命中的记录ID集合"""
+        if not self._sets:
+            return {record.get("id") for record in self._records
+                    if all(f(record) for f in self._filters)}
+        sets = sorted((make() for make in self._sets), key=len)
+        result = set(sets[0])
+        for other in sets[1:]:
+            if not result:
+                break
+            result &= other
+        if self._filters:
+            by_id = self._by_id
+            result = {doc_id for doc_id in result if all(f(by_id[doc_id]) for f in self._filters)}
+        return result
+
+    def count(self):
+        """命中的记录数"""
+        if not self._filters and len(self._sets) == 1:
+            return len(self._sets[0]())
+        return len(self.ids())
+
+    def all(self):
+        """命中的记录，保持集合中的原有顺序"""
+        if not self._sets and not self._filters:
+            return list(self._records)
+        ids = self.ids()
+        if len(ids) * 4 > len(self._records):
+            # 结果占集合的大部分时，按原顺序扫描比排序更快
+            return [record for record in self._records if record.get("id") in ids]
+        by_id = self._by_id
+        return [by_id[doc_id] for doc_id in sorted(ids, key=self._order.__getitem__)]
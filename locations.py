@@ -0,0 +1,135 @@
+"""
+地点匹配 - 城市坐标表和预先计算的城市兼容度矩阵
+
+城市两两之间的得分在导入时一次算好，匹配时每个职位取一行，
+每个候选人只需一次字典查找，不在打分循环里计算距离。
+"""
+import math
+
+REMOTE = "远程"
+
+# 城市 -> (纬度, 经度, 区域)
+CITIES = {
+    "北京": (39.90, 116.41, "华北"),
+    "天津": (39.13, 117.20, "华北"),
+    "石家庄": (38.04, 114.51, "华北"),
+    "太原": (37.87, 112.55, "华北"),
+    "呼和浩特": (40.84, 111.75, "华北"),
+    "上海": (31.23, 121.47, "华东"),
+    "南京": (32.06, 118.80, "华东"),
+    "苏州": (31.30, 120.59, "华东"),
+    "无锡": (31.49, 120.31, "华东"),
+    "杭州": (30.27, 120.16, "华东"),
+    "宁波": (29.87, 121.55, "华东"),
+    "合肥": (31.82, 117.23, "华东"),
+    "福州": (26.07, 119.30, "华东"),
+    "厦门": (24.48, 118.09, "华东"),
+    "济南": (36.65, 117.12, "华东"),
+    "青岛": (36.07, 120.38, "华东"),
+    "南昌": (28.68, 115.86, "华东"),
+    "广州": (23.13, 113.26, "华南"),
+    "深圳": (22.54, 114.06, "华南"),
+    "东莞": (23.02, 113.75, "华南"),
+    "佛山": (23.02, 113.12, "华南"),
+    "珠海": (22.27, 113.58, "华南"),
+    "香港": (22.32, 114.17, "华南"),
+    "南宁": (22.82, 108.37, "华南"),
+    "海口": (20.04, 110.32, "华南"),
+    "武汉": (30.59, 114.31, "华中"),
+    "长沙": (28.23, 112.94, "华中"),
+    "郑州": (34.75, 113.62, "华中"),
+    "成都": (30.57, 104.07, "西南"),
+    "重庆": (29.56, 106.55, "西南"),
+    "昆明": (25.04, 102.71, "西南"),
+    "贵阳": (26.65, 106.63, "西南"),
+    "西安": (34.34, 108.94, "西北"),
+    "兰州": (36.06, 103.83, "西北"),
+    "乌鲁木齐": (43.83, 87.62, "西北"),
+    "沈阳": (41.81, 123.43, "东北"),
+    "大连": (38.91, 121.61, "东北"),
+    "长春": (43.82, 125.32, "东北"),
+    "哈尔滨": (45.80, 126.53, "东北"),
+}
+
+# 通勤距离分档（公里）
+COMMUTE_KM = 100
+NEARBY_KM = 300
+
+# 各种情况的地点得分
+LOCATION_SCORES = {
+    "remote": 100,        # 远程职位，任何地点都可以
+    "same_city": 100,
+    "commute": 85,        # 可通勤，例如 深圳-东莞
+    "nearby": 70,         # 300 公里内，例如 上海-杭州
+    "same_region": 55,
+    "far": 20,
+    "remote_only": 30,    # 候选人只接受远程，职位需要到岗
+    "unknown": 50         # 地点缺失或不在城市表中，给中性分
+}
+
+
+def normalize_location(location):
+    """统一地点写法: 去掉空白和末尾的“市”"""
+    location = str(location or "").strip()
+    if location.endswith("市") and location[:-1] in CITIES:
+        location = location[:-1]
+    return location
+
+
+def distance_km(a, b):
+    """两个城市之间的球面距离"""
+    lat1, lon1, _ = CITIES[a]
+    lat2, lon2, _ = CITIES[b]
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    h = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * 6371 * math.asin(math.sqrt(h))
+
+
+def _pair_score(a, b):
+    if a == b:
+        return LOCATION_SCORES["same_city"]
+    distance = distance_km(a, b)
+    if distance <= COMMUTE_KM:
+        return LOCATION_SCORES["commute"]
+    if distance <= NEARBY_KM:
+        return LOCATION_SCORES["nearby"]
+    if CITIES[a][2] == CITIES[b][2]:
+        return LOCATION_SCORES["same_region"]
+    return LOCATION_SCORES["far"]
+
+
+def _build_matrix():
+    """职位城市 -> {候选人地点写法: 得分}，候选人地点同时收录“上海”和“上海市”两种写法"""
+    matrix = {}
+    for job_city in CITIES:
+        row = {REMOTE: LOCATION_SCORES["remote_only"]}
+        for city in CITIES:
+            score = _pair_score(job_city, city)
+            row[city] = score
+            row[city + "市"] = score
+        matrix[job_city] = row
+    return matrix
+
+
+COMPATIBILITY = _build_matrix()
+
+
+def location_row(job_location):
+    """职位对应的一行得分，返回 (得分表, 默认分)
+
+    打分时用 row.get(候选人地点, 默认分)；远程职位的得分表为空，所有人都取满分。
+    """
+    city = normalize_location(job_location)
+    if city == REMOTE:
+        return {}, LOCATION_SCORES["remote"]
+    if city in COMPATIBILITY:
+        return COMPATIBILITY[city], LOCATION_SCORES["unknown"]
+    return {}, LOCATION_SCORES["unknown"]
+
+
+def location_score(job_location, candidate_location):
+    """单个职位和候选人的地点得分"""
+    row, default = location_row(job_location)
+    return row.get(candidate_location, default)
@@ -0,0 +1,163 @@
+"""
+智能匹配 - 职位与候选人的匹配打分
+
+打分规则见 scoring.py（可通过配置文件调整），这里提供各端共用的入口。
+"""
+import metrics
+from retrieval import CandidateRetriever, load_embeddings
+from scoring import STREAM_CHUNK_SIZE, CandidateMatrix, JobMatrix, get_scorer
+
+# 参与匹配的候选人状态（来自打分配置）
+MATCHABLE_STATUSES = get_scorer().statuses
+
+# 参与推荐的职位状态
+OPEN_JOB_STATUS = "招聘中"
+
+# DataStore 实例 -> {集合: 变更次数}，由变更流订阅维护
+_change_counts = {}
+
+# DataStore 实例 -> (候选人变更次数, 可匹配候选人的列存)
+_matrix_cache = {}
+
+# DataStore 实例 -> (建立时的列存, 粗筛索引或 None)
+_retriever_cache = {}
+
+# DataStore 实例 -> (职位变更次数, 招聘中职位的列存)
+_job_matrix_cache = {}
+
+
+def _collection_version(store, name):
+    """集合的变更次数（首次调用时订阅数据变更流）
+
+    只在该集合变化或数据整体重新加载时增加，修改职位或合同不会让候选人列存失效。
+    """
+    counts = _change_counts.get(store.instance_id)
+    if counts is None:
+        counts = _change_counts[store.instance_id] = {"jobs": 0, "candidates": 0, "contracts": 0}
+
+        def on_change(change):
+            for collection in (list(counts) if change.op == "reload" else [change.collection]):
+                counts[collection] = counts.get(collection, 0) + 1
+        store.changes.subscribe(on_change)
+    return counts.get(name, 0)
+
+
+def candidate_matrix(store):
+    """数据存储中可匹配候选人的列存，候选人不变时复用"""
+    cached = _matrix_cache.get(store.instance_id)
+    version = _collection_version(store, "candidates")
+    if cached is None or cached[0] != version:
+        with metrics.timer("match.build_matrix"):
+            candidates = store.query("candidates").where(status=MATCHABLE_STATUSES).all()
+            cached = (version, CandidateMatrix(candidates))
+        _matrix_cache[store.instance_id] = cached
+    return cached[1]
+
+
+def candidate_retriever(store):
+    """粗筛索引；未启用、候选人不够多或没有训练好的技能向量时返回 None"""
+    settings = get_scorer().retrieval
+    if not settings.get("enabled"):
+        return None
+    matrix = candidate_matrix(store)
+    if matrix.size < settings.get("min_candidates", 0):
+        return None
+    cached = _retriever_cache.get(store.instance_id)
+    if cached is None or cached[0] is not matrix:
+        embeddings = load_embeddings(store.data_dir)
+        with metrics.timer("match.build_retriever"):
+            retriever = CandidateRetriever(matrix, embeddings) if embeddings is not None else None
+        cached = (matrix, retriever)
+        _retriever_cache[store.instance_id] = cached
+    return cached[1]
+
+
+def candidate_pool(store, job):
+    """职位的候选人池: 启用粗筛时为按技能向量召回的部分候选人，否则为全部可匹配候选人"""
+    matrix = candidate_matrix(store)
+    retriever = candidate_retriever(store)
+    if retriever is None:
+        return matrix
+    settings = get_scorer().retrieval
+    with metrics.timer("match.shortlist"):
+        rows = retriever.shortlist(job, settings["shortlist"], settings["nprobe"])
+    return matrix if rows is None else matrix.subset(rows)
+
+
+def job_matrix(store):
+    """数据存储中招聘中职位的列存和技能倒排，职位不变时复用"""
+    cached = _job_matrix_cache.get(store.instance_id)
+    version = _collection_version(store, "jobs")
+    if cached is None or cached[0] != version:
+        with metrics.timer("match.build_job_matrix"):
+            cached = (version, JobMatrix(store.query("jobs").where(status=OPEN_JOB_STATUS).all()))
+        _job_matrix_cache[store.instance_id] = cached
+    return cached[1]
+
+
+def busy_candidates(store, job):
+    """职位工作期间已有合同占用的候选人ID集合；打分配置关闭档期检查时返回 None"""
+    scorer = get_scorer()
+    if scorer.availability_mode == "off":
+        return None
+    with metrics.timer("match.busy_candidates"):
+        return store.busy_candidate_ids(*scorer.job_window(job))
+
+
+@metrics.timed("match.recommend_jobs")
+def recommend_jobs(candidate, jobs, limit=10):
+    """为候选人推荐职位，按分数从高到低排序
+
+    jobs 可以是职位列表，也可以是 JobMatrix（多次推荐时复用，见 job_matrix）。
+    """
+    return top_recommendations(candidate, jobs, limit)[1]
+
+
+def top_recommendations(candidate, jobs, limit=10):
+    """返回 (符合条件的职位数, 前 limit 名推荐职位)"""
+    matrix = jobs if isinstance(jobs, JobMatrix) else JobMatrix(jobs)
+    return get_scorer().top_jobs(candidate, matrix, limit)
+
+
+def score_candidate(job, candidate):
+    """计算单个候选人对职位的匹配分数（不应用过滤条件）"""
+    return get_scorer().rank(job, CandidateMatrix([candidate]), apply_filters=False)[0]
+
+
+@metrics.timed("match.match_candidates")
+def match_candidates(job, candidates, limit=None, busy=None):
+    """为职位匹配候选人，按分数从高到低排序
+
+    candidates 可以是候选人列表，也可以是 CandidateMatrix（多次匹配时复用，见 candidate_matrix）。
+    busy 为职位工作期间档期被占用的候选人ID（见 busy_candidates），按打分配置扣分或排除。
+    """
+    matrix = candidates if isinstance(candidates, CandidateMatrix) else CandidateMatrix(candidates)
+    busy_rows = matrix.rows_of(busy) if busy is not None else None
+    results = get_scorer().rank(job, matrix, limit, busy_rows=busy_rows)
+    metrics.incr("match.candidates_scored", matrix.size)
+    return results
+
+
+@metrics.timed("match.top_matches")
+def top_matches(job, candidates, limit, busy=None):
+    """返回 (符合条件的候选人数, 前 limit 名匹配结果)"""
+    matrix = candidates if isinstance(candidates, CandidateMatrix) else CandidateMatrix(candidates)
+    busy_rows = matrix.rows_of(busy) if busy is not None else None
+    metrics.incr("match.candidates_scored", matrix.size)
+    return get_scorer().top(job, matrix, limit, busy_rows=busy_rows)
+
+
+def stream_matches(job, candidates, limit=20, busy=None, chunk_size=STREAM_CHUNK_SIZE, time_budget=None):
+    """分块匹配，每块打完产出一次目前的前 limit 名（scoring.MatchProgress），用于边打分边显示
+
+    time_budget（秒）不为空时，超时后产出目前最好的结果并结束（最后一次进度的 complete 为 False）。
+    """
+    matrix = candidates if isinstance(candidates, CandidateMatrix) else CandidateMatrix(candidates)
+    busy_rows = matrix.rows_of(busy) if busy is not None else None
+    scanned = 0
+    for progress in get_scorer().top_stream(job, matrix, limit, busy_rows, chunk_size, time_budget):
+        metrics.incr("match.candidates_scored", progress.scanned - scanned)
+        scanned = progress.scanned
+        yield progress
+    if scanned < matrix.size:
+        metrics.incr("match.stream_timeouts")
@@ -0,0 +1,197 @@
+"""
+性能指标 - 计数器、耗时直方图和文本导出
+
+默认关闭，设置环境变量 FLEXWORK_METRICS=1 或调用 enable() 开启。
+关闭时 timed 装饰器只多一次布尔判断，timer() 返回共享的空计时器。
+"""
+import functools
+import os
+import re
+import threading
+import time
+
+# 直方图桶上界（毫秒）
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_enabled = os.environ.get("FLEXWORK_METRICS", "") not in ("", "0", "false")
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+
+
+class Histogram:
+    """耗时直方图（毫秒）"""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def observe(self, ms):
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+
+class Timer:
+    """计时器，可作为上下文管理器，也可手动 start()/stop()"""
+
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name):
+        self.name = name
+        self._start = None
+
+    def start(self):
+        self._start = time.perf_counter()
+        return self
+
+    def stop(self):
+        if self._start is not None:
+            observe(self.name, (time.perf_counter() - self._start) * 1000)
+            self._start = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+class _NullTimer:
+    """指标关闭时使用的空计时器"""
+
+    __slots__ = ()
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def enable():
+    """开启指标采集"""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """关闭指标采集"""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def incr(name, value=1):
+    """计数器加值"""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name, ms):
+    """记录一次耗时（毫秒）"""
+    if not _enabled:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(ms)
+
+
+def timer(name):
+    """返回计时器: with metrics.timer("web.page.dashboard"): ..."""
+    if not _enabled:
+        return _NULL_TIMER
+    return Timer(name)
+
+
+def timed(name):
+    """函数耗时装饰器"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorator
+
+
+def reset():
+    """清空所有指标"""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def snapshot():
+    """以字典形式返回当前指标"""
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "histograms": {
+                name: {
+                    "count": h.count,
+                    "sum_ms": h.total,
+                    "max_ms": h.max,
+                    "avg_ms": h.total / h.count if h.count else 0.0
+                }
+                for name, h in _histograms.items()
+            }
+        }
+
+
+def _metric_name(name):
+    return "flexwork_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def render_text():
+    """导出 Prometheus 文本格式，用于 /metrics 或调试面板"""
+    lines = []
+    with _lock:
+        for name in sorted(_counters):
+            metric = _metric_name(name) + "_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {_counters[name]}")
+        for name in sorted(_histograms):
+            h = _histograms[name]
+            metric = _metric_name(name) + "_ms"
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, count in zip(BUCKETS_MS, h.buckets):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{le="+Inf"}} {h.count}')
+            lines.append(f"{metric}_sum {h.total:.3f}")
+            lines.append(f"{metric}_count {h.count}")
+    return "\n".join(lines) + "\n"
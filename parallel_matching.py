@@ -0,0 +1,167 @@
+"""
+并行批量匹配 - 候选人列存放入共享内存，多进程并行给大量职位打分
+
+    busy = [busy_candidates(store, job) for job in jobs]
+    with ParallelMatcher(candidate_matrix(store), workers=8) as matcher:
+        for job, (total, results) in zip(jobs, matcher.match_many(jobs, limit=10, busy=busy)):
+            ...
+
+主进程把 CandidateMatrix 的各个数组复制一次到 multiprocessing.shared_memory，
+子进程启动时按名字挂载为 numpy 数组（不复制），每个任务给一批职位打分，
+只把前 K 名的行号和得分传回主进程，由主进程对照候选人记录组装结果。
+busy 为每个职位档期被占用的候选人ID（见 matching.busy_candidates），主进程换算为行号随任务传给子进程，
+按打分配置扣分或排除，结果与单个职位的 matching.top_matches 一致。
+"""
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from scoring import CandidateMatrix, Scorer, get_scorer
+
+# 放入共享内存的列存数组
+SHARED_ARRAYS = (
+    "salary", "experience", "status_codes", "location_codes",
+    "skill_rows", "skill_ids", "skill_offsets"
+)
+
+# 打分只用到的职位字段，其余字段不传给子进程
+JOB_FIELDS = ("skills", "salary", "location", "min_experience")
+
+# 子进程状态: 共享内存句柄、挂载的列存、打分器
+_worker = {}
+
+
+def _init_worker(specs, meta, config):
+    """子进程初始化: 挂载共享内存中的数组"""
+    import numpy as np
+
+    blocks = []
+    matrix = CandidateMatrix.__new__(CandidateMatrix)
+    matrix.candidates = None
+    for name, value in meta.items():
+        setattr(matrix, name, value)
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        setattr(matrix, name, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+    _worker.update(blocks=blocks, matrix=matrix, scorer=Scorer(config))
+
+
+def _match_batch(jobs, limit, busy_rows=None):
+    """在子进程中给一批职位打分，返回每个职位的 (符合条件人数, 行号, 得分)
+
+    busy_rows 与 jobs 一一对应，为档期被占用的候选人行号（None 表示不检查档期）。
+    """
+    scorer, matrix = _worker["scorer"], _worker["matrix"]
+    busy_rows = busy_rows or [None] * len(jobs)
+    return [scorer.top_rows(job, matrix, limit, busy_rows=rows) for job, rows in zip(jobs, busy_rows)]
+
+
+def _busy_rows(matrix, busy, count):
+    """每个职位档期被占用的候选人ID -> 行号数组，busy 为 None 时返回 None"""
+    if busy is None:
+        return None
+    busy = list(busy)
+    if len(busy) != count:
+        raise ValueError(f"busy 的长度（{len(busy)}）与职位数（{count}）不一致")
+    return [matrix.rows_of(ids) if ids is not None else None for ids in busy]
+
+
+class ParallelMatcher:
+    """共享内存 + 进程池的批量匹配器，用完需 close()（或使用 with）"""
+
+    def __init__(self, matrix, workers=None, scorer=None):
+        import numpy as np
+
+        self.matrix = matrix
+        self.workers = workers or os.cpu_count() or 1
+        self.scorer = scorer or get_scorer()
+        self._blocks = []
+        self._executor = None
+        try:
+            specs = {}
+            for name in SHARED_ARRAYS:
+                array = getattr(matrix, name)
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                specs[name] = (block.name, array.shape, array.dtype.str)
+            meta = {
+                "size": matrix.size,
+                "skill_vocab": matrix.skill_vocab,
+                "status_values": matrix.status_values,
+                "location_values": matrix.location_values
+            }
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(specs, meta, self.scorer.config)
+            )
+        except Exception:
+            self.close()
+            raise
+
+    def warm_up(self):
+        """提前启动所有子进程（进程启动和挂载不计入第一批匹配的耗时）"""
+        futures = [self._executor.submit(_match_batch, [], 0) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def match_many(self, jobs, limit=10, batch_size=None, busy=None):
+        """批量匹配，返回与 jobs 一一对应的 [(符合条件人数, 前 limit 名结果)]
+
+        busy 与 jobs 一一对应，为各职位档期被占用的候选人ID集合（None 表示不检查档期）。
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return []
+        busy_rows = _busy_rows(self.matrix, busy, len(jobs))
+        batch_size = batch_size or max(1, math.ceil(len(jobs) / (self.workers * 4)))
+        starts = range(0, len(jobs), batch_size)
+        batches = [jobs[i:i + batch_size] for i in starts]
+        futures = [
+            self._executor.submit(_match_batch, [{k: job.get(k) for k in JOB_FIELDS} for job in batch], limit,
+                                  busy_rows[i:i + batch_size] if busy_rows is not None else None)
+            for i, batch in zip(starts, batches)
+        ]
+
+        results = []
+        candidates = self.matrix.candidates
+        for batch, future in zip(batches, futures):
+            for job, (count, rows, scores) in zip(batch, future.result()):
+                matched = [candidates[row] for row in rows.tolist()]
+                results.append((count, self.scorer.build_results(job, matched, scores)))
+        return results
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def match_jobs(matrix, jobs, limit=10, workers=None, busy=None):
+    """批量匹配的便捷入口: 单进程或职位很少时直接在当前进程打分
+
+    busy 与 jobs 一一对应，为各职位档期被占用的候选人ID集合（见 matching.busy_candidates）。
+    """
+    jobs = list(jobs)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(jobs) < workers * 2:
+        scorer = get_scorer()
+        busy_rows = _busy_rows(matrix, busy, len(jobs)) or [None] * len(jobs)
+        return [scorer.top(job, matrix, limit, busy_rows=rows) for job, rows in zip(jobs, busy_rows)]
+    with ParallelMatcher(matrix, workers) as matcher:
+        return matcher.match_many(jobs, limit, busy=busy)
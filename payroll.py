@@ -0,0 +1,343 @@
+"""
+合同金额与薪资结算 - 工作日计算、结算计划和合同总金额
+
+合同只需填写日薪（salary）和起止日期，工作日按离线节假日日历计算（周一至周五，
+扣除法定节假日，加上调休补班日）:
+
+    合同金额 = total_amount（已填写时以合同约定为准）或 日薪 × 工作日数
+    结算计划: 月结按自然月、周结按自然周（周一至周日）、其余一次性结清，
+             每期金额按该期工作日数分摊合同金额
+
+日历内置 2024-2026 年的安排，可用环境变量 FLEXWORK_HOLIDAYS 指定 JSON 文件补充:
+    {"holidays": ["2027-01-01", ...], "workdays": ["2027-02-06", ...]}
+
+ContractValueIndex 作为合同集合的字段索引，加载时整批（numpy）计算、增删改时逐条维护，
+统计合同总金额不需要遍历合同。
+"""
+import bisect
+import json
+import os
+from datetime import date, timedelta
+
+HOLIDAYS_ENV = "FLEXWORK_HOLIDAYS"
+
+# 法定节假日（含首尾），只需列出放假区间，区间内的周末本来就不是工作日
+HOLIDAY_RANGES = [
+    ("2024-01-01", "2024-01-01"), ("2024-02-10", "2024-02-17"), ("2024-04-04", "2024-04-06"),
+    ("2024-05-01", "2024-05-05"), ("2024-06-10", "2024-06-10"), ("2024-09-15", "2024-09-17"),
+    ("2024-10-01", "2024-10-07"),
+    ("2025-01-01", "2025-01-01"), ("2025-01-28", "2025-02-04"), ("2025-04-04", "2025-04-06"),
+    ("2025-05-01", "2025-05-05"), ("2025-05-31", "2025-06-02"), ("2025-10-01", "2025-10-08"),
+    ("2026-01-01", "2026-01-03"), ("2026-02-15", "2026-02-23"), ("2026-04-04", "2026-04-06"),
+    ("2026-05-01", "2026-05-05"), ("2026-06-19", "2026-06-21"), ("2026-09-25", "2026-09-27"),
+    ("2026-10-01", "2026-10-07"),
+]
+
+# 调休补班的周末
+MAKEUP_WORKDAYS = [
+    "2024-02-04", "2024-02-18", "2024-04-07", "2024-04-28", "2024-05-11", "2024-09-14",
+    "2024-09-29", "2024-10-12",
+    "2025-01-26", "2025-02-08", "2025-04-27", "2025-09-28", "2025-10-11",
+    "2026-01-04", "2026-02-14", "2026-02-28", "2026-05-09", "2026-09-20", "2026-10-10",
+]
+
+# 付款方式 -> 结算周期
+SETTLEMENT_PERIODS = {"月结": "month", "周结": "week"}
+
+# 数量达到该值时整批用 numpy 计算，否则逐条计算（避免为几条合同导入 numpy）
+BATCH_THRESHOLD = 1000
+
+
+def _parse_date(value):
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+class WorkCalendar:
+    """工作日历: 周一至周五，扣除节假日，加上补班日"""
+
+    def __init__(self, holidays=(), workdays=()):
+        holidays = {_parse_date(d) for d in holidays} - {None}
+        workdays = {_parse_date(d) for d in workdays} - {None}
+        # 只有落在工作日的节假日和落在周末的补班日会改变工作日数
+        self.holidays = sorted(d for d in holidays if d.weekday() < 5)
+        self.workdays = sorted(d for d in workdays if d.weekday() >= 5)
+        self._arrays = None
+
+    @classmethod
+    def default(cls, path=None):
+        """内置日历，加上 FLEXWORK_HOLIDAYS 指定文件中的日期"""
+        holidays = []
+        for start, end in HOLIDAY_RANGES:
+            day, end = _parse_date(start), _parse_date(end)
+            while day <= end:
+                holidays.append(day)
+                day += timedelta(days=1)
+        workdays = list(MAKEUP_WORKDAYS)
+        path = path or os.environ.get(HOLIDAYS_ENV)
+        if path:
+            with open(path, 'r', encoding='utf-8') as f:
+                extra = json.load(f)
+            holidays.extend(extra.get("holidays", []))
+            workdays.extend(extra.get("workdays", []))
+        return cls(holidays, workdays)
+
+    def is_workday(self, day):
+        index = bisect.bisect_left(self.holidays, day)
+        if index < len(self.holidays) and self.holidays[index] == day:
+            return False
+        if day.weekday() < 5:
+            return True
+        index = bisect.bisect_left(self.workdays, day)
+        return index < len(self.workdays) and self.workdays[index] == day
+
+    def work_days(self, start, end):
+        """[start, end]（含两端）内的工作日数，start 晚于 end 时为 0"""
+        if start > end:
+            return 0
+        days = (end - start).days + 1
+        weeks, rest = divmod(days, 7)
+        count = weeks * 5
+        weekday = start.weekday()
+        for offset in range(rest):
+            if (weekday + offset) % 7 < 5:
+                count += 1
+        count -= bisect.bisect_right(self.holidays, end) - bisect.bisect_left(self.holidays, start)
+        count += bisect.bisect_right(self.workdays, end) - bisect.bisect_left(self.workdays, start)
+        return count
+
+    def work_days_batch(self, starts, ends):
+        """整批计算，starts/ends 为 datetime64[D] 数组，返回工作日数数组"""
+        import numpy as np
+
+        if self._arrays is None:
+            self._arrays = (np.array(self.holidays, dtype="datetime64[D]"),
+                            np.array(self.workdays, dtype="datetime64[D]"))
+        holidays, workdays = self._arrays
+        valid = starts <= ends
+        ends_exclusive = np.where(valid, ends + 1, starts)
+        counts = np.busday_count(starts, ends_exclusive, holidays=holidays)
+        counts += np.searchsorted(workdays, ends_exclusive) - np.searchsorted(workdays, starts)
+        return np.where(valid, counts, 0)
+
+
+_calendar = None
+
+
+def get_calendar():
+    """默认工作日历（进程内只加载一次）"""
+    global _calendar
+    if _calendar is None:
+        _calendar = WorkCalendar.default()
+    return _calendar
+
+
+def contract_period(contract):
+    """合同的 (开始日期, 结束日期)，缺失或无法解析时返回 None"""
+    start, end = _parse_date(contract.get("start_date")), _parse_date(contract.get("end_date"))
+    if start is None or end is None:
+        return None
+    return start, end
+
+
+def contract_terms(contract, calendar=None):
+    """单个合同的 (工作日数, 合同金额)"""
+    calendar = calendar or get_calendar()
+    period = contract_period(contract)
+    work_days = calendar.work_days(*period) if period else 0
+    return work_days, _amount(contract, work_days)
+
+
+def _amount(contract, work_days):
+    total = _number(contract.get("total_amount"))
+    if total is not None:
+        return total
+    salary = _number(contract.get("salary"))
+    return salary * work_days if salary is not None else 0
+
+
+def _date_columns(contracts):
+    """合同起止日期的 datetime64[D] 数组和有效标记（日期都能解析且开始不晚于结束）
+
+    无效的位置填入同一个占位日期，使数组可以直接参与计算。
+    """
+    import numpy as np
+
+    columns = []
+    for field in ("start_date", "end_date"):
+        values = [str(c.get(field) or "NaT")[:10] for c in contracts]
+        try:
+            if any(len(v) != 10 and v != "NaT" for v in values):
+                raise ValueError
+            column = np.array(values, dtype="datetime64[D]")
+        except ValueError:
+            # 有格式不规范的日期时逐个解析
+            column = np.array([_parse_date(v) or "NaT" for v in values], dtype="datetime64[D]")
+        columns.append(column)
+    starts, ends = columns
+    valid = ~(np.isnat(starts) | np.isnat(ends))
+    valid[valid] = starts[valid] <= ends[valid]
+    placeholder = np.datetime64("2000-01-01")
+    return np.where(valid, starts, placeholder), np.where(valid, ends, placeholder), valid
+
+
+def batch_terms(contracts, calendar=None):
+    """整批计算，返回与 contracts 一一对应的 [(工作日数, 合同金额)]"""
+    import numpy as np
+
+    calendar = calendar or get_calendar()
+    starts, ends, valid = _date_columns(contracts)
+    counts = np.where(valid, calendar.work_days_batch(starts, ends), 0)
+    return [(days, _amount(c, days)) for c, days in zip(contracts, counts.tolist())]
+
+
+def _fingerprint(contract):
+    """影响合同金额的字段，不变时复用已计算的结果"""
+    return (contract.get("start_date"), contract.get("end_date"),
+            contract.get("salary"), contract.get("total_amount"))
+
+
+def _periods(start, end, settlement):
+    """把 [start, end] 按结算周期切分为 [(期初, 期末)]"""
+    if settlement not in ("month", "week"):
+        return [(start, end)]
+    periods = []
+    period_start = start
+    while period_start <= end:
+        if settlement == "month":
+            next_month = (period_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+            period_end = next_month - timedelta(days=1)
+        else:
+            period_end = period_start + timedelta(days=6 - period_start.weekday())
+        period_end = min(period_end, end)
+        periods.append((period_start, period_end))
+        period_start = period_end + timedelta(days=1)
+    return periods
+
+
+def payroll_schedule(contract, calendar=None):
+    """合同的结算计划: [{"period_start", "period_end", "work_days", "amount"}]
+
+    每期金额按工作日数分摊合同金额，保留两位小数，尾差计入最后一期。
+    """
+    calendar = calendar or get_calendar()
+    period = contract_period(contract)
+    if period is None:
+        return []
+    work_days, amount = contract_terms(contract, calendar)
+    settlement = SETTLEMENT_PERIODS.get(contract.get("payment_method"))
+    schedule, paid = [], 0
+    periods = _periods(period[0], period[1], settlement)
+    for i, (start, end) in enumerate(periods):
+        days = calendar.work_days(start, end)
+        if i == len(periods) - 1:
+            share = round(amount - paid, 2)
+        else:
+            share = round(amount * days / work_days, 2) if work_days else 0
+        paid += share
+        schedule.append({
+            "period_start": start.isoformat(),
+            "period_end": end.isoformat(),
+            "work_days": days,
+            "amount": share
+        })
+    return schedule
+
+
+def monthly_payroll(contracts, calendar=None):
+    """各月应结算金额 {YYYY-MM: 金额}，合同金额按每月工作日数分摊，按月份排序"""
+    import numpy as np
+
+    calendar = calendar or get_calendar()
+    if not contracts:
+        return {}
+    starts, ends, valid = _date_columns(contracts)
+    rows = np.flatnonzero(valid)
+    if not len(rows):
+        return {}
+    starts, ends = starts[rows], ends[rows]
+    work_days = calendar.work_days_batch(starts, ends)
+    totals = work_days.astype(float)
+    amounts = np.array([_amount(contracts[row], days) for row, days in zip(rows.tolist(), work_days.tolist())],
+                       dtype=float)
+
+    # 每个合同跨越的每个月一段: 段起止 = 合同起止与自然月的交集
+    first = starts.astype("datetime64[M]")
+    spans = (ends.astype("datetime64[M]") - first).astype(np.int64) + 1
+    owner = np.repeat(np.arange(len(rows)), spans)
+    months = first[owner] + (np.arange(len(owner)) - np.repeat(np.cumsum(spans) - spans, spans))
+    seg_starts = np.maximum(months.astype("datetime64[D]"), starts[owner])
+    seg_ends = np.minimum((months + 1).astype("datetime64[D]") - 1, ends[owner])
+    days = calendar.work_days_batch(seg_starts, seg_ends)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        share = np.where(totals[owner] > 0, amounts[owner] * days / totals[owner], 0.0)
+    # 没有工作日的合同（例如全在假期内）金额计入开始月份
+    no_days = np.flatnonzero(totals == 0)
+    labels, inverse = np.unique(months, return_inverse=True)
+    result = np.bincount(inverse, weights=share, minlength=len(labels))
+    if len(no_days):
+        label_index = {str(m): i for i, m in enumerate(labels)}
+        for i in no_days.tolist():
+            result[label_index[str(first[i])]] += amounts[i]
+    return {str(m): float(v) for m, v in zip(labels, result)}
+
+
+class ContractValueIndex:
+    """合同金额索引: 每个合同的 (字段指纹, 工作日数, 金额) 和金额合计
+
+    接口与 field_index 中的 SumIndex 一致（build/add/remove/copy/total），
+    另外可按合同ID取出已计算的工作日数和金额。
+    """
+
+    def __init__(self, field):
+        self.field = field
+        self.total = 0
+        self._entries = {}
+
+    def copy(self):
+        clone = ContractValueIndex(self.field)
+        clone.total = self.total
+        clone._entries = dict(self._entries)
+        return clone
+
+    def build(self, records):
+        records = [r for r in records if r.get("id") is not None]
+        if len(records) >= BATCH_THRESHOLD:
+            terms = batch_terms(records)
+        else:
+            terms = [contract_terms(r) for r in records]
+        self._entries = {
+            r["id"]: (_fingerprint(r), days, amount) for r, (days, amount) in zip(records, terms)
+        }
+        self.total = sum(amount for _, _, amount in self._entries.values())
+
+    def add(self, record):
+        doc_id = record.get("id")
+        if doc_id is None:
+            return
+        days, amount = contract_terms(record)
+        self._entries[doc_id] = (_fingerprint(record), days, amount)
+        self.total += amount
+
+    def remove(self, record):
+        entry = self._entries.pop(record.get("id"), None)
+        if entry is not None:
+            self.total -= entry[2]
+
+    def terms(self, record):
+        """合同的 (工作日数, 金额)；记录内容与索引时不一致时重新计算"""
+        entry = self._entries.get(record.get("id"))
+        if entry is not None and entry[0] == _fingerprint(record):
+            return entry[1], entry[2]
+        return contract_terms(record)
@@ -0,0 +1,228 @@
+"""
+候选人粗筛 - 技能向量 + IVF 近似最近邻索引
+
+候选人池很大时，先按技能向量召回一批候选人，再对这部分做精确打分:
+
+1. 离线训练技能向量: 统计 candidates.json / jobs.json 中技能的共现，
+   PPMI 矩阵做特征分解得到每个技能的稠密向量，保存到数据目录:
+       python retrieval.py train --data-dir web_data
+2. 候选人向量为其技能向量之和，k-means 聚类后建立倒排（IVF）索引
+3. 查询时用职位技能向量之和，扫描内积最高的 nprobe 个聚类，召回前 shortlist 名
+
+是否启用以及召回规模由打分配置的 retrieval 部分控制（见 scoring.py），
+召回率评估: python -m benchmarks.recall
+"""
+import argparse
+import os
+from collections import Counter
+
+from schema import normalize_file
+
+EMBEDDINGS_FILE = "skill_embeddings.npz"
+
+
+def _skill_keys(skills):
+    """技能统一为去重后的小写形式（数据层已去掉空白，见 schema.py）"""
+    return list(dict.fromkeys(s.lower() for s in skills or ()))
+
+
+class SkillEmbeddings:
+    """技能 -> 稠密向量"""
+
+    def __init__(self, vocab, vectors):
+        self.vocab = list(vocab)
+        self.vectors = vectors
+        self.index = {skill: i for i, skill in enumerate(self.vocab)}
+        self.dim = vectors.shape[1]
+
+    @classmethod
+    def train(cls, skill_lists, dim=32, min_count=2, max_vocab=5000):
+        """由技能共现训练向量，skill_lists 为每条记录的技能列表"""
+        import numpy as np
+
+        lists = [_skill_keys(skills) for skills in skill_lists]
+        counts = Counter(skill for skills in lists for skill in skills)
+        vocab = [s for s, c in counts.most_common(max_vocab) if c >= min_count]
+        if not vocab:
+            raise ValueError("没有足够的技能数据用于训练")
+        index = {skill: i for i, skill in enumerate(vocab)}
+
+        # 共现计数（含技能与自身），按批次累加避免巨大的中间列表
+        cooc = np.zeros((len(vocab), len(vocab)))
+        rows, cols = [], []
+        for skills in lists:
+            ids = [index[s] for s in skills if s in index]
+            for i in ids:
+                rows.extend([i] * len(ids))
+                cols.extend(ids)
+            if len(rows) > 1000000:
+                np.add.at(cooc, (rows, cols), 1)
+                rows, cols = [], []
+        if rows:
+            np.add.at(cooc, (rows, cols), 1)
+
+        # PPMI
+        total = cooc.sum()
+        marginal = cooc.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pmi = np.log(cooc * total / np.outer(marginal, marginal))
+        ppmi = np.where(np.isfinite(pmi) & (pmi > 0), pmi, 0.0)
+
+        # 取最大的 dim 个特征值对应的特征向量，使向量内积近似 PPMI
+        eigenvalues, eigenvectors = np.linalg.eigh(ppmi)
+        top = np.argsort(eigenvalues)[::-1][:min(dim, len(vocab))]
+        top = top[eigenvalues[top] > 0]
+        vectors = eigenvectors[:, top] * np.sqrt(eigenvalues[top])
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+        return cls(vocab, vectors.astype(np.float32))
+
+    def save(self, path):
+        import numpy as np
+        np.savez(path, vocab=np.array(self.vocab), vectors=self.vectors)
+
+    @classmethod
+    def load(cls, path):
+        import numpy as np
+        with np.load(path) as data:
+            return cls([str(s) for s in data["vocab"]], data["vectors"])
+
+    def embed_skills(self, skills):
+        """一组技能的向量之和；没有已知技能时返回 None"""
+        ids = [self.index[s] for s in _skill_keys(skills) if s in self.index]
+        if not ids:
+            return None
+        return self.vectors[ids].sum(axis=0)
+
+    def embed_matrix(self, matrix):
+        """CandidateMatrix 中每个候选人的向量（技能向量之和），返回 (行数, dim) 数组"""
+        import numpy as np
+
+        vectors = np.zeros((matrix.size, self.dim), dtype=np.float32)
+        translate = np.full(len(matrix.skill_vocab) + 1, -1, dtype=np.int64)
+        for skill, skill_id in matrix.skill_vocab.items():
+            translate[skill_id] = self.index.get(skill, -1)
+        ids = translate[matrix.skill_ids]
+        known = ids >= 0
+        rows, ids = matrix.skill_rows[known], ids[known]
+        if len(rows):
+            # skill_rows 按行号有序，用 reduceat 按行求和
+            starts = np.flatnonzero(np.concatenate(([True], rows[1:] != rows[:-1])))
+            vectors[rows[starts]] = np.add.reduceat(self.vectors[ids], starts, axis=0)
+        return vectors
+
+
+class IVFIndex:
+    """倒排文件索引: k-means 把向量分到 nlist 个聚类，查询时只扫描最接近的几个聚类"""
+
+    def __init__(self, vectors, nlist=None, train_size=50000, iterations=10, seed=0):
+        import numpy as np
+
+        self.vectors = vectors
+        count = len(vectors)
+        self.nlist = max(1, min(nlist or int(count ** 0.5), 4096, count))
+        rng = np.random.default_rng(seed)
+
+        sample = vectors[rng.choice(count, min(count, train_size), replace=False)] if count else vectors
+        centroids = sample[rng.choice(len(sample), self.nlist, replace=False)].copy() if count else \
+            np.zeros((1, vectors.shape[1]), dtype=vectors.dtype)
+        for _ in range(iterations):
+            assign = self._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            sizes = np.bincount(assign, minlength=len(centroids))
+            empty = sizes == 0
+            centroids = np.where(empty[:, None], centroids, sums / np.maximum(sizes, 1)[:, None])
+            if empty.any():
+                # 空聚类重新随机取点
+                centroids[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        self.centroids = centroids.astype(vectors.dtype)
+
+        assign = self._assign(vectors, self.centroids)
+        self.order = np.argsort(assign, kind="stable")
+        self.offsets = np.concatenate(([0], np.cumsum(np.bincount(assign, minlength=len(self.centroids)))))
+
+    @staticmethod
+    def _assign(vectors, centroids, chunk=65536):
+        """每个向量最近的聚类（欧氏距离）"""
+        import numpy as np
+
+        half_norms = (centroids ** 2).sum(axis=1) / 2
+        assign = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk):
+            block = vectors[start:start + chunk]
+            assign[start:start + chunk] = np.argmax(block @ centroids.T - half_norms, axis=1)
+        return assign
+
+    def search(self, query, k, nprobe=16):
+        """返回内积最高的前 k 个向量的行号（按得分从高到低）"""
+        import numpy as np
+
+        probe = np.argsort(self.centroids @ query)[::-1][:nprobe]
+        rows = np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in probe])
+        if len(rows) == 0:
+            return rows
+        scores = self.vectors[rows] @ query
+        if len(rows) > k:
+            top = np.argpartition(scores, len(rows) - k)[len(rows) - k:]
+            rows, scores = rows[top], scores[top]
+        return rows[np.argsort(-scores, kind="stable")]
+
+
+class CandidateRetriever:
+    """为 CandidateMatrix 建立的粗筛索引"""
+
+    def __init__(self, matrix, embeddings, nlist=None):
+        self.matrix = matrix
+        self.embeddings = embeddings
+        self.index = IVFIndex(embeddings.embed_matrix(matrix), nlist)
+
+    def shortlist(self, job, size, nprobe=16):
+        """召回的候选人行号（升序）；职位没有已知技能时返回 None，由调用方退回精确打分"""
+        import numpy as np
+
+        query = self.embeddings.embed_skills(job.get("skills"))
+        if query is None:
+            return None
+        return np.sort(self.index.search(query, size, nprobe))
+
+
+def embeddings_path(data_dir):
+    return os.path.join(data_dir, EMBEDDINGS_FILE)
+
+
+def load_embeddings(data_dir):
+    """读取数据目录中训练好的技能向量，不存在时返回 None"""
+    path = embeddings_path(data_dir)
+    if not os.path.exists(path):
+        return None
+    return SkillEmbeddings.load(path)
+
+
+def train_from_data_dir(data_dir, dim=32, min_count=2):
+    """用数据目录中的职位和候选人训练技能向量并保存"""
+    skill_lists = []
+    for collection in ("candidates", "jobs"):
+        path = os.path.join(data_dir, f"{collection}.json")
+        if os.path.exists(path):
+            records, _ = normalize_file(path, collection)
+            skill_lists.extend(r["skills"] for r in records)
+    embeddings = SkillEmbeddings.train(skill_lists, dim, min_count)
+    embeddings.save(embeddings_path(data_dir))
+    return embeddings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="技能向量训练")
+    parser.add_argument("command", choices=["train"])
+    parser.add_argument("--data-dir", default=os.environ.get("FLEXWORK_DATA_DIR", "web_data"))
+    parser.add_argument("--dim", type=int, default=32)
+    parser.add_argument("--min-count", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    embeddings = train_from_data_dir(args.data_dir, args.dim, args.min_count)
+    print(f"已训练 {len(embeddings.vocab)} 个技能的 {embeddings.dim} 维向量: {embeddings_path(args.data_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,27 @@
 # -*- coding: utf8 -*-
-
-
-def teacher_go():
-    # todo: teacher_go action
-    return {
-        "result": "it is teacher_go action"
-    }
-
-
-def student_go():
-    # todo: student_go action
-    return {
-        "result": "it is student_go action"
-    }
-
-
-def student_come():
-    # todo: student_come action
-    return {
-        "result": "it is student_come action"
-    }
-
-
-def main_handler(event, context):
-    print(str(event))
-    # `/user_type/{user_type}/action/{action}`
-    user_type = ""
-    action = ""
-    path = event.get('path')
-    print(path)
-    data_list = path.split("/")
-    print(data_list)
-    if len(data_list) >= 5:
-        user_type = data_list[2]
-        action = data_list[4]
-    if user_type == "teacher":
-        if action == "go":
-            return teacher_go()
-    if user_type == "student":
-        if action == "go":
-            return student_go()
-        if action == "come":
-            return student_come()
-    return "hello world"
+"""
+云函数入口 - 转发到仓库根目录的 api.py
+
+部署时 serverless.yml 的 src 指向仓库根目录，handler 为 api.main_handler；
+本文件保留 index.main_handler 入口，便于本地调试:
+    python scf-deploy/flexwork/index.py GET /stats
+"""
+import json
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from api import main_handler  # noqa: E402
+
+
+if __name__ == "__main__":
+    method = sys.argv[1] if len(sys.argv) > 1 else "GET"
+    path = sys.argv[2] if len(sys.argv) > 2 else "/stats"
+    body = sys.argv[3] if len(sys.argv) > 3 else None
+    response = main_handler({"httpMethod": method, "path": path, "body": body}, None)
+    print(response["statusCode"])
+    print(json.dumps(json.loads(response["body"]), ensure_ascii=False, indent=2)
+          if response["body"] and "json" in response["headers"]["Content-Type"] else response["body"])
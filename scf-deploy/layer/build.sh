@@ -0,0 +1,8 @@
+#!/bin/bash
+# 按 scf-deploy/flexwork/requirements.txt 安装云函数依赖到 python/，供 layer 组件上传
+# 云函数运行在 Linux x86_64 + Python3.9，这里强制下载对应平台的二进制包
+set -e
+cd "$(dirname "$0")"
+rm -rf python
+pip install -r ../flexwork/requirements.txt -t python \
+    --platform manylinux2014_x86_64 --python-version 3.9 --only-binary=:all:
@@ -0,0 +1,411 @@
+"""
+数据格式 - 职位、候选人、合同的字段类型，写入时校验并规范化
+
+每个集合声明字段及其类型，启动时编译为 Validator。新增和修改记录时严格校验（格式错误抛出 SchemaError），
+加载文件时宽松规范化（无法识别的可选字段被丢弃，有默认值的字段改为默认值），之后读取方可以直接依赖字段类型:
+    text     去掉首尾空白的字符串
+    number   数字（"400元/天" 转为 400）
+    count    非负整数
+    years    年数（"3-5年" 转为 3，"5年以上" 转为 5）
+    date     YYYY-MM-DD 格式的存在的日期（兼容 2024/1/5、2024.01.05；2024-02-30 不合法）
+    skills   去重后的技能列表（"Python, React"、"测试用例、测试执行" 拆为多项）
+字段为 null 视为未填写；有默认值的字段（skills、status、候选人的 expected_salary 等）总是存在，
+读取方可以直接取；其他可选字段可能不存在，读取时用 get。未声明的字段原样保留。
+职位的 min_experience（打分用的最低经验年数）由 experience 推导，"不限" 为 0。
+职位和合同的 end_date 不能早于 start_date。
+
+已经规范的记录只做类型检查（快速路径），不复制、不修改。
+
+命令行（直接处理数据目录下的文件）:
+    python schema.py check --data-dir web_data     列出不规范的记录
+    python schema.py repair --data-dir web_data    规范化后写回，原文件备份为 *.json.bak
+"""
+import argparse
+import copy
+import json
+import os
+import re
+import shutil
+import sys
+from collections import namedtuple
+from datetime import date
+
+Field = namedtuple("Field", "name kind required default")
+
+
+def field(name, kind, required=False, default=None):
+    return Field(name, kind, required, default)
+
+
+# 集合 -> 字段
+SCHEMAS = {
+    "jobs": [
+        field("title", "text", required=True),
+        field("skills", "skills", default=[]),
+        field("salary", "text"),
+        field("location", "text"),
+        field("status", "text", default="招聘中"),
+        field("description", "text"),
+        field("requirements", "text"),
+        field("experience", "text"),
+        field("min_experience", "years"),
+        field("job_type", "text"),
+        field("urgency", "text"),
+        field("created", "date"),
+        field("start_date", "date"),
+        field("end_date", "date"),
+        field("applicants", "count", default=0),
+    ],
+    "candidates": [
+        field("name", "text", required=True),
+        field("skills", "skills", default=[]),
+        field("experience", "years"),
+        field("expected_salary", "number", default=0),
+        field("location", "text"),
+        field("status", "text", default="可联系"),
+        field("phone", "text", default=""),
+        field("email", "text", default=""),
+        field("availability", "text"),
+    ],
+    "contracts": [
+        field("job_id", "text", required=True),
+        field("candidate_id", "text", required=True),
+        field("start_date", "date"),
+        field("end_date", "date"),
+        field("salary", "number"),
+        field("total_amount", "number"),
+        field("status", "text"),
+        field("payment_method", "text"),
+        field("work_hours", "text"),
+        field("work_content", "text"),
+    ],
+}
+
+# 集合 -> [(推导字段, 来源字段, 推导函数)]，来源字段有值而推导字段未填写时计算
+DERIVED = {
+    "jobs": [("min_experience", "experience", lambda value: _first_number(value) or 0)],
+}
+
+# 集合 -> [(开始字段, 结束字段)]，两个日期都填写时结束不能早于开始
+DATE_RANGES = {
+    "jobs": [("start_date", "end_date")],
+    "contracts": [("start_date", "end_date")],
+}
+
+# 技能之间的分隔符（不含 "/"，以免拆开 UI/UX、HTML/CSS）
+_SKILL_SEPARATORS = re.compile(r"[,，、;；\n]")
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+_LOOSE_DATE = re.compile(r"(\d{4})\s*[-/.年]\s*(\d{1,2})\s*[-/.月]\s*(\d{1,2})")
+
+# 删除字段的标记
+_DROP = object()
+
+
+class SchemaError(ValueError):
+    """记录不符合数据格式"""
+
+    def __init__(self, collection, errors):
+        super().__init__(f"{collection} 数据格式错误: " + "；".join(errors))
+        self.collection = collection
+        self.errors = errors
+
+
+def _first_number(value):
+    match = _NUMBER.search(str(value))
+    if match is None:
+        return None
+    number = float(match.group())
+    return int(number) if number.is_integer() else number
+
+
+# ===== 各类型: (快速检查表达式, 规范化) =====
+# 快速检查表达式（取值为 v）为 True 的取值已经规范；规范化返回新值，无法识别时抛出 ValueError
+
+def _to_text(value):
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise ValueError("应为文本")
+
+
+def _to_number(value):
+    if isinstance(value, bool):
+        raise ValueError("应为数字")
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        text = value.replace("元/天", "").replace("元", "").replace(",", "").strip()
+        try:
+            number = float(text)
+        except ValueError:
+            raise ValueError("应为数字")
+        return int(number) if number.is_integer() else number
+    raise ValueError("应为数字")
+
+
+def _to_count(value):
+    number = _to_number(value)
+    if number < 0 or not float(number).is_integer():
+        raise ValueError("应为非负整数")
+    return int(number)
+
+
+def _to_years(value):
+    if isinstance(value, bool):
+        raise ValueError("应为年数")
+    if isinstance(value, (int, float)):
+        number = value
+    else:
+        number = _first_number(value) if isinstance(value, str) else None
+        if number is None:
+            raise ValueError("应为年数")
+    if number < 0:
+        raise ValueError("年数不能为负")
+    return number
+
+
+def _to_date(value):
+    match = _LOOSE_DATE.match(str(value).strip()) if isinstance(value, str) else None
+    if match is None:
+        raise ValueError("应为 YYYY-MM-DD 格式的日期")
+    try:
+        return date(*(int(part) for part in match.groups())).isoformat()
+    except ValueError:
+        raise ValueError("日期不存在")
+
+
+def _is_date(value):
+    """是否为 YYYY-MM-DD 格式且确实存在的日期"""
+    if type(value) is not str or len(value) != 10 or _ISO_DATE.fullmatch(value) is None:
+        return False
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_skills(value):
+    """技能列表是否已规范: 非空、无首尾空白、不含分隔符的文本，且不区分大小写不重复"""
+    if type(value) is not list:
+        return False
+    if not value:
+        return True
+    try:
+        text = "\x00".join(value)
+    except TypeError:
+        return False
+    if _SKILL_SEPARATORS.search(text):
+        return False
+    for skill in value:
+        if not skill or skill != skill.strip():
+            return False
+    return len(set(text.lower().split("\x00"))) == len(value)
+
+
+def _to_skills(value):
+    if isinstance(value, str):
+        value = [value]
+    elif not isinstance(value, (list, tuple)):
+        raise ValueError("应为技能列表")
+    skills, seen = [], set()
+    for item in value:
+        if isinstance(item, bool) or not isinstance(item, (str, int, float)):
+            raise ValueError("技能应为文本")
+        for skill in _SKILL_SEPARATORS.split(str(item)):
+            skill = skill.strip()
+            if skill and skill.lower() not in seen:
+                seen.add(skill.lower())
+                skills.append(skill)
+    return skills
+
+
+KINDS = {
+    "text": ("type(v) is str and v == v.strip()", _to_text),
+    "number": ("type(v) is int or type(v) is float", _to_number),
+    "count": ("type(v) is int and v >= 0", _to_count),
+    "years": ("(type(v) is int or type(v) is float) and v >= 0", _to_years),
+    "date": ("_is_date(v)", _to_date),
+    "skills": ("_is_skills(v)", _to_skills),
+}
+
+# 生成的检查函数可以使用的名字
+_CHECK_GLOBALS = {"_is_date": _is_date, "_is_skills": _is_skills, "MISSING": _DROP}
+
+
+def _range_errors(record, ranges):
+    """record 中结束日期早于开始日期的 [(结束字段, 说明)]（日期须已规范）"""
+    errors = []
+    for start, end in ranges:
+        start_value, end_value = record.get(start), record.get(end)
+        if start_value is not None and end_value is not None and end_value < start_value:
+            errors.append((end, f"{end} 不能早于 {start}（{end_value} < {start_value}）"))
+    return errors
+
+
+def _compile_check(fields, derived, ranges):
+    """把字段声明生成为一个函数: 记录已经规范时返回 True
+
+    已规范的记录（绝大多数）只执行这一个函数，不逐字段调用、不创建中间对象。
+    """
+    lines = ["def check(record):", "    get = record.get"]
+    for f in fields:
+        test = KINDS[f.kind][0]
+        lines.append(f"    v = get({f.name!r}, MISSING)")
+        if f.required:
+            lines.append(f"    if v is MISSING or v == '' or not ({test}): return False")
+        elif f.default is not None:
+            lines.append(f"    if v is MISSING or not ({test}): return False")
+        else:
+            lines.append(f"    if v is not MISSING and not ({test}): return False")
+    for target, source, _ in derived:
+        lines.append(f"    if get({target!r}) is None and get({source!r}) is not None: return False")
+    # 前面已检查过日期格式，规范的日期按字符串比较即按时间先后
+    for start, end in ranges:
+        lines.append(f"    s, e = get({start!r}), get({end!r})")
+        lines.append("    if s is not None and e is not None and e < s: return False")
+    lines.append("    return True")
+    namespace = {}
+    exec("\n".join(lines), dict(_CHECK_GLOBALS), namespace)
+    return namespace["check"]
+
+
+class Validator:
+    """编译后的集合校验器
+
+    is_clean 为生成的整条记录检查函数（快速路径）；不规范时按 (字段, 快速检查, 规范化, 必填, 默认值) 逐字段处理。
+    """
+
+    def __init__(self, collection, fields, derived=(), ranges=()):
+        self.collection = collection
+        self.is_clean = _compile_check(fields, derived, ranges)
+        self._fields = [(f.name, eval("lambda v: " + KINDS[f.kind][0], dict(_CHECK_GLOBALS)),
+                         KINDS[f.kind][1], f.required, f.default) for f in fields]
+        self._derived = list(derived)
+        self._ranges = list(ranges)
+
+    def normalize(self, record, strict=False, partial=False):
+        """就地规范化 record，返回修正和错误说明的列表（已规范时为空列表）
+
+        strict=True 时有错误则抛出 SchemaError，record 保持不变；否则丢弃无法识别的字段。
+        partial=True 时 record 只包含要修改的字段（update_record 的 changes），不检查缺少的字段。
+        """
+        if not partial and self.is_clean(record):
+            return []
+        updates, fixes, errors = {}, [], []
+        for name, is_clean, convert, required, default in self._fields:
+            value = record.get(name)
+            if value is None:
+                if name in record:
+                    updates[name] = _DROP
+                if partial:
+                    continue
+                if required:
+                    errors.append(f"缺少 {name}")
+                elif default is not None:
+                    updates[name] = copy.copy(default)
+                    fixes.append(f"{name}: 补充默认值 {default!r}")
+                continue
+            if not is_clean(value):
+                try:
+                    new_value = convert(value)
+                except ValueError as e:
+                    errors.append(f"{name}: {e}（{value!r}）")
+                    # 有默认值的字段总是存在: 无法识别的取值换成默认值（只改部分字段时保留原值）
+                    if default is not None and not partial:
+                        updates[name] = copy.copy(default)
+                        fixes.append(f"{name}: 无法识别，改为默认值 {default!r}")
+                    else:
+                        updates[name] = _DROP
+                    continue
+                updates[name] = new_value
+                fixes.append(f"{name}: {value!r} -> {new_value!r}")
+                value = new_value
+            if required and value == "":
+                errors.append(f"{name} 不能为空")
+        for target, source, derive in self._derived:
+            value = updates.get(source, record.get(source))
+            if value is None or value is _DROP:
+                continue
+            if updates.get(target, record.get(target)) is None or (partial and target not in record):
+                updates[target] = derive(value)
+                fixes.append(f"{target}: 由 {source} 推导为 {updates[target]!r}")
+        merged = {name: updates.get(name, record.get(name)) for pair in self._ranges for name in pair}
+        for end, message in _range_errors({k: v for k, v in merged.items() if v is not _DROP}, self._ranges):
+            errors.append(message)
+            updates[end] = _DROP
+        if strict and errors:
+            raise SchemaError(self.collection, errors)
+        for name, value in updates.items():
+            if value is _DROP:
+                record.pop(name, None)
+            else:
+                record[name] = value
+        return fixes + errors
+
+    def validate(self, record, partial=False):
+        """严格校验并就地规范化，格式错误时抛出 SchemaError"""
+        self.normalize(record, strict=True, partial=partial)
+        return record
+
+    def validate_update(self, record, changes):
+        """严格校验对已有记录 record 的修改 changes（就地规范化 changes），返回 changes
+
+        只改开始或结束日期之一时，与 record 中的另一个日期比较。
+        """
+        self.normalize(changes, strict=True, partial=True)
+        errors = [message for _, message in _range_errors(dict(record, **changes), self._ranges)]
+        if errors:
+            raise SchemaError(self.collection, errors)
+        return changes
+
+
+VALIDATORS = {name: Validator(name, fields, DERIVED.get(name, ()), DATE_RANGES.get(name, ()))
+              for name, fields in SCHEMAS.items()}
+
+
+def normalize_file(path, collection):
+    """读取并规范化文件中的记录（不写回），返回 (规范化后的记录, [(记录ID, 说明列表)])"""
+    with open(path, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    validator = VALIDATORS[collection]
+    problems = []
+    for record in records:
+        messages = validator.normalize(record)
+        if messages:
+            problems.append((record.get("id"), messages))
+    return records, problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="检查并修复数据文件的格式")
+    parser.add_argument("command", choices=["check", "repair"])
+    parser.add_argument("--data-dir", default=os.environ.get("FLEXWORK_DATA_DIR", "web_data"))
+    args = parser.parse_args(argv)
+
+    total = 0
+    for collection in SCHEMAS:
+        path = os.path.join(args.data_dir, f"{collection}.json")
+        if not os.path.exists(path):
+            continue
+        records, problems = normalize_file(path, collection)
+        for record_id, messages in problems:
+            for message in messages:
+                print(f"{collection}/{record_id}: {message}")
+        total += len(problems)
+        if args.command == "repair" and problems:
+            shutil.copyfile(path, path + ".bak")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(records, f, ensure_ascii=False, indent=2)
+            print(f"已修复 {path}（{len(problems)} 条记录，原文件备份为 {path}.bak）")
+    print(f"共 {total} 条记录格式不规范")
+    return 1 if args.command == "check" and total else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,526 @@
+"""
+匹配打分配置 - 声明式的权重、打分因子和硬性过滤条件
+
+配置在启动时编译为 Scorer，对候选人列存（CandidateMatrix）做整列计算，
+网页版、桌面版和 API 共用同一套规则。运营调整排序只需修改配置文件:
+
+    FLEXWORK_SCORING_CONFIG=/path/to/scoring.json streamlit run web_app.py
+
+配置文件只需写出要覆盖的部分，例如:
+    {"weights": {"skills": 0.5, "experience": 0.1},
+     "factors": {"salary": {"falloff": "proportional"}},
+     "filters": {"min_skill_score": 20}}
+
+numpy 在首次打分时才导入，不影响页面冷启动。
+"""
+import copy
+import json
+import os
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+from locations import location_row
+
+
+class _LazyNumpy:
+    """numpy 的占位: 首次使用时才导入，并把模块级的 np 换成 numpy 本身"""
+
+    def __getattr__(self, name):
+        import numpy
+        globals()["np"] = numpy
+        return getattr(numpy, name)
+
+
+np = _LazyNumpy()
+
+CONFIG_ENV = "FLEXWORK_SCORING_CONFIG"
+
+DEFAULT_CONFIG = {
+    # 因子 -> 总分权重
+    "weights": {"skills": 0.6, "salary": 0.25, "location": 0.15, "experience": 0.0},
+    "factors": {
+        # 技能: 职位要求技能的命中率（不区分大小写）；职位没有技能要求时给 empty_score
+        "skills": {"empty_score": 50},
+        # 薪资: 期望薪资在职位范围内满分，范围外按 falloff 扣分
+        #   absolute: 每偏离 1 元扣 per_yuan 分
+        #   proportional: 按偏离范围边界的比例扣分
+        "salary": {"falloff": "absolute", "per_yuan": 0.1, "missing_score": 50},
+        # 地点: 查 locations.py 的城市兼容度表
+        "location": {},
+        # 经验: 达到职位 min_experience（职位未填写时为 full_years）年满分
+        "experience": {"full_years": 5, "missing_score": 50}
+    },
+    "filters": {
+        # 参与匹配的候选人状态
+        "status": ["可联系", "待面试"],
+        # 技能得分低于该值的候选人直接排除（职位没有技能要求时不生效）
+        "min_skill_score": 0,
+        # 期望薪资超出职位上限的比例超过该值时排除，null 表示不限
+        "max_salary_over_ratio": None
+    },
+    # 候选人粗筛（见 retrieval.py）: 候选人数不少于 min_candidates 且已训练技能向量时，
+    # 先按技能向量召回 shortlist 个候选人再精确打分，nprobe 为每次查询扫描的聚类数
+    "retrieval": {"enabled": False, "min_candidates": 100000, "shortlist": 5000, "nprobe": 16},
+    # 档期: 职位工作期间（职位的 start_date/end_date，未填写时为今天起 default_days 天）
+    # 已有待签署或执行中合同的候选人，filter 直接排除，penalty 在总分中扣 penalty 分，off 不检查
+    "availability": {"mode": "penalty", "penalty": 30, "default_days": 30}
+}
+
+SALARY_FALLOFFS = ("absolute", "proportional")
+
+AVAILABILITY_MODES = ("filter", "penalty", "off")
+
+# 打分因子 -> 匹配结果中的字段名
+FACTOR_FIELDS = {
+    "skills": "skill_score",
+    "salary": "salary_score",
+    "location": "location_score",
+    "experience": "experience_score"
+}
+
+# 分块匹配时每块的候选人数（见 Scorer.top_stream）
+STREAM_CHUNK_SIZE = 20000
+
+# 分块匹配的进度: 已打分人数、候选人总数、已打分中通过过滤的人数、目前的前 K 名、是否已全部打分
+MatchProgress = namedtuple("MatchProgress", "scanned total matched results complete")
+
+
+def _merge(base, override):
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+
+def load_config(path=None):
+    """读取打分配置并合并到默认配置上；path 为空时读取环境变量 FLEXWORK_SCORING_CONFIG"""
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    path = path or os.environ.get(CONFIG_ENV)
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            _merge(config, json.load(f))
+    return config
+
+
+def validate_config(config):
+    """检查配置，有问题时抛出 ValueError"""
+    for factor, weight in config["weights"].items():
+        if factor not in DEFAULT_CONFIG["factors"]:
+            raise ValueError(f"未知的打分因子: {factor}")
+        if not isinstance(weight, (int, float)) or weight < 0:
+            raise ValueError(f"打分因子 {factor} 的权重必须是非负数")
+    falloff = config["factors"]["salary"].get("falloff")
+    if falloff not in SALARY_FALLOFFS:
+        raise ValueError(f"未知的薪资扣分方式: {falloff}")
+    mode = config["availability"].get("mode")
+    if mode not in AVAILABILITY_MODES:
+        raise ValueError(f"未知的档期处理方式: {mode}")
+
+
+def parse_salary_range(salary):
+    """解析薪资范围，兼容 "200-500元/天" 或 "200-500"，失败返回 None"""
+    try:
+        parts = str(salary).replace("元/天", "").replace(" ", "").split("-")
+        return int(parts[0]), int(parts[1])
+    except:
+        return None
+
+
+def skill_set(record):
+    """职位或候选人的技能（小写）；数据层保证 skills 为规范化的技能列表（见 schema.py）"""
+    return {s.lower() for s in record.get("skills") or ()}
+
+
+def matched_skills(record, wanted):
+    """record 的技能中属于 wanted（小写集合）的部分，保留原有写法并去重"""
+    return [skill for skill in record.get("skills") or () if skill.lower() in wanted]
+
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return float("nan")
+    return float(value)
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def top_k(rows, scores, limit=None):
+    """按分数从高到低排列 rows，分数相同时行号小的在前；limit 为空时返回全部"""
+    if limit is not None and limit < len(rows):
+        if limit <= 0:
+            return rows[:0]
+        # 先取出不低于第 limit 名分数的行，再稳定排序
+        kth = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+        keep = scores >= kth
+        rows, scores = rows[keep], scores[keep]
+    order = rows[np.lexsort((rows, -scores))]
+    return order if limit is None else order[:limit]
+
+
+class CandidateMatrix:
+    """候选人列存: 字段一次抽取成数组，给多个职位打分时复用
+
+    技能按稀疏矩阵存储（每个 (候选人行号, 技能编号) 一项），
+    状态和地点按取值编码，打分时用查表代替逐个比较。
+    """
+
+    def __init__(self, candidates):
+        self.candidates = list(candidates)
+        self.size = len(self.candidates)
+        self.salary = np.array([_number(c.get("expected_salary")) for c in self.candidates], dtype=float)
+        self.experience = np.array([_number(c.get("experience")) for c in self.candidates], dtype=float)
+        self.status_values, self.status_codes = self._encode(c.get("status") for c in self.candidates)
+        self.location_values, self.location_codes = self._encode(c.get("location") for c in self.candidates)
+
+        self.skill_vocab = {}
+        rows, ids = [], []
+        for row, candidate in enumerate(self.candidates):
+            # 数据层保证技能已去空白、不区分大小写去重（见 schema.py）
+            for skill in candidate.get("skills") or ():
+                rows.append(row)
+                ids.append(self.skill_vocab.setdefault(skill.lower(), len(self.skill_vocab)))
+        self.skill_rows = np.array(rows, dtype=np.int64)
+        self.skill_ids = np.array(ids, dtype=np.int64)
+        # 每个候选人的技能在 skill_rows/skill_ids 中的起止位置
+        self.skill_offsets = np.concatenate(([0], np.cumsum(np.bincount(self.skill_rows, minlength=self.size))))
+        self._row_index = None
+
+    def rows_of(self, ids):
+        """候选人ID对应的行号数组（升序），不在列存中的ID忽略"""
+        if self._row_index is None:
+            self._row_index = {c.get("id"): row for row, c in enumerate(self.candidates)}
+        rows = [self._row_index[i] for i in ids if i in self._row_index]
+        return np.array(sorted(rows), dtype=np.int64)
+
+    def subset(self, rows):
+        """取部分候选人（rows 为升序行号）组成新的列存，代价只与 rows 的大小相关"""
+        rows = np.asarray(rows, dtype=np.int64)
+        sub = CandidateMatrix.__new__(CandidateMatrix)
+        sub.candidates = [self.candidates[row] for row in rows.tolist()]
+        sub.size = len(rows)
+        sub.salary = self.salary[rows]
+        sub.experience = self.experience[rows]
+        sub.status_values, sub.status_codes = self.status_values, self.status_codes[rows]
+        sub.location_values, sub.location_codes = self.location_values, self.location_codes[rows]
+        sub.skill_vocab = self.skill_vocab
+
+        starts = self.skill_offsets[rows]
+        lengths = self.skill_offsets[rows + 1] - starts
+        sub.skill_offsets = np.concatenate(([0], np.cumsum(lengths)))
+        positions = np.repeat(starts - sub.skill_offsets[:-1], lengths) + np.arange(sub.skill_offsets[-1])
+        sub.skill_rows = np.repeat(np.arange(sub.size), lengths)
+        sub.skill_ids = self.skill_ids[positions]
+        sub._row_index = None
+        return sub
+
+    @staticmethod
+    def _encode(values):
+        lookup = {}
+        codes = [lookup.setdefault(v if isinstance(v, str) else None, len(lookup)) for v in values]
+        return list(lookup), np.array(codes, dtype=np.int64)
+
+
+class JobMatrix:
+    """职位列存: 技能倒排（技能 -> 职位行号）和薪资范围、地点、经验要求数组，用于给候选人推荐职位"""
+
+    def __init__(self, jobs):
+        self.jobs = list(jobs)
+        self.size = len(self.jobs)
+        ranges = [parse_salary_range(job.get("salary")) for job in self.jobs]
+        self.salary_low = np.array([r[0] if r else float("nan") for r in ranges], dtype=float)
+        self.salary_high = np.array([r[1] if r else float("nan") for r in ranges], dtype=float)
+        self.min_experience = np.array([_number(job.get("min_experience")) for job in self.jobs], dtype=float)
+        self.location_values, self.location_codes = CandidateMatrix._encode(job.get("location") for job in self.jobs)
+
+        postings = {}
+        counts = []
+        for row, job in enumerate(self.jobs):
+            skills = skill_set(job)
+            counts.append(len(skills))
+            for skill in skills:
+                postings.setdefault(skill, []).append(row)
+        self.skill_counts = np.array(counts, dtype=np.int64)
+        self.postings = {skill: np.array(rows, dtype=np.int64) for skill, rows in postings.items()}
+        self.no_skill_rows = np.flatnonzero(self.skill_counts == 0)
+
+
+class Scorer:
+    """由配置编译出的打分器"""
+
+    def __init__(self, config=None):
+        self.config = config or load_config()
+        validate_config(self.config)
+        factors = self.config["factors"]
+        filters = self.config["filters"]
+
+        # 总分只累加权重大于 0 的因子。技能、薪资、地点得分总在结果中展示（技能得分还用于过滤），
+        # 所以总是计算；经验得分只在权重大于 0 时计算
+        self.weights = {name: w for name, w in self.config["weights"].items() if w > 0}
+        self.statuses = tuple(filters.get("status") or ())
+        self.min_skill_score = filters.get("min_skill_score") or 0
+        self.max_salary_over_ratio = filters.get("max_salary_over_ratio")
+
+        self.skill_empty_score = factors["skills"].get("empty_score", 50)
+        self.salary_falloff = factors["salary"].get("falloff", "absolute")
+        self.salary_per_yuan = factors["salary"].get("per_yuan", 0.1)
+        self.salary_missing_score = factors["salary"].get("missing_score", 50)
+        self.experience_full_years = factors["experience"].get("full_years", 5)
+        self.experience_missing_score = factors["experience"].get("missing_score", 50)
+        self.retrieval = self.config["retrieval"]
+        availability = self.config["availability"]
+        self.availability_mode = availability.get("mode", "penalty")
+        self.availability_penalty = availability.get("penalty", 30)
+        self.availability_days = availability.get("default_days", 30)
+
+    def job_window(self, job, today=None):
+        """职位的工作期间 (开始, 结束)，格式为 YYYY-MM-DD；未填写时从今天起算 default_days 天"""
+        start = _parse_date(job.get("start_date")) or today or date.today()
+        end = _parse_date(job.get("end_date")) or start + timedelta(days=self.availability_days)
+        return start.isoformat(), max(start, end).isoformat()
+
+    # ===== 打分因子，均返回长度为 matrix.size 的数组 =====
+
+    def _skill_scores(self, job_skills, matrix):
+        if not job_skills:
+            return np.full(matrix.size, float(self.skill_empty_score))
+        wanted = np.zeros(len(matrix.skill_vocab) + 1, dtype=bool)
+        for skill in job_skills:
+            skill_id = matrix.skill_vocab.get(skill)
+            if skill_id is not None:
+                wanted[skill_id] = True
+        hits = matrix.skill_rows[wanted[matrix.skill_ids]]
+        matched = np.bincount(hits, minlength=matrix.size)
+        return matched / len(job_skills) * 100
+
+    def _salary_scores(self, salary_range, matrix):
+        low, high = salary_range if salary_range is not None else (float("nan"), float("nan"))
+        return self._salary_formula(matrix.salary, low, high)
+
+    def _salary_formula(self, expected, low, high):
+        """薪资得分；参数可以是标量或数组（按 numpy 规则广播），任一为 NaN 时给 missing_score"""
+        expected, low, high = np.asarray(expected, float), np.asarray(low, float), np.asarray(high, float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if self.salary_falloff == "proportional":
+                below = np.where(low > 0, (low - expected) / low, 1.0)
+                above = np.where(high > 0, (expected - high) / high, 1.0)
+                outside = np.maximum(0, 100 * (1 - np.where(expected < low, below, above)))
+            else:
+                distance = np.where(expected < low, low - expected, expected - high)
+                outside = np.maximum(0, 100 - distance * self.salary_per_yuan)
+            scores = np.where((expected >= low) & (expected <= high), 100.0, outside)
+        missing = np.isnan(expected) | np.isnan(low) | np.isnan(high)
+        return np.where(missing, float(self.salary_missing_score), scores)
+
+    def _location_scores(self, job, matrix):
+        row, default = location_row(job.get("location"))
+        table = np.array([row.get(v, default) for v in matrix.location_values] or [default], dtype=float)
+        return table[matrix.location_codes]
+
+    def _experience_scores(self, job, matrix):
+        return self._experience_formula(matrix.experience, _number(job.get("min_experience")))
+
+    def _experience_formula(self, experience, target):
+        """经验得分；target（职位要求年限）不大于 0 或缺失时按 full_years 计算"""
+        experience, target = np.asarray(experience, float), np.asarray(target, float)
+        target = np.where(target > 0, target, float(self.experience_full_years))
+        scores = np.clip(experience / target, 0, 1) * 100
+        return np.where(np.isnan(experience), float(self.experience_missing_score), scores)
+
+    def evaluate(self, job, matrix, busy=None):
+        """整列打分，返回 (总分数组, {因子: 得分数组}, 通过过滤的布尔数组)
+
+        busy 为职位工作期间已有合同占用的布尔数组，按 availability 配置扣分或排除。
+        """
+        job_skills = skill_set(job)
+        salary_range = parse_salary_range(job.get("salary"))
+        factors = {
+            "skills": self._skill_scores(job_skills, matrix),
+            "salary": self._salary_scores(salary_range, matrix),
+            "location": self._location_scores(job, matrix)
+        }
+        if "experience" in self.weights:
+            factors["experience"] = self._experience_scores(job, matrix)
+
+        total = np.zeros(matrix.size)
+        for name, weight in self.weights.items():
+            total += weight * factors[name]
+        if busy is not None and self.availability_mode == "penalty":
+            total = np.maximum(0, total - busy * float(self.availability_penalty))
+
+        mask = np.ones(matrix.size, dtype=bool)
+        if busy is not None and self.availability_mode == "filter":
+            mask &= ~busy
+        if self.statuses:
+            allowed = [i for i, v in enumerate(matrix.status_values) if v in self.statuses]
+            mask &= np.isin(matrix.status_codes, allowed)
+        if job_skills and self.min_skill_score > 0:
+            mask &= factors["skills"] >= self.min_skill_score
+        if salary_range is not None and self.max_salary_over_ratio is not None:
+            with np.errstate(invalid="ignore"):
+                mask &= ~(matrix.salary > salary_range[1] * (1 + self.max_salary_over_ratio))
+        return total, factors, mask
+
+    def rank(self, job, matrix, limit=None, apply_filters=True, busy_rows=None):
+        """按总分从高到低返回匹配结果，分数相同时保持候选人原有顺序"""
+        return self.top(job, matrix, limit, apply_filters, busy_rows)[1]
+
+    def top(self, job, matrix, limit=None, apply_filters=True, busy_rows=None):
+        """返回 (通过过滤的候选人数, 前 limit 名匹配结果)"""
+        matched_count, rows, scores = self.top_rows(job, matrix, limit, apply_filters, busy_rows)
+        candidates = [matrix.candidates[row] for row in rows.tolist()]
+        return matched_count, self.build_results(job, candidates, scores)
+
+    def top_rows(self, job, matrix, limit=None, apply_filters=True, busy_rows=None):
+        """只排序不组装结果，返回 (通过过滤的候选人数, 行号数组, {结果字段: 得分数组})
+
+        不需要候选人原始记录，可以在只持有列存数组的子进程中执行（见 parallel_matching.py）。
+        busy_rows 为档期被占用的候选人行号，给出时结果中带 available 字段。
+        """
+        busy = None
+        if busy_rows is not None and self.availability_mode != "off":
+            busy = np.zeros(matrix.size, dtype=bool)
+            busy[busy_rows] = True
+        total, factors, mask = self.evaluate(job, matrix, busy)
+        rows = np.flatnonzero(mask) if apply_filters else np.arange(matrix.size)
+        order = top_k(rows, total[rows], limit)
+
+        result_scores = {"score": total[order]}
+        for name, field in FACTOR_FIELDS.items():
+            if name in factors:
+                result_scores[field] = factors[name][order]
+        if busy is not None:
+            result_scores["available"] = ~busy[order]
+        return len(rows), order, result_scores
+
+    def top_stream(self, job, matrix, limit=20, busy_rows=None, chunk_size=STREAM_CHUNK_SIZE, time_budget=None):
+        """分块打分的生成器，每块打完产出一次到目前为止的前 limit 名（MatchProgress）
+
+        全部打分完成时 complete 为 True，结果与 top() 相同；给出 time_budget（秒）时，
+        超时后产出的是目前最好的结果（complete 为 False），随后结束。
+        """
+        started = time.perf_counter()
+        busy_rows = np.asarray(busy_rows, dtype=np.int64) if busy_rows is not None else None
+        best_rows, best_scores = np.zeros(0, dtype=np.int64), {}
+        matched = 0
+        for begin in range(0, max(matrix.size, 1), chunk_size):
+            end = min(begin + chunk_size, matrix.size)
+            chunk = matrix if begin == 0 and end == matrix.size else matrix.subset(np.arange(begin, end))
+            chunk_busy = None
+            if busy_rows is not None:
+                chunk_busy = busy_rows[(busy_rows >= begin) & (busy_rows < end)] - begin
+            count, rows, scores = self.top_rows(job, chunk, limit, busy_rows=chunk_busy)
+            matched += count
+
+            # 与之前的前 limit 名合并（行号换成全局行号，同分时行号小的在前，与 top 的顺序一致）
+            rows = np.concatenate((best_rows, rows + begin))
+            scores = {field: np.concatenate((best_scores[field], values)) if field in best_scores else values
+                      for field, values in scores.items()}
+            keep = np.lexsort((rows, -scores["score"]))[:limit]
+            best_rows, best_scores = rows[keep], {field: values[keep] for field, values in scores.items()}
+
+            candidates = [matrix.candidates[row] for row in best_rows.tolist()]
+            yield MatchProgress(end, matrix.size, matched, self.build_results(job, candidates, best_scores),
+                                end >= matrix.size)
+            if time_budget is not None and time.perf_counter() - started >= time_budget:
+                return
+
+    def top_jobs(self, candidate, jobs, limit=10):
+        """为候选人推荐职位，返回 (符合条件的职位数, 前 limit 名)
+
+        与 evaluate 使用同一套打分规则，方向相反。只考虑和候选人至少有一项技能相同的职位
+        （通过技能倒排取出）以及没有技能要求的职位；候选人没有技能时考虑全部职位。
+        """
+        candidate_skills = skill_set(candidate)
+        postings = [jobs.postings[s] for s in candidate_skills if s in jobs.postings]
+        if candidate_skills:
+            hits = np.concatenate(postings) if postings else np.zeros(0, dtype=np.int64)
+            rows, overlap = np.unique(hits, return_counts=True)
+            rows = np.concatenate((rows, jobs.no_skill_rows))
+            overlap = np.concatenate((overlap, np.zeros(len(jobs.no_skill_rows), dtype=np.int64)))
+            order = np.argsort(rows, kind="stable")
+            rows, overlap = rows[order], overlap[order]
+        else:
+            rows = np.arange(jobs.size)
+            overlap = np.zeros(jobs.size, dtype=np.int64)
+
+        counts = jobs.skill_counts[rows]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            skills = np.where(counts > 0, overlap / np.maximum(counts, 1) * 100, float(self.skill_empty_score))
+        expected = _number(candidate.get("expected_salary"))
+        factors = {
+            "skills": skills,
+            "salary": self._salary_formula(expected, jobs.salary_low[rows], jobs.salary_high[rows])
+        }
+        location = candidate.get("location")
+        table = []
+        for value in jobs.location_values or [None]:
+            row, default = location_row(value)
+            table.append(row.get(location, default))
+        factors["location"] = np.array(table, dtype=float)[jobs.location_codes[rows]]
+        if "experience" in self.weights:
+            factors["experience"] = self._experience_formula(
+                _number(candidate.get("experience")), jobs.min_experience[rows]
+            )
+
+        total = np.zeros(len(rows))
+        for name, weight in self.weights.items():
+            total += weight * factors[name]
+
+        mask = np.ones(len(rows), dtype=bool)
+        if self.min_skill_score > 0:
+            mask &= (counts == 0) | (skills >= self.min_skill_score)
+        if self.max_salary_over_ratio is not None:
+            with np.errstate(invalid="ignore"):
+                mask &= ~(expected > jobs.salary_high[rows] * (1 + self.max_salary_over_ratio))
+
+        positions = top_k(np.flatnonzero(mask), total[mask], limit)
+        results = []
+        for pos in positions.tolist():
+            job = jobs.jobs[rows[pos]]
+            result = {"job": job, "score": float(total[pos])}
+            for name, field in FACTOR_FIELDS.items():
+                if name in factors:
+                    result[field] = float(factors[name][pos])
+            result["matched_skills"] = matched_skills(job, candidate_skills)
+            results.append(result)
+        return int(mask.sum()), results
+
+    @staticmethod
+    def build_results(job, candidates, scores):
+        """把候选人记录和 top_rows 返回的得分组装成结果字典"""
+        job_skills = skill_set(job)
+        columns = {field: values.tolist() for field, values in scores.items()}
+        results = []
+        for i, candidate in enumerate(candidates):
+            result = {"candidate": candidate}
+            for field, values in columns.items():
+                result[field] = values[i]
+            result["matched_skills"] = matched_skills(candidate, job_skills)
+            results.append(result)
+        return results
+
+
+_scorer = None
+
+
+def get_scorer():
+    """按当前配置编译的打分器（进程内只编译一次）"""
+    global _scorer
+    if _scorer is None:
+        _scorer = Scorer(load_config())
+    return _scorer
+
+
+def reload_scorer(config=None):
+    """重新编译打分器，config 为空时重新读取配置文件"""
+    global _scorer
+    _scorer = Scorer(config or load_config())
+    return _scorer
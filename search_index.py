@@ -0,0 +1,229 @@
+"""
+全文检索 - 职位和候选人的倒排索引
+
+分词规则: 英文/数字按单词切分，中文按二元组（bigram）切分，单个汉字的词保留单字。
+查询时所有词都必须命中（AND），最后一个词按前缀匹配，便于边输入边搜索；
+结果按 idf × 字段权重排序。索引随数据层的增删改增量维护。
+"""
+import bisect
+import heapq
+import math
+import re
+from operator import itemgetter
+
+# 字段 -> 权重
+JOB_SEARCH_FIELDS = {"title": 3, "skills": 2, "description": 1, "requirements": 1}
+CANDIDATE_SEARCH_FIELDS = {"name": 3, "skills": 2}
+
+# 前缀最多扩展的词数（按文档数从多到少保留）
+MAX_PREFIX_EXPANSIONS = 64
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*|[\u3400-\u9fff\uf900-\ufaff]+")
+
+
+def tokenize(text):
+    """把文本切分为检索词"""
+    tokens = []
+    for match in _TOKEN_RE.finditer(str(text).lower()):
+        run = match.group()
+        if run[0].isascii():
+            tokens.append(run.rstrip("."))
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+class SearchIndex:
+    """单个集合的倒排索引，文档以记录 ID 标识
+
+    倒排表按权重分桶（词 -> {权重: 记录ID集合}），查询时从高分桶往低分桶扫描，
+    凑满前 K 个且剩余文档不可能超过第 K 名时提前结束，常见词也只需扫描少量文档。
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.ready = False    # 是否已建立，未建立时由数据层在首次查询时建立
+        self.doc_count = 0
+        self._postings = {}   # 词 -> {权重: 记录ID集合}
+        self._vocab = []      # 有序词表，用于前缀查询
+
+    def reset(self):
+        """清空索引，等待重新建立"""
+        self.ready = False
+        self.doc_count = 0
+        self._postings = {}
+        self._vocab = []
+
+    def _weights(self, record):
+        """记录中每个词的加权词频"""
+        weights = {}
+        for field, weight in self.fields.items():
+            value = record.get(field)
+            if not value:
+                continue
+            if isinstance(value, (list, tuple)):
+                value = " ".join(str(v) for v in value)
+            for token in tokenize(value):
+                weights[token] = weights.get(token, 0) + weight
+        return weights
+
+    def build(self, records):
+        """从全部记录批量建立索引（建好后整体替换，建立期间查询看到的仍是原来的索引）"""
+        postings = {}
+        doc_count = 0
+        for record in records:
+            doc_id = record.get("id")
+            if doc_id is None:
+                continue
+            for token, weight in self._weights(record).items():
+                buckets = postings.get(token)
+                if buckets is None:
+                    buckets = postings[token] = {}
+                docs = buckets.get(weight)
+                if docs is None:
+                    docs = buckets[weight] = set()
+                docs.add(doc_id)
+            doc_count += 1
+        self._postings, self._vocab, self.doc_count = postings, sorted(postings), doc_count
+        self.ready = True
+
+    def add(self, record):
+        """索引一条新记录"""
+        doc_id = record.get("id")
+        if doc_id is None:
+            return
+        for token, weight in self._weights(record).items():
+            buckets = self._postings.get(token)
+            if buckets is None:
+                buckets = self._postings[token] = {}
+                bisect.insort(self._vocab, token)
+            docs = buckets.get(weight)
+            if docs is None:
+                docs = buckets[weight] = set()
+            docs.add(doc_id)
+        self.doc_count += 1
+
+    def remove(self, record):
+        """移除一条记录（必须在记录内容被修改之前调用）"""
+        doc_id = record.get("id")
+        removed = False
+        for token, weight in self._weights(record).items():
+            buckets = self._postings.get(token)
+            docs = buckets.get(weight) if buckets else None
+            if not docs or doc_id not in docs:
+                continue
+            removed = True
+            docs.discard(doc_id)
+            if not docs:
+                del buckets[weight]
+            if not buckets:
+                del self._postings[token]
+                del self._vocab[bisect.bisect_left(self._vocab, token)]
+        if removed:
+            self.doc_count -= 1
+
+    def document_frequency(self, token):
+        """包含该词的记录数"""
+        return sum(len(docs) for docs in tuple(self._postings.get(token, {}).values()))
+
+    def expand_prefix(self, prefix):
+        """返回以 prefix 开头的词"""
+        start = bisect.bisect_left(self._vocab, prefix)
+        end = bisect.bisect_left(self._vocab, prefix + "\uffff")
+        tokens = self._vocab[start:end]
+        if len(tokens) > MAX_PREFIX_EXPANSIONS:
+            tokens = heapq.nlargest(MAX_PREFIX_EXPANSIONS, tokens, key=self.document_frequency)
+        return tokens
+
+    def matches(self, record, query, prefix=True):
+        """单条记录是否会被 search(query) 检索到（按相同的分词和前缀规则，不需要已建立索引）
+
+        用于单条记录变化后判断它是否仍在检索结果中，不必重新检索整个集合。
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return False
+        own = self._weights(record)
+        for i, token in enumerate(tokens):
+            if (prefix and i == len(tokens) - 1) or (len(token) == 1 and not token.isascii()):
+                if not any(t.startswith(token) for t in own):
+                    return False
+            elif token not in own:
+                return False
+        return True
+
+    def _group(self, tokens):
+        """一组可互相替代的词（前缀扩展）的 [(得分, 记录ID集合)]，按得分从高到低
+
+        查询不加锁，期间写入方可能删掉某个词或改动倒排表，取不到的词跳过，字典和集合都先复制再遍历。
+        """
+        entries = []
+        for token in tokens:
+            buckets = tuple(self._postings.get(token, {}).items())
+            frequency = sum(len(docs) for _, docs in buckets)
+            if not frequency:
+                continue
+            idf = math.log(1 + max(self.doc_count, frequency) / frequency)
+            entries.extend((weight * idf, docs) for weight, docs in buckets)
+        entries.sort(key=itemgetter(0), reverse=True)
+        return entries
+
+    @staticmethod
+    def _best(group, doc_id):
+        for score, docs in group:
+            if doc_id in docs:
+                return score
+        return 0.0
+
+    def search(self, query, limit=20, prefix=True):
+        """检索，返回按得分排序的 [(记录ID, 得分)]"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or limit <= 0:
+            return []
+
+        # 文档须命中每一组；单个汉字和最后一个词按前缀扩展
+        groups = []
+        for i, token in enumerate(tokens):
+            if (prefix and i == len(tokens) - 1) or (len(token) == 1 and not token.isascii()):
+                expansions = self.expand_prefix(token)
+            else:
+                expansions = [token] if token in self._postings else []
+            if not expansions:
+                return []
+            group = self._group(expansions)
+            if not group:
+                return []
+            groups.append(group)
+
+        # 以文档最少的一组驱动，其余组逐个查分
+        groups.sort(key=lambda g: sum(len(docs) for _, docs in g))
+        driver, others = groups[0], groups[1:]
+        others_max = sum(g[0][0] for g in others)
+
+        heap = []
+        seen = set()
+        for bucket_score, docs in driver:
+            bound = bucket_score + others_max
+            if len(heap) >= limit and heap[0][0] >= bound:
+                break
+            for doc_id in tuple(docs):
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                total = bucket_score
+                for group in others:
+                    score = self._best(group, doc_id)
+                    if not score:
+                        break
+                    total += score
+                else:
+                    if len(heap) < limit:
+                        heapq.heappush(heap, (total, doc_id))
+                    elif total > heap[0][0]:
+                        heapq.heapreplace(heap, (total, doc_id))
+                    if len(heap) >= limit and heap[0][0] >= bound:
+                        break
+
+        return [(doc_id, score) for score, doc_id in sorted(heap, reverse=True)]
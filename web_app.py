@@ -2,12 +2,12 @@
 """
 灵活用工平台 - Web 版本（带数据持久化）
 """
+import os
 import streamlit as st
-import pandas as pd
-from datetime import datetime
-import plotly.express as px
-import plotly.graph_objects as go
-from data_store import DataStore
+from datetime import datetime, timedelta
+from data_store import DataFileError, get_store
+from matching import OPEN_JOB_STATUS, busy_candidates, candidate_pool, job_matrix, recommend_jobs, stream_matches
+import metrics
 
 # 页面配置
 st.set_page_config(
@@ -78,18 +78,71 @@ st.markdown("""
 # 初始化数据存储
 @st.cache_resource
 def init_data_store():
-    return DataStore()
+    return get_store()
+
+try:
+    store = init_data_store()
+except DataFileError as e:
+    st.error(f"{e}。请修复或移走该文件后刷新页面。")
+    st.stop()
+
+
+def match_row(match):
+    """匹配结果 -> 结果卡片的字段"""
+    candidate = match["candidate"]
+    return {
+        "候选人": candidate['name'],
+        "技能": ", ".join(match["matched_skills"][:3]),
+        "匹配度": f"{match['score']:.1f}%",
+        "期望薪资": f"{candidate.get('expected_salary', 0)}元/天",
+        "地点": candidate.get('location') or '未填写',
+        "档期": "空闲" if match.get("available", True) else "已有合同",
+        "状态": candidate['status']
+    }
+
+
+def show_match_cards(area, results):
+    """在占位区域显示前 5 名匹配结果（替换原有内容）"""
+    with area.container():
+        for i, result in enumerate(results[:5]):
+            score = float(result['匹配度'][:-1])
+            color = "#34c759" if score >= 80 else "#ff9500" if score >= 60 else "#ff3b30"
+            
+            st.markdown(f"""
+            <div class="metric-card">
+                <div style="display: flex; justify-content: space-between;">
+                    <span style="font-weight: bold;">{i+1}. {result['候选人']}</span>
+                    <span style="color: {color}; font-weight: bold;">{result['匹配度']}</span>
+                </div>
+                <div style="color: #666; font-size: 0.9rem;">{result['技能']}</div>
+                <div style="color: #666; font-size: 0.9rem;">{result['期望薪资']} · {result.get('地点', '未填写')} · {result.get('档期', '空闲')}</div>
+            </div>
+            """, unsafe_allow_html=True)
 
-store = init_data_store()
 
 # 侧边栏导航
 st.sidebar.markdown("## 🤖 灵活用工平台")
 st.sidebar.markdown("---")
 
-page = st.sidebar.radio(
-    "导航",
-    ["🏠 仪表板", "📋 职位管理", "👥 候选人管理", "📄 合同管理", "🎯 智能匹配", "📊 数据分析", "⚙️ 设置"]
-)
+# 智能匹配页职位选择框最多列出的职位数
+JOB_PICKER_LIMIT = 50
+
+# 智能匹配最多用时（秒），超时后显示已评估部分中的最佳结果
+MATCH_TIME_BUDGET = 3.0
+
+# 页面名称 -> 指标名
+PAGES = {
+    "🏠 仪表板": "dashboard",
+    "📋 职位管理": "jobs",
+    "👥 候选人管理": "candidates",
+    "📄 合同管理": "contracts",
+    "🎯 智能匹配": "matching",
+    "📊 数据分析": "analytics",
+    "⚙️ 设置": "settings"
+}
+
+page = st.sidebar.radio("导航", list(PAGES), key="page")
+page_timer = metrics.timer(f"web.page.{PAGES[page]}").start()
 
 st.sidebar.markdown("---")
 stats = store.get_stats()
@@ -103,6 +156,10 @@ st.sidebar.info(f"""
 
 # ==================== 仪表板 ====================
 if page == "🏠 仪表板":
+    # pandas / plotly 导入较慢，只在用到的页面导入
+    import pandas as pd
+    import plotly.express as px
+    
     st.markdown('<div class="main-header"><h1>🏠 灵活用工仪表板</h1></div>', unsafe_allow_html=True)
     
     # 统计卡片
@@ -151,34 +208,31 @@ if page == "🏠 仪表板":
     
     with col1:
         st.subheader("📊 职位状态分布")
-        status_counts = {}
-        for job in store.jobs:
-            status = job['status']
-            status_counts[status] = status_counts.get(status, 0) + 1
+        status_counts = store.value_counts("jobs", "status")
         
         if status_counts:
-            fig = px.pie(
-                values=list(status_counts.values()),
-                names=list(status_counts.keys()),
-                title="职位分布",
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with metrics.timer("web.chart.job_status"):
+                fig = px.pie(
+                    values=list(status_counts.values()),
+                    names=list(status_counts.keys()),
+                    title="职位分布",
+                    color_discrete_sequence=px.colors.qualitative.Set3
+                )
+                st.plotly_chart(fig, use_container_width=True)
     
     with col2:
         st.subheader("📈 合同趋势")
-        if store.contracts:
-            dates = [c['start_date'][:7] for c in store.contracts]  # YYYY-MM
-            amounts = [c['total_amount'] for c in store.contracts]
-            
+        payroll = store.monthly_payroll()
+        if payroll:
+            # 合同金额按每月工作日分摊（见 payroll.py）
             df = pd.DataFrame({
-                '月份': dates,
-                '金额': amounts
+                '月份': list(payroll),
+                '金额': list(payroll.values())
             })
-            df = df.groupby('月份').sum().reset_index()
             
-            fig = px.line(df, x='月份', y='金额', title="月度合同金额")
-            st.plotly_chart(fig, use_container_width=True)
+            with metrics.timer("web.chart.contract_trend"):
+                fig = px.line(df, x='月份', y='金额', title="月度结算金额")
+                st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("暂无合同数据")
 
@@ -189,30 +243,33 @@ elif page == "📋 职位管理":
     tab1, tab2 = st.tabs(["📋 职位列表", "➕ 发布新职位"])
     
     with tab1:
-        if store.jobs:
+        keyword = st.text_input("🔍 搜索职位", placeholder="职位名称、技能或描述，例如：前端 React")
+        jobs = store.search("jobs", keyword, limit=100) if keyword.strip() else store.jobs
+        if jobs:
             # 创建可编辑的表格
-            for i, job in enumerate(store.jobs):
+            for job in jobs:
                 with st.expander(f"📌 {job['title']} - {job['status']}"):
                     col1, col2, col3 = st.columns([3, 1, 1])
                     
                     with col1:
                         st.markdown(f"""
-                        **薪资**: {job['salary']}  
-                        **地点**: {job['location']}  
+                        **薪资**: {job.get('salary') or '未填写'}  
+                        **地点**: {job.get('location') or '未填写'}  
                         **技能**: {', '.join(job.get('skills', []))}  
                         **描述**: {job.get('description', '无')}  
                         **发布日期**: {job.get('created', '未知')}
                         """)
                     
                     with col2:
-                        if st.button("✏️ 编辑", key=f"edit_{i}"):
+                        if st.button("✏️ 编辑", key=f"edit_{job['id']}"):
                             st.session_state['edit_job'] = job
                     
                     with col3:
-                        if st.button("🗑️ 删除", key=f"del_{i}"):
-                            store.jobs.pop(i)
-                            store.save_all()
+                        if st.button("🗑️ 删除", key=f"del_{job['id']}"):
+                            store.delete_record("jobs", job['id'])
                             st.rerun()
+        elif keyword.strip():
+            st.info("没有找到匹配的职位")
         else:
             st.info("暂无职位数据")
     
@@ -257,8 +314,10 @@ elif page == "👥 候选人管理":
     tab1, tab2 = st.tabs(["👥 候选人列表", "➕ 添加候选人"])
     
     with tab1:
-        if store.candidates:
-            for i, candidate in enumerate(store.candidates):
+        keyword = st.text_input("🔍 搜索候选人", placeholder="姓名或技能，例如：张 Python")
+        candidates = store.search("candidates", keyword, limit=100) if keyword.strip() else store.candidates
+        if candidates:
+            for candidate in candidates:
                 with st.expander(f"👤 {candidate['name']} - {candidate['status']}"):
                     col1, col2, col3 = st.columns([3, 1, 1])
                     
@@ -267,18 +326,27 @@ elif page == "👥 候选人管理":
                         **技能**: {', '.join(candidate.get('skills', []))}  
                         **经验**: {candidate.get('experience', 0)}年  
                         **期望薪资**: {candidate.get('expected_salary', 0)}元/天  
+                        **所在地**: {candidate.get('location') or '未填写'}  
                         **联系方式**: {candidate.get('phone', '无')} | {candidate.get('email', '无')}
                         """)
+                        if st.button("🎯 推荐职位", key=f"rec_cand_{candidate['id']}"):
+                            recommendations = recommend_jobs(candidate, job_matrix(store), limit=3)
+                            for rec in recommendations:
+                                st.markdown(f"- {rec['job']['title']} - {rec['job'].get('location', '')}"
+                                            f"（匹配度 {rec['score']:.1f}%）")
+                            if not recommendations:
+                                st.info("暂无合适的招聘中职位")
                     
                     with col2:
-                        if st.button("✏️ 编辑", key=f"edit_cand_{i}"):
+                        if st.button("✏️ 编辑", key=f"edit_cand_{candidate['id']}"):
                             pass
                     
                     with col3:
-                        if st.button("🗑️ 删除", key=f"del_cand_{i}"):
-                            store.candidates.pop(i)
-                            store.save_all()
+                        if st.button("🗑️ 删除", key=f"del_cand_{candidate['id']}"):
+                            store.delete_record("candidates", candidate['id'])
                             st.rerun()
+        elif keyword.strip():
+            st.info("没有找到匹配的候选人")
         else:
             st.info("暂无候选人数据")
     
@@ -293,12 +361,16 @@ elif page == "👥 候选人管理":
             with col2:
                 salary = st.number_input("期望薪资（元/天）", min_value=0, value=300, step=50)
             
+            location = st.selectbox("所在地", ["远程", "上海", "北京", "深圳", "杭州", "广州", "成都"])
+            
             col1, col2 = st.columns(2)
             with col1:
                 phone = st.text_input("电话", placeholder="13800138000")
             with col2:
                 email = st.text_input("邮箱", placeholder="name@example.com")
             
+            allow_duplicate = st.checkbox("与已有候选人相似时仍然添加")
+            
             col1, col2, col3 = st.columns(3)
             with col2:
                 submitted = st.form_submit_button("➕ 添加候选人", use_container_width=True)
@@ -310,13 +382,19 @@ elif page == "👥 候选人管理":
                         "skills": [s.strip() for s in skills.split(",") if s.strip()],
                         "experience": experience,
                         "expected_salary": salary,
+                        "location": location,
                         "phone": phone,
                         "email": email,
                         "status": "可联系"
                     }
-                    cand_id = store.add_candidate(new_candidate)
-                    st.markdown(f'<div class="success-message">✅ 候选人 {name} 添加成功！ ID: {cand_id}</div>', unsafe_allow_html=True)
-                    st.balloons()
+                    duplicates = [] if allow_duplicate else store.find_duplicates(new_candidate)
+                    if duplicates:
+                        similar = "、".join(f"{c.get('name', '')} ({c['id']})" for c in duplicates[:5])
+                        st.markdown(f'<div class="warning-message">⚠️ 可能与已有候选人重复: {similar}。确认不是同一人请勾选"仍然添加"后重新提交。</div>', unsafe_allow_html=True)
+                    else:
+                        cand_id = store.add_candidate(new_candidate)
+                        st.markdown(f'<div class="success-message">✅ 候选人 {name} 添加成功！ ID: {cand_id}</div>', unsafe_allow_html=True)
+                        st.balloons()
                 else:
                     st.markdown('<div class="warning-message">❌ 姓名和技能不能为空！</div>', unsafe_allow_html=True)
 
@@ -328,18 +406,28 @@ elif page == "📄 合同管理":
     
     with col1:
         if store.contracts:
-            for i, contract in enumerate(store.contracts):
-                with st.expander(f"📄 {contract['job_title']} - {contract['candidate_name']}"):
+            for i, row in enumerate(store.contract_rows()):
+                with st.expander(f"📄 {row['job_title']} - {row['candidate_name']}"):
                     st.markdown(f"""
-                    **合同编号**: {contract['id']}  
-                    **期限**: {contract['start_date']} 至 {contract['end_date']}  
-                    **薪资**: {contract.get('salary', 0)}元/天  
-                    **状态**: {contract['status']}  
-                    **总金额**: ¥{contract.get('total_amount', 0):,}
+                    **合同编号**: {row['id']}  
+                    **期限**: {row['start_date'] or ''} 至 {row['end_date'] or ''}  
+                    **薪资**: {row['salary'] or 0}元/天  
+                    **工作日**: {row['work_days']}天  
+                    **付款方式**: {row['payment_method'] or '未填写'}  
+                    **状态**: {row['status'] or ''}  
+                    **总金额**: ¥{row['total_amount']:,}
                     """)
                     
-                    if st.button("查看详情", key=f"view_{i}"):
-                        st.info("详情功能开发中")
+                    if st.button("结算计划", key=f"view_{i}"):
+                        schedule = store.payroll_schedule(row['contract'])
+                        if schedule:
+                            st.table([
+                                {"结算期": f"{p['period_start']} 至 {p['period_end']}",
+                                 "工作日": p['work_days'], "金额": f"¥{p['amount']:,.2f}"}
+                                for p in schedule
+                            ])
+                        else:
+                            st.info("合同日期不完整，无法生成结算计划")
         else:
             st.info("暂无合同数据")
     
@@ -362,99 +450,92 @@ elif page == "📄 合同管理":
         
         if st.button("➕ 新建合同", use_container_width=True):
             st.info("合同创建功能开发中...")
+        
+        if store.contracts and st.button("📥 导出合同报表", use_container_width=True):
+            report_path = os.path.join(store.data_dir, "contracts_report.csv")
+            store.export_contracts_csv(report_path)
+            with open(report_path, 'rb') as f:
+                st.download_button("下载 CSV", f.read(), file_name="合同报表.csv",
+                                   mime="text/csv", use_container_width=True)
+        
+        st.subheader("📅 档期查询")
+        today = datetime.now().date()
+        free_from = st.date_input("开始日期", today, key="free_from")
+        free_to = st.date_input("结束日期", today + timedelta(days=30), key="free_to")
+        if free_from > free_to:
+            st.warning("开始日期不能晚于结束日期")
+        else:
+            busy = store.busy_candidate_ids(free_from.isoformat(), free_to.isoformat())
+            free = store.available_candidates(free_from.isoformat(), free_to.isoformat())
+            st.caption(f"期间空闲 {len(free)} 人，已有合同 {len(busy)} 人")
+            for candidate in free[:10]:
+                st.markdown(f"- {candidate.get('name', '')}（{candidate.get('status', '')}）")
 
 # ==================== 智能匹配 ====================
 elif page == "🎯 智能匹配":
     st.markdown('<div class="main-header"><h1>🎯 智能匹配</h1></div>', unsafe_allow_html=True)
     
     col1, col2 = st.columns([1, 1])
+    match_job = None
     
     with col1:
         st.subheader("选择职位")
-        active_jobs = [j for j in store.jobs if j['status'] == '招聘中']
+        # 按关键词从检索索引取最多 JOB_PICKER_LIMIT 个招聘中职位，选项为职位ID（同名职位不会混淆）
+        keyword = st.text_input("搜索职位", placeholder="输入职位名称或技能")
+        active_jobs = {j["id"]: j for j in store.suggest("jobs", keyword, JOB_PICKER_LIMIT, status=OPEN_JOB_STATUS)}
         if active_jobs:
-            job_options = [f"{j['title']} - {j['location']}" for j in active_jobs]
-            selected_job = st.selectbox("职位列表", job_options)
+            job_id = st.selectbox("职位列表", list(active_jobs),
+                                  format_func=lambda jid: f"{active_jobs[jid]['title']} - {active_jobs[jid].get('location', '')}")
             
             if st.button("开始智能匹配", type="primary", use_container_width=True):
-                # 获取选中的职位
-                job_index = job_options.index(selected_job)
-                job = active_jobs[job_index]
-                
-                # 匹配算法
-                results = []
-                for candidate in store.candidates:
-                    if candidate['status'] in ['可联系', '待面试']:
-                        # 计算技能匹配度
-                        job_skills = set(job.get('skills', []))
-                        candidate_skills = set(candidate.get('skills', []))
-                        matched_skills = job_skills.intersection(candidate_skills)
-                        
-                        if job_skills:
-                            match_score = len(matched_skills) / len(job_skills) * 100
-                        else:
-                            match_score = 50
-                        
-                        # 薪资匹配度
-                        try:
-                            salary_range = job['salary'].replace('元/天', '').split('-')
-                            min_salary = int(salary_range[0])
-                            max_salary = int(salary_range[1])
-                            
-                            if min_salary <= candidate['expected_salary'] <= max_salary:
-                                salary_match = 100
-                            else:
-                                salary_match = max(0, 100 - abs(candidate['expected_salary'] - min_salary) / 10)
-                        except:
-                            salary_match = 50
-                        
-                        # 综合分数
-                        total_score = match_score * 0.7 + salary_match * 0.3
-                        
-                        results.append({
-                            "候选人": candidate['name'],
-                            "技能": ", ".join(list(matched_skills)[:3]),
-                            "匹配度": f"{total_score:.1f}%",
-                            "期望薪资": f"{candidate['expected_salary']}元/天",
-                            "状态": candidate['status']
-                        })
-                
-                if results:
-                    results.sort(key=lambda x: float(x['匹配度'][:-1]), reverse=True)
-                    st.session_state['match_results'] = results
-                else:
-                    st.warning("没有找到匹配的候选人")
+                match_job = active_jobs[job_id]
+        elif keyword.strip():
+            st.warning("没有找到匹配的招聘中职位")
         else:
             st.warning("暂无招聘中的职位")
     
     with col2:
         st.subheader("匹配结果")
-        if 'match_results' in st.session_state:
-            for i, result in enumerate(st.session_state['match_results'][:5]):
-                score = float(result['匹配度'][:-1])
-                color = "#34c759" if score >= 80 else "#ff9500" if score >= 60 else "#ff3b30"
-                
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div style="display: flex; justify-content: space-between;">
-                        <span style="font-weight: bold;">{i+1}. {result['候选人']}</span>
-                        <span style="color: {color}; font-weight: bold;">{result['匹配度']}</span>
-                    </div>
-                    <div style="color: #666; font-size: 0.9rem;">{result['技能']}</div>
-                    <div style="color: #666; font-size: 0.9rem;">{result['期望薪资']}</div>
-                </div>
-                """, unsafe_allow_html=True)
+        progress_area = st.empty()
+        results_area = st.empty()
+        if match_job is not None:
+            # 分块打分，每块打完就刷新目前的前几名；超过 MATCH_TIME_BUDGET 秒时停在已评估部分的最佳结果
+            busy = busy_candidates(store, match_job)
+            results = []
+            for progress in stream_matches(match_job, candidate_pool(store, match_job), limit=20, busy=busy,
+                                           time_budget=MATCH_TIME_BUDGET):
+                results = [match_row(match) for match in progress.results]
+                show_match_cards(results_area, results)
+                progress_area.progress(progress.scanned / max(progress.total, 1),
+                                       text=f"已评估 {progress.scanned} / {progress.total} 名候选人")
+            if progress.complete:
+                progress_area.empty()
+            else:
+                progress_area.caption(f"已超时: 显示已评估的 {progress.scanned} / {progress.total} 名候选人中的最佳结果")
+            
+            if results:
+                st.session_state['match_results'] = results
+            else:
+                st.session_state.pop('match_results', None)
+                results_area.warning("没有找到匹配的候选人")
+        elif 'match_results' in st.session_state:
+            show_match_cards(results_area, st.session_state['match_results'])
         else:
-            st.info("点击「开始智能匹配」查看结果")
+            results_area.info("点击「开始智能匹配」查看结果")
 
 # ==================== 数据分析 ====================
 elif page == "📊 数据分析":
+    import pandas as pd
+    import plotly.express as px
+    
     st.markdown('<div class="main-header"><h1>📊 数据分析</h1></div>', unsafe_allow_html=True)
     
     # 技能云图
     st.subheader("🔤 技能分布")
+    # 两张图用同一版本的候选人
+    candidates = store.snapshot().candidates
     all_skills = []
-    for c in store.candidates:
+    for c in candidates:
         all_skills.extend(c.get('skills', []))
     
     from collections import Counter
@@ -466,22 +547,24 @@ elif page == "📊 数据分析":
             '数量': [s[1] for s in skill_counts]
         })
         
-        fig = px.bar(skill_df, x='技能', y='数量', title="热门技能TOP10",
-                     color='数量', color_continuous_scale='Viridis')
-        st.plotly_chart(fig, use_container_width=True)
+        with metrics.timer("web.chart.skills"):
+            fig = px.bar(skill_df, x='技能', y='数量', title="热门技能TOP10",
+                         color='数量', color_continuous_scale='Viridis')
+            st.plotly_chart(fig, use_container_width=True)
     
     # 薪资分析
     st.subheader("💰 薪资分布")
-    if store.candidates:
-        salaries = [c['expected_salary'] for c in store.candidates]
+    if candidates:
+        salaries = [c['expected_salary'] for c in candidates]
         
-        fig = px.histogram(
-            x=salaries,
-            nbins=10,
-            title="候选人期望薪资分布",
-            labels={'x': '薪资（元/天）', 'y': '人数'}
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with metrics.timer("web.chart.salaries"):
+            fig = px.histogram(
+                x=salaries,
+                nbins=10,
+                title="候选人期望薪资分布",
+                labels={'x': '薪资（元/天）', 'y': '人数'}
+            )
+            st.plotly_chart(fig, use_container_width=True)
     
     # 导出数据
     if st.button("📥 导出分析报告", use_container_width=True):
@@ -499,12 +582,32 @@ else:
             store.save_all()
             st.success("数据已保存！")
         
+        # 电话、邮箱相同的可以一键合并；只有姓名+技能相同的可能是不同的人，逐组确认
+        duplicate_groups = store.duplicate_groups(contact_only=True)
+        if duplicate_groups:
+            removed = sum(len(group) - 1 for group in duplicate_groups)
+            st.info(f"发现 {len(duplicate_groups)} 组电话或邮箱相同的候选人，共 {removed} 条重复记录")
+            if st.button("🧹 合并重复候选人", use_container_width=True):
+                for group in duplicate_groups:
+                    store.merge_candidates(group[0]["id"], [c["id"] for c in group[1:]])
+                st.success(f"已合并 {len(duplicate_groups)} 组重复候选人！")
+                st.rerun()
+        
+        review_groups = store.review_duplicate_groups()
+        if review_groups:
+            with st.expander(f"🔍 {len(review_groups)} 组候选人姓名和技能相同，请逐组确认是否为同一人"):
+                for group in review_groups:
+                    st.markdown("  \n".join(
+                        f"**{c['name']}** {c.get('phone') or ''} {c.get('email') or ''} {c.get('location') or ''}"
+                        f"（{c['id']}）" for c in group))
+                    if st.button("合并为一人", key=f"merge_{group[0]['id']}"):
+                        store.merge_candidates(group[0]["id"], [c["id"] for c in group[1:]])
+                        st.success(f"已合并 {group[0]['name']} 的 {len(group)} 条记录！")
+                        st.rerun()
+        
         if st.button("🔄 重置数据", use_container_width=True):
             if st.checkbox("确认重置所有数据？"):
-                store.jobs = store._default_jobs()
-                store.candidates = store._default_candidates()
-                store.contracts = store._default_contracts()
-                store.save_all()
+                store.reset_data()
                 st.success("数据已重置！")
                 st.rerun()
     
@@ -516,6 +619,15 @@ else:
         if st.button("保存设置", use_container_width=True):
             st.success("设置已保存！")
 
+page_timer.stop()
+
+# 性能调试面板（FLEXWORK_METRICS=1 时显示）
+if metrics.is_enabled():
+    with st.sidebar.expander("🛠️ 性能指标"):
+        st.code(metrics.render_text(), language="text")
+        if st.button("清空指标"):
+            metrics.reset()
+
 # 页脚
 st.sidebar.markdown("---")
 st.sidebar.markdown("© 2024 灵活用工平台 | 版本 2.0")